@@ -0,0 +1,188 @@
+from array import array
+
+
+class IndiceAlcance:
+    """
+    Índice de alcançabilidade de uma classe de transporte.
+
+    Um troço origem -> destino é utilizável se o transporte pode aceder ao
+    destino e se o troço cabe num depósito cheio ou a origem é um ponto de
+    reabastecimento. Sobre esse grafo calculam-se as componentes fortemente
+    ligadas (Tarjan) e o fecho transitivo do grafo de componentes, guardado
+    como bitsets, pelo que cada consulta "o transporte consegue ir de A a B"
+    é feita em tempo constante.
+
+    A autonomia restante em cada momento da missão não entra no índice: é
+    verificada quando a rota é percorrida (reabastecimento ou rota rejeitada).
+    """
+
+    # Acima deste número de componentes o fecho é calculado por origem, a pedido
+    LIMITE_FECHO_COMPLETO = 4096
+
+    def __init__(self, grafo, transporte):
+        self.m_grafo = grafo
+        self.m_transporte = transporte
+        self.m_compilado = None
+        self.m_sujo = True
+        self.m_acessiveis = bytearray()
+        self.m_componentes = array('q')
+        self.m_sucessores = []
+        self.m_fecho = {}
+
+    def atualizar(self):
+        """
+        Garante que o índice corresponde ao grafo atual e devolve-o.
+        """
+        compilado = self.m_grafo.compilado()
+        if self.m_compilado is not compilado:
+            self.m_compilado = compilado
+            self.m_acessiveis = bytearray(
+                self.m_transporte.transporte_pode(a) for a in compilado.coluna("acessibilidade")
+            )
+            self.m_sujo = True
+        if self.m_sujo:
+            self.construir()
+        return self
+
+    @property
+    def acessiveis(self):
+        """
+        Bytearray indexado pelos nós do GrafoCompilado: 1 se o transporte pode aceder ao nó.
+        """
+        return self.atualizar().m_acessiveis
+
+    def alcancavel(self, origem, destino):
+        if origem == destino:
+            return True
+        self.atualizar()
+        indices = self.m_compilado.indices
+        return self.alcancavel_indices(indices[origem], indices[destino])
+
+    def alcancavel_indices(self, u, v):
+        """
+        Versão de alcancavel para índices do GrafoCompilado (sem validação).
+        """
+        if u == v:
+            return True
+        c_origem = self.m_componentes[u]
+        c_destino = self.m_componentes[v]
+        if c_origem == c_destino:
+            return True
+        return bool(self._fecho(c_origem) >> c_destino & 1)
+
+    def nodo_alterado(self, nodo):
+        """
+        Invalida o índice apenas se o estado do nó (acessível, reabastecimento)
+        mudou para esta classe de transporte.
+        """
+        compilado = self.m_compilado
+        if compilado is None or nodo not in compilado.indices:
+            return
+        u = compilado.indices[nodo]
+        acessivel = self.m_transporte.transporte_pode(compilado.coluna("acessibilidade")[u])
+        if acessivel != self.m_acessiveis[u]:
+            self.m_acessiveis[u] = acessivel
+            self.m_sujo = True
+        if compilado.coluna("reabastecimento")[u] != self.m_reabastecimento[u]:
+            self.m_sujo = True
+
+    def construir(self):
+        compilado = self.m_compilado
+        n = compilado.n_nodos
+        inicios = compilado.inicios
+        destinos = compilado.destinos
+        distancias = compilado.distancias
+        acessiveis = self.m_acessiveis
+        reabastecimento = compilado.coluna("reabastecimento")
+        deposito = self.m_transporte.deposito
+
+        # Troços utilizáveis (distância NaN -> comparação falsa -> não utilizável)
+        adjacencias = []
+        for u in range(n):
+            if reabastecimento[u]:
+                adjacencias.append([destinos[e] for e in range(inicios[u], inicios[u + 1]) if acessiveis[destinos[e]]])
+            else:
+                adjacencias.append([
+                    destinos[e] for e in range(inicios[u], inicios[u + 1])
+                    if acessiveis[destinos[e]] and distancias[e] <= deposito
+                ])
+
+        # Tarjan iterativo; as componentes saem por ordem topológica inversa
+        componentes = array('q', [-1]) * n
+        indices = [-1] * n
+        minimos = [0] * n
+        na_pilha = bytearray(n)
+        pilha = []
+        contador = 0
+        n_componentes = 0
+
+        for raiz in range(n):
+            if indices[raiz] != -1:
+                continue
+            trabalho = [(raiz, 0)]
+            while trabalho:
+                nodo, i = trabalho.pop()
+                if i == 0:
+                    indices[nodo] = minimos[nodo] = contador
+                    contador += 1
+                    pilha.append(nodo)
+                    na_pilha[nodo] = 1
+                vizinhos = adjacencias[nodo]
+                while i < len(vizinhos):
+                    vizinho = vizinhos[i]
+                    i += 1
+                    if indices[vizinho] == -1:
+                        trabalho.append((nodo, i))
+                        trabalho.append((vizinho, 0))
+                        break
+                    if na_pilha[vizinho]:
+                        minimos[nodo] = min(minimos[nodo], indices[vizinho])
+                else:
+                    if minimos[nodo] == indices[nodo]:
+                        while True:
+                            membro = pilha.pop()
+                            na_pilha[membro] = 0
+                            componentes[membro] = n_componentes
+                            if membro == nodo:
+                                break
+                        n_componentes += 1
+                    if trabalho:
+                        pai = trabalho[-1][0]
+                        minimos[pai] = min(minimos[pai], minimos[nodo])
+
+        sucessores = [set() for _ in range(n_componentes)]
+        for u in range(n):
+            c = componentes[u]
+            for v in adjacencias[u]:
+                if componentes[v] != c:
+                    sucessores[c].add(componentes[v])
+
+        self.m_componentes = componentes
+        self.m_reabastecimento = array('b', reabastecimento)
+        self.m_sucessores = [list(s) for s in sucessores]
+        self.m_fecho = {}
+        if n_componentes <= self.LIMITE_FECHO_COMPLETO:
+            # Ordem topológica inversa: os sucessores já estão calculados
+            for c in range(n_componentes):
+                fecho = 1 << c
+                for s in self.m_sucessores[c]:
+                    fecho |= self.m_fecho[s]
+                self.m_fecho[c] = fecho
+
+        self.m_sujo = False
+
+    def _fecho(self, componente):
+        fecho = self.m_fecho.get(componente)
+        if fecho is None:
+            fecho = 0
+            pendentes = [componente]
+            while pendentes:
+                c = pendentes.pop()
+                if fecho >> c & 1:
+                    continue
+                fecho |= 1 << c
+                pendentes.extend(self.m_sucessores[c])
+            if len(self.m_fecho) >= self.LIMITE_FECHO_COMPLETO:
+                self.m_fecho.clear()
+            self.m_fecho[componente] = fecho
+        return fecho
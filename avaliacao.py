@@ -0,0 +1,109 @@
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from transporte import Carro, Mota, Helicoptero, Drone
+from instrumentacao import EstatisticasProcura
+from procura import (MotorProcura, DFS, BFS, A_ESTRELA, CUSTO_UNIFORME, GULOSA, BIDIRECIONAL,
+                     MULTI_OBJETIVO, RECURSOS, COMBUSTIVEL)
+
+# Nome do algoritmo (usado nos relatórios e no registo de resultados) -> estratégia de procura
+ALGORITMOS = {
+    estrategia.nome: estrategia
+    for estrategia in (DFS, BFS, A_ESTRELA, CUSTO_UNIFORME, GULOSA, BIDIRECIONAL,
+                       MULTI_OBJETIVO, RECURSOS, COMBUSTIVEL)
+}
+
+TRANSPORTES = [Carro, Mota, Helicoptero, Drone]
+
+# Grafo partilhado por cada processo trabalhador (definido em _iniciar_trabalhador)
+_grafo_trabalhador = None
+
+
+def avaliar_combinacao(grafo, algoritmo, classe_transporte, inicio, objetivos):
+    """
+    Executa um algoritmo com um transporte sobre um snapshot do grafo.
+
+    Returns:
+        dict: algoritmo, transporte, caminho, custo, tempo, erro, nós
+        expandidos, duração (segundos) e estatísticas (ver
+        EstatisticasProcura.resumo)
+    """
+    transporte = classe_transporte()
+    resultado = {
+        "algoritmo": algoritmo,
+        "transporte": transporte.nome,
+        "caminho": [],
+        "custo": 0,
+        "tempo": 0,
+        "erro": None,
+        "expansoes": 0,
+    }
+
+    inicio_relogio = time.perf_counter()
+    estatisticas = EstatisticasProcura()
+    motor = MotorProcura(grafo.snapshot(), transporte, ALGORITMOS[algoritmo], estatisticas=estatisticas)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            caminho, custo, tempo = motor.executar(inicio, objetivos)
+        resultado.update(caminho=caminho, custo=custo, tempo=tempo)
+    except ValueError as e:
+        resultado["erro"] = str(e)
+    resultado["expansoes"] = estatisticas.expansoes
+    resultado["duracao"] = time.perf_counter() - inicio_relogio
+    resultado["estatisticas"] = estatisticas.resumo()
+    return resultado
+
+
+def _iniciar_trabalhador(grafo):
+    global _grafo_trabalhador
+    _grafo_trabalhador = grafo
+    # Compila uma vez por processo; os snapshots de cada tarefa partilham-no
+    grafo.compilado()
+
+
+def _avaliar_no_trabalhador(algoritmo, classe_transporte, inicio, objetivos):
+    return avaliar_combinacao(_grafo_trabalhador, algoritmo, classe_transporte, inicio, objetivos)
+
+
+def avaliar_todos(grafo, inicio, objetivos, algoritmos=None, transportes=None, processos=None):
+    """
+    Avalia a grelha algoritmo x transporte distribuindo as combinações por um
+    conjunto de processos. Cada combinação parte do estado atual do grafo.
+
+    Returns:
+        list: Resultados (ver avaliar_combinacao), pela ordem da grelha
+    """
+    algoritmos = algoritmos if algoritmos else list(ALGORITMOS)
+    transportes = transportes if transportes else TRANSPORTES
+    grelha = [(algoritmo, classe) for algoritmo in algoritmos for classe in transportes]
+
+    if processos is None:
+        processos = min(len(grelha), os.cpu_count() or 1)
+
+    if processos <= 1:
+        return [avaliar_combinacao(grafo, algoritmo, classe, inicio, objetivos) for algoritmo, classe in grelha]
+
+    with ProcessPoolExecutor(max_workers=processos, initializer=_iniciar_trabalhador, initargs=(grafo,)) as executor:
+        futuros = [
+            executor.submit(_avaliar_no_trabalhador, algoritmo, classe, inicio, objetivos)
+            for algoritmo, classe in grelha
+        ]
+        return [futuro.result() for futuro in futuros]
+
+
+def imprimir_relatorio(resultados, duracao_total=None):
+    print(f"{'Algoritmo':<15}{'Transporte':<14}{'Custo':>12}{'Tempo (h)':>12}{'Duração (s)':>14}  Caminho")
+    for r in resultados:
+        if r["erro"]:
+            detalhe = r["erro"]
+        elif r["caminho"]:
+            detalhe = " -> ".join(r["caminho"])
+        else:
+            detalhe = "Nenhum caminho válido encontrado"
+        print(f"{r['algoritmo']:<15}{r['transporte']:<14}{r['custo']:>12.3f}{r['tempo']:>12.2f}{r['duracao']:>14.3f}  {detalhe}")
+
+    if duracao_total is not None:
+        soma = sum(r["duracao"] for r in resultados)
+        print(f"Tempo total: {duracao_total:.3f}s (soma das combinações: {soma:.3f}s)")
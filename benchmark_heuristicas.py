@@ -0,0 +1,118 @@
+import argparse
+import contextlib
+import io
+import random
+import time
+from grafo import Grafo
+from procura import MotorProcura, A_ESTRELA, GULOSA, HeuristicaDistancia, HeuristicaMarcos
+from transporte import Carro
+
+
+def gerar_grafo(n_nodos, seed):
+    """
+    Grafo aleatório na região de Braga: uma árvore que garante a ligação e
+    arestas extra entre localidades próximas, sempre nos dois sentidos.
+    """
+    rnd = random.Random(seed)
+    g = Grafo()
+    nomes = [f"Local{i}" for i in range(n_nodos)]
+    for i, nome in enumerate(nomes):
+        atributos = {
+            "coordenadas": (41.3 + rnd.random() * 0.5, -8.8 + rnd.random() * 0.9),
+            "prioridade": rnd.randint(0, 10),
+            "acessibilidade": rnd.randint(0, 10),
+            "clima": rnd.randint(0, 10),
+            "alimentos": rnd.randint(0, 100),
+            "reabastecimento": rnd.random() < 0.5,
+            "supply_refill": rnd.random() < 0.5,
+            "TTL": rnd.randint(20, 200),
+        }
+        if i == 0:
+            atributos.update(acessibilidade=0, clima=0, alimentos=0, reabastecimento=True, supply_refill=True)
+        g.adicionar_nodo(nome, atributos)
+
+    for i in range(1, n_nodos):
+        j = rnd.randrange(i)
+        g.adicionar_aresta(nomes[i], nomes[j])
+        g.adicionar_aresta(nomes[j], nomes[i])
+    for i, nome in enumerate(nomes):
+        coordenadas = g.m_nodos[nome]["coordenadas"]
+        proximos = sorted(
+            (j for j in range(n_nodos) if j != i),
+            key=lambda j: (g.m_nodos[nomes[j]]["coordenadas"][0] - coordenadas[0]) ** 2 +
+                          (g.m_nodos[nomes[j]]["coordenadas"][1] - coordenadas[1]) ** 2,
+        )
+        for j in proximos[:2]:
+            g.adicionar_aresta(nome, nomes[j])
+            g.adicionar_aresta(nomes[j], nome)
+    return g
+
+
+def medir(grafo, estrategia, heuristica, classe_transporte, pares):
+    """
+    Executa uma missão de um só objetivo por par (início, objetivo), cada uma
+    num snapshot do grafo.
+
+    Returns:
+        tuple: (missões concluídas, nós expandidos, custo, duração em segundos)
+    """
+    concluidas, expansoes, custo_total = 0, 0, 0
+    inicio_relogio = time.perf_counter()
+    for inicio, objetivo in pares:
+        motor = MotorProcura(grafo.snapshot(), classe_transporte(), estrategia, heuristica)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                caminho, custo, _ = motor.executar(inicio, [objetivo])
+        except ValueError:
+            continue
+        expansoes += motor.m_expansoes
+        if caminho:
+            concluidas += 1
+            custo_total += custo
+    return concluidas, expansoes, custo_total, time.perf_counter() - inicio_relogio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara as heurísticas de a_star e procura_greedy.")
+    parser.add_argument("--nodos", type=int, default=500)
+    parser.add_argument("--grafos", type=int, default=3)
+    parser.add_argument("--pares", type=int, default=50)
+    parser.add_argument("--marcos", type=int, default=4)
+    args = parser.parse_args()
+
+    heuristicas = {
+        "nenhuma": lambda nodo, objetivo: 0,
+        "distancia": HeuristicaDistancia(),
+        "marcos": HeuristicaMarcos(args.marcos),
+    }
+    estrategias = [A_ESTRELA, GULOSA]
+    totais = {(e.nome, h): [0, 0, 0, 0.0] for e in estrategias for h in heuristicas}
+
+    for seed in range(args.grafos):
+        grafo = gerar_grafo(args.nodos, seed)
+        rnd = random.Random(seed)
+        nomes = list(grafo.m_nodos)
+        pares = [(rnd.choice(nomes), rnd.choice(nomes)) for _ in range(args.pares)]
+        # As tabelas de marcos são construídas uma vez por grafo, fora da medição
+        grafo.tabela_marcos(args.marcos).atualizar()
+        for estrategia in estrategias:
+            for nome, heuristica in heuristicas.items():
+                resultado = medir(grafo, estrategia, heuristica, Carro, pares)
+                total = totais[(estrategia.nome, nome)]
+                for i, valor in enumerate(resultado):
+                    total[i] += valor
+
+    # Os limites dos marcos são admissíveis para o custo do A* (pesos negativos contam como 0):
+    # o A* com marcos não pode encontrar caminhos mais caros do que sem heurística
+    sem_heuristica, com_marcos = totais[(A_ESTRELA.nome, "nenhuma")], totais[(A_ESTRELA.nome, "marcos")]
+    assert com_marcos[2] <= sem_heuristica[2] + 1e-6, \
+        f"A* com marcos mais caro do que sem heurística ({com_marcos[2]:.3f} > {sem_heuristica[2]:.3f})"
+
+    print(f"{args.grafos} grafos de {args.nodos} nós, {args.pares} missões (Carro) por grafo")
+    print(f"{'Algoritmo':<10}{'Heurística':<12}{'Concluídas':>11}{'Expansões':>11}{'Custo':>12}{'Duração (s)':>13}")
+    for (algoritmo, heuristica), (concluidas, expansoes, custo, duracao) in totais.items():
+        print(f"{algoritmo:<10}{heuristica:<12}{concluidas:>11}{expansoes:>11}{custo:>12.3f}{duracao:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
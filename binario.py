@@ -0,0 +1,188 @@
+import json
+import mmap
+import struct
+import sys
+from array import array
+from grafo_compilado import GrafoCompilado, COLUNAS
+
+MAGICO = b"GRAFOBIN"
+VERSAO_FORMATO = 1
+# Mágico, versão do formato e tamanho do cabeçalho JSON que se segue
+CABECALHO = struct.Struct("<8sIQ")
+
+# Secções de arrays da forma compilada: nome -> tipo do array
+SECCOES = {
+    "ordem": 'q',
+    "inicios": 'q',
+    "destinos": 'q',
+    "pesos": 'd',
+    "origens": 'q',
+    "entradas_inicios": 'q',
+    "entradas": 'q',
+    "tem_coordenadas": 'b',
+    "distancias": 'd',
+}
+SECCOES.update({"coluna_" + chave: tipo for chave, (tipo, _) in COLUNAS.items()})
+# Secções só usadas para reconstruir m_nodos e m_grafo
+SECCOES.update({
+    "latitudes": 'd',
+    "longitudes": 'd',
+    # Bits por nó: bit k = atributo k de COLUNAS (e o último, as coordenadas)
+    "presentes": 'q',
+    "inteiros": 'q',
+    # Arestas com peso calculado (entram em m_entradas)
+    "calculadas": 'b',
+})
+
+BIT_COORDENADAS = 1 << len(COLUNAS)
+
+
+def _alinhar(posicao):
+    return (posicao + 7) & ~7
+
+
+def guardar_binario(grafo, caminho):
+    """
+    Grava o grafo num ficheiro binário: a adjacência CSR, os pesos, as
+    distâncias das arestas e as colunas de atributos da forma compilada, em
+    secções alinhadas que abrir_binario mapeia diretamente em memória. Os
+    nomes e os atributos fora de COLUNAS vão num cabeçalho JSON.
+    """
+    compilado = grafo.compilado()
+    n = compilado.n_nodos
+    chaves = list(COLUNAS)
+
+    latitudes = array('d', bytes(8 * n))
+    longitudes = array('d', bytes(8 * n))
+    presentes = array('q', bytes(8 * n))
+    inteiros = array('q', bytes(8 * n))
+    extras = {}
+    for i, nome in enumerate(compilado.nomes):
+        atributos = grafo.m_nodos[nome]
+        for k, chave in enumerate(chaves):
+            if chave in atributos:
+                presentes[i] |= 1 << k
+                valor = atributos[chave]
+                if isinstance(valor, int) and not isinstance(valor, bool):
+                    inteiros[i] |= 1 << k
+        if "coordenadas" in atributos:
+            presentes[i] |= BIT_COORDENADAS
+            if atributos["coordenadas"]:
+                latitudes[i], longitudes[i] = atributos["coordenadas"]
+        outros = {chave: valor for chave, valor in atributos.items() if chave not in COLUNAS and chave != "coordenadas"}
+        if outros:
+            extras[nome] = outros
+
+    calculadas = array('b', bytes(compilado.n_arestas))
+    for destino, entradas in grafo.m_entradas.items():
+        for origem, posicao in entradas:
+            calculadas[compilado.inicios[compilado.indices[origem]] + posicao] = 1
+
+    seccoes = {chave: getattr(compilado, chave) for chave in SECCOES if hasattr(compilado, chave)}
+    seccoes.update({"coluna_" + chave: compilado.colunas[chave] for chave in COLUNAS})
+    seccoes.update(latitudes=latitudes, longitudes=longitudes, presentes=presentes,
+                   inteiros=inteiros, calculadas=calculadas)
+
+    try:
+        descricao = {
+            "ordem_bytes": sys.byteorder,
+            "direcionado": grafo.m_direcionado,
+            "nomes": compilado.nomes,
+            "extras": extras,
+        }
+        # As posições das secções dependem do tamanho do próprio cabeçalho
+        posicoes = {}
+        while True:
+            descricao["seccoes"] = posicoes
+            texto = json.dumps(descricao, ensure_ascii=False).encode("utf-8")
+            posicao = _alinhar(CABECALHO.size + len(texto))
+            novas = {}
+            for chave in SECCOES:
+                novas[chave] = [posicao, len(seccoes[chave])]
+                posicao = _alinhar(posicao + len(seccoes[chave]) * array(SECCOES[chave]).itemsize)
+            if novas == posicoes:
+                break
+            posicoes = novas
+    except TypeError:
+        raise ValueError("Os atributos dos nós têm de ser serializáveis em JSON.")
+
+    with open(caminho, "wb") as ficheiro:
+        ficheiro.write(CABECALHO.pack(MAGICO, VERSAO_FORMATO, len(texto)))
+        ficheiro.write(texto)
+        for chave in SECCOES:
+            ficheiro.seek(posicoes[chave][0])
+            ficheiro.write(bytes(seccoes[chave]))
+
+
+def mapear_ficheiro(caminho):
+    """
+    Mapeia em memória (só de leitura) um ficheiro gravado por guardar_binario.
+
+    Returns:
+        tuple: (descrição do cabeçalho JSON, secções como memoryview por nome)
+    """
+    with open(caminho, "rb") as ficheiro:
+        mapa = mmap.mmap(ficheiro.fileno(), 0, access=mmap.ACCESS_READ)
+    magico, versao, tamanho = CABECALHO.unpack_from(mapa)
+    if magico != MAGICO or versao != VERSAO_FORMATO:
+        raise ValueError(f"{caminho} não é um grafo binário (versão {VERSAO_FORMATO}).")
+    descricao = json.loads(mapa[CABECALHO.size:CABECALHO.size + tamanho].decode("utf-8"))
+    if descricao["ordem_bytes"] != sys.byteorder:
+        raise ValueError(f"{caminho} foi gravado com outra ordem de bytes.")
+
+    vista = memoryview(mapa)
+    seccoes = {}
+    for chave, (posicao, quantidade) in descricao["seccoes"].items():
+        tipo = SECCOES[chave]
+        seccoes[chave] = vista[posicao:posicao + quantidade * array(tipo).itemsize].cast(tipo)
+    return descricao, seccoes
+
+
+def abrir_binario(caminho, grafo):
+    """
+    Carrega um ficheiro gravado por guardar_binario num grafo vazio.
+
+    O ficheiro é mapeado em memória (só de leitura) e as secções da forma
+    compilada são usadas sem cópia (GrafoCompilado.mapear), pelo que vários
+    processos que abram o mesmo ficheiro partilham as páginas; m_nodos e
+    m_grafo são reconstruídos a partir delas, sem recalcular pesos. Enviado
+    para outro processo, o grafo volta a mapear o ficheiro em vez de copiar
+    as secções.
+    """
+    if grafo.m_nodos:
+        raise ValueError("O grafo tem de estar vazio.")
+    descricao, seccoes = mapear_ficheiro(caminho)
+
+    nomes = descricao["nomes"]
+    extras = descricao["extras"]
+    chaves = [(1 << k, chave, COLUNAS[chave][0] == 'b', seccoes["coluna_" + chave]) for k, chave in enumerate(COLUNAS)]
+    presentes, inteiros = seccoes["presentes"], seccoes["inteiros"]
+    latitudes, longitudes = seccoes["latitudes"], seccoes["longitudes"]
+    tem_coordenadas = seccoes["tem_coordenadas"]
+
+    def atributos(i):
+        resultado = {}
+        mascara, mascara_inteiros = presentes[i], inteiros[i]
+        if mascara & BIT_COORDENADAS:
+            resultado["coordenadas"] = (latitudes[i], longitudes[i]) if tem_coordenadas[i] else None
+        for bit, chave, booleano, coluna in chaves:
+            if mascara & bit:
+                valor = coluna[i]
+                resultado[chave] = bool(valor) if booleano else int(valor) if mascara_inteiros & bit else valor
+        resultado.update(extras.get(nomes[i], ()))
+        return resultado
+
+    grafo.m_direcionado = descricao["direcionado"]
+    grafo.adicionar_nodos((nome, atributos(i)) for i, nome in enumerate(nomes))
+
+    inicios, destinos, pesos, calculadas = seccoes["inicios"], seccoes["destinos"], seccoes["pesos"], seccoes["calculadas"]
+    entradas = grafo.m_entradas
+    for u, nome in enumerate(nomes):
+        a, b = inicios[u], inicios[u + 1]
+        grafo.m_grafo[nome] = [(nomes[v], peso) for v, peso in zip(destinos[a:b], pesos[a:b])]
+        for e in range(a, b):
+            if calculadas[e]:
+                entradas.setdefault(nomes[destinos[e]], []).append((nome, e - a))
+    grafo.m_versao += 1
+    grafo.m_compilado = GrafoCompilado.mapear(grafo, seccoes, caminho)
+    return grafo
@@ -0,0 +1,70 @@
+class RegistoCaminhos:
+    """
+    Árvore dos caminhos gerados por uma procura, guardada em listas planas.
+
+    Cada entrada da fronteira passa a ser um índice (rótulo) com o nó e o
+    rótulo do pai, em vez de uma cópia do caminho inteiro; o caminho só é
+    reconstruído quando um objetivo é aceite.
+
+    Args:
+        ordem: Opcional; quando os nós são índices, posição de cada um na ordem
+            dos nomes, usada para comparar caminhos como se fossem de nomes
+    """
+
+    def __init__(self, ordem=None):
+        self.m_nodos = []
+        self.m_pais = []
+        self.m_ordem = ordem
+
+    def __len__(self):
+        return len(self.m_nodos)
+
+    def registar(self, nodo, pai=-1):
+        self.m_nodos.append(nodo)
+        self.m_pais.append(pai)
+        return len(self.m_nodos) - 1
+
+    def nodo(self, rotulo):
+        return self.m_nodos[rotulo]
+
+    def caminho(self, rotulo):
+        caminho = []
+        while rotulo != -1:
+            caminho.append(self.m_nodos[rotulo])
+            rotulo = self.m_pais[rotulo]
+        caminho.reverse()
+        return caminho
+
+    def chave(self, rotulo):
+        caminho = self.caminho(rotulo)
+        if self.m_ordem is None:
+            return caminho
+        ordem = self.m_ordem
+        return [ordem[nodo] for nodo in caminho]
+
+    def ordenavel(self, rotulo):
+        return ChaveCaminho(self, rotulo)
+
+
+class ChaveCaminho:
+    """
+    Rótulo para filas de prioridade. Em caso de empate nos restantes campos
+    compara os caminhos como listas, tal como acontecia quando a fila guardava
+    o caminho completo, para que a ordem de expansão não mude.
+    """
+
+    __slots__ = ("m_registo", "m_rotulo")
+
+    def __init__(self, registo, rotulo):
+        self.m_registo = registo
+        self.m_rotulo = rotulo
+
+    @property
+    def rotulo(self):
+        return self.m_rotulo
+
+    def __eq__(self, outro):
+        return self.m_rotulo == outro.m_rotulo or self.m_registo.chave(self.m_rotulo) == outro.m_registo.chave(outro.m_rotulo)
+
+    def __lt__(self, outro):
+        return self.m_rotulo != outro.m_rotulo and self.m_registo.chave(self.m_rotulo) < outro.m_registo.chave(outro.m_rotulo)
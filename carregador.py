@@ -0,0 +1,145 @@
+import argparse
+import csv
+import json
+import time
+from itertools import islice
+from grafo import Grafo
+from grafo_compilado import COLUNAS
+
+TAMANHO_LOTE = 10000
+
+
+def _valor(chave, texto):
+    """
+    Converte um valor lido de CSV no tipo do atributo (booleano para as
+    colunas 'b' de COLUNAS, número quando possível, texto nos restantes e
+    nos nomes dos nós).
+    """
+    texto = texto.strip()
+    if chave in ("nome", "origem", "destino"):
+        return texto
+    if COLUNAS.get(chave, (None,))[0] == 'b':
+        return texto.lower() in ("1", "true", "sim", "s")
+    for tipo in (int, float):
+        try:
+            return tipo(texto)
+        except ValueError:
+            pass
+    return texto
+
+
+def _linhas(caminho):
+    """
+    Registos (dicionários) de um ficheiro JSON Lines (.jsonl) ou CSV, lidos
+    um a um.
+    """
+    with open(caminho, encoding="utf-8", newline="") as ficheiro:
+        if caminho.lower().endswith(".csv"):
+            for registo in csv.DictReader(ficheiro):
+                yield {chave: _valor(chave, texto) for chave, texto in registo.items() if texto not in (None, "")}
+        else:
+            for linha in ficheiro:
+                if linha.strip():
+                    yield json.loads(linha)
+
+
+def ler_nodos(caminho):
+    """
+    Nós de um ficheiro JSON Lines ou CSV, como pares (nodo, atributos).
+
+    Cada registo tem o nome em "nome" e as coordenadas em "coordenadas"
+    ([latitude, longitude]) ou nas colunas "latitude" e "longitude"; as
+    restantes chaves são os atributos do nó.
+    """
+    for registo in _linhas(caminho):
+        nodo = registo.pop("nome", None)
+        if nodo is None:
+            raise ValueError(f"Registo sem nome em {caminho}.")
+        if "latitude" in registo and "longitude" in registo:
+            registo["coordenadas"] = (registo.pop("latitude"), registo.pop("longitude"))
+        elif registo.get("coordenadas"):
+            registo["coordenadas"] = tuple(registo["coordenadas"])
+        yield str(nodo), registo
+
+
+def ler_arestas(caminho):
+    """
+    Arestas de um ficheiro JSON Lines ou CSV, como tuplos (origem, destino,
+    peso). Sem "peso" (ou com peso vazio), o peso é calculado na carga; com
+    "bidirecional" verdadeiro é também devolvida a aresta inversa.
+    """
+    for registo in _linhas(caminho):
+        try:
+            origem, destino = str(registo["origem"]), str(registo["destino"])
+        except KeyError:
+            raise ValueError(f"Registo sem origem ou destino em {caminho}.")
+        peso = registo.get("peso")
+        yield origem, destino, peso
+        bidirecional = registo.get("bidirecional", False)
+        if isinstance(bidirecional, str):
+            bidirecional = bidirecional.lower() in ("1", "true", "sim", "s")
+        if bidirecional:
+            yield destino, origem, peso
+
+
+def em_lotes(iteravel, tamanho=TAMANHO_LOTE):
+    """
+    Divide um iterável em listas de no máximo `tamanho` elementos.
+    """
+    iterador = iter(iteravel)
+    while True:
+        lote = list(islice(iterador, tamanho))
+        if not lote:
+            return
+        yield lote
+
+
+def carregar(caminho_nodos, caminho_arestas, grafo=None, tamanho_lote=TAMANHO_LOTE):
+    """
+    Carrega nós e arestas de ficheiros JSON Lines ou CSV para um grafo.
+
+    Os ficheiros são lidos em lotes de tamanho_lote registos, cada um
+    entregue a Grafo.adicionar_nodos / adicionar_arestas, pelo que a memória
+    usada pela leitura não cresce com o tamanho dos ficheiros; os pesos em
+    falta são calculados lote a lote.
+
+    Returns:
+        tuple: (grafo, estatísticas: nós, arestas e segundos de cada fase)
+    """
+    if grafo is None:
+        grafo = Grafo()
+    estatisticas = {"nodos": 0, "arestas": 0}
+
+    inicio = time.perf_counter()
+    for lote in em_lotes(ler_nodos(caminho_nodos), tamanho_lote):
+        estatisticas["nodos"] += grafo.adicionar_nodos(lote)
+    estatisticas["segundos_nodos"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for lote in em_lotes(ler_arestas(caminho_arestas), tamanho_lote):
+        estatisticas["arestas"] += grafo.adicionar_arestas(lote)
+    estatisticas["segundos_arestas"] = time.perf_counter() - inicio
+    return grafo, estatisticas
+
+
+def imprimir_carga(estatisticas):
+    for chave, nome in (("nodos", "Nós"), ("arestas", "Arestas")):
+        quantidade = estatisticas[chave]
+        segundos = estatisticas[f"segundos_{chave}"]
+        ritmo = quantidade / segundos if segundos > 0 else float('inf')
+        print(f"{nome}: {quantidade} em {segundos:.3f} s ({ritmo:,.0f}/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carrega um grafo de ficheiros JSON Lines ou CSV e mede o ritmo de carga.")
+    parser.add_argument("nodos", help="ficheiro de nós (.jsonl ou .csv)")
+    parser.add_argument("arestas", help="ficheiro de arestas (.jsonl ou .csv)")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE)
+    args = parser.parse_args()
+
+    _, estatisticas = carregar(args.nodos, args.arestas, tamanho_lote=args.lote)
+    imprimir_carga(estatisticas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import math
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional; sem ele usa-se o cálculo escalar
+    np = None
+
+RAIO_TERRA = 6371
+
+
+def haversine(coordenadas1, coordenadas2):
+    """
+    Distância em km (fórmula de haversine) entre dois pares (latitude, longitude).
+    """
+    lat1, lon1 = map(math.radians, coordenadas1)
+    lat2, lon2 = map(math.radians, coordenadas2)
+
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = math.sin(dlat / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2)**2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+    return RAIO_TERRA * c
+
+
+def haversine_lote(origens, destinos):
+    """
+    Distâncias em km entre pares de coordenadas (duas listas alinhadas), num só lote.
+    """
+    if np is None:
+        return [haversine(c1, c2) for c1, c2 in zip(origens, destinos)]
+
+    if not origens:
+        return []
+    c1 = np.radians(np.asarray(origens, dtype=float))
+    c2 = np.radians(np.asarray(destinos, dtype=float))
+    lat1, lon1 = c1[:, 0], c1[:, 1]
+    lat2, lon2 = c2[:, 0], c2[:, 1]
+
+    a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return (RAIO_TERRA * c).tolist()
+
+
+class MatrizDistancias:
+    """
+    Cache das distâncias de haversine entre todas as localidades do grafo.
+
+    Os nós novos ficam pendentes e são calculados num único lote (vetorizado
+    com numpy quando disponível) no primeiro pedido seguinte de uma linha; a
+    partir daí cada consulta é apenas uma indexação. Uma distância a um nó
+    ainda pendente é calculada sozinha, pelo que construir o grafo
+    intercalando nós e arestas não calcula linhas. A matriz cresce sem ser
+    copiada a cada lote (linhas estendidas, ou com numpy um buffer cuja
+    capacidade duplica). Em grafos com mais de
+    LIMITE_MATRIZ_COMPLETA nós a matriz completa não cabe em memória, por isso
+    calcula-se (também em lote) apenas a linha de cada origem consultada.
+    """
+
+    LIMITE_MATRIZ_COMPLETA = 2048
+    LIMITE_LINHAS = 4096
+
+    def __init__(self):
+        self.m_indices = {}
+        self.m_coordenadas = []
+        self.m_pendentes = []
+        self.m_matriz = None
+        # Com numpy, m_matriz é a vista n x n de um buffer com capacidade para mais nós
+        self.m_buffer = None
+        self.m_radianos = None
+        self.m_linhas = {}
+
+    def __len__(self):
+        return len(self.m_coordenadas)
+
+    def adicionar(self, nodo, coordenadas):
+        """
+        Regista (ou atualiza) as coordenadas de um nó. O cálculo fica adiado.
+        """
+        indice = self.m_indices.get(nodo)
+        if indice is None:
+            self.m_indices[nodo] = len(self.m_coordenadas)
+            self.m_coordenadas.append(coordenadas)
+            self.m_pendentes.append(len(self.m_coordenadas) - 1)
+        elif self.m_coordenadas[indice] is not coordenadas:
+            self.m_coordenadas[indice] = coordenadas
+            self._invalidar()
+
+    def distancia(self, nodo1, coordenadas1, nodo2, coordenadas2):
+        """
+        Distância em km entre dois nós. As coordenadas são passadas para
+        detetar nós novos ou coordenadas alteradas diretamente em m_nodos.
+        """
+        i = self.m_indices.get(nodo1)
+        if i is None or self.m_coordenadas[i] is not coordenadas1:
+            self.adicionar(nodo1, coordenadas1)
+            i = self.m_indices[nodo1]
+        j = self.m_indices.get(nodo2)
+        if j is None or self.m_coordenadas[j] is not coordenadas2:
+            self.adicionar(nodo2, coordenadas2)
+            j = self.m_indices[nodo2]
+
+        matriz = self.m_matriz
+        if matriz is not None and i < len(matriz) and j < len(matriz):
+            return matriz[i][j]
+
+        # Nós pendentes ou grafos grandes: usa uma linha já calculada ou o cálculo escalar
+        linha = self.m_linhas.get(i)
+        if linha is not None and j < len(linha):
+            return linha[j]
+        return haversine(coordenadas1, coordenadas2)
+
+    def linha(self, i):
+        """
+        Distâncias do nó de índice i a todos os outros (indexável por índice).
+        """
+        if self.m_pendentes:
+            self._processar_pendentes()
+
+        if self.m_matriz is not None:
+            return self.m_matriz[i]
+
+        linha = self.m_linhas.get(i)
+        if linha is None:
+            if len(self.m_linhas) >= self.LIMITE_LINHAS:
+                self.m_linhas.clear()
+            linha = self._calcular_bloco([i], range(len(self.m_coordenadas)))[0]
+            self.m_linhas[i] = linha
+        return linha
+
+    def _invalidar(self):
+        self.m_matriz = None
+        self.m_buffer = None
+        self.m_radianos = None
+        self.m_linhas.clear()
+        self.m_pendentes = list(range(len(self.m_coordenadas)))
+
+    def _processar_pendentes(self):
+        novos = self.m_pendentes
+        self.m_pendentes = []
+        n = len(self.m_coordenadas)
+        self.m_linhas.clear()
+        self.m_radianos = None
+
+        if n > self.LIMITE_MATRIZ_COMPLETA:
+            self.m_matriz = None
+            self.m_buffer = None
+            return
+
+        if self.m_matriz is None or len(novos) * 2 > n:
+            self.m_matriz = self._calcular_bloco(range(n), range(n))
+            if np is not None:
+                self.m_buffer = self.m_matriz
+            return
+
+        # Apenas as linhas dos nós novos; a matriz é simétrica
+        bloco = self._calcular_bloco(novos, range(n))
+        antigo = len(self.m_matriz)
+        if np is None:
+            for i, linha in enumerate(self.m_matriz):
+                linha.extend(bloco[k][i] for k in range(len(novos)))
+            self.m_matriz.extend(bloco)
+            return
+
+        if n > len(self.m_buffer):
+            capacidade = min(max(2 * len(self.m_buffer), n), self.LIMITE_MATRIZ_COMPLETA)
+            buffer = np.empty((capacidade, capacidade))
+            buffer[:antigo, :antigo] = self.m_matriz
+            self.m_buffer = buffer
+        self.m_buffer[antigo:n, :n] = bloco
+        self.m_buffer[:n, antigo:n] = bloco.T
+        self.m_matriz = self.m_buffer[:n, :n]
+
+    def _calcular_bloco(self, origens, destinos):
+        origens = list(origens)
+        destinos = list(destinos)
+
+        if np is None:
+            bloco = []
+            for i in origens:
+                c1 = self.m_coordenadas[i]
+                bloco.append([
+                    haversine(c1, self.m_coordenadas[j]) if c1 and self.m_coordenadas[j] else float('nan')
+                    for j in destinos
+                ])
+            return bloco
+
+        if self.m_radianos is None:
+            coordenadas = np.array(
+                [c if c else (np.nan, np.nan) for c in self.m_coordenadas], dtype=float
+            ).reshape(-1, 2)
+            self.m_radianos = np.radians(coordenadas)
+        radianos = self.m_radianos
+        lat1 = radianos[origens, 0][:, None]
+        lon1 = radianos[origens, 1][:, None]
+        lat2 = radianos[destinos, 0][None, :]
+        lon2 = radianos[destinos, 1][None, :]
+
+        a = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2)**2
+        c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+        return RAIO_TERRA * c
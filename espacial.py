@@ -0,0 +1,218 @@
+import heapq
+import math
+from array import array
+from distancias import haversine, RAIO_TERRA
+
+
+class IndiceEspacial:
+    """
+    Índice espacial das coordenadas (latitude, longitude) dos nós, numa grelha
+    uniforme guardada num dicionário célula -> nós.
+
+    As inserções são incrementais; quando o número de pontos duplica, a
+    grelha é refeita com células de lado ajustado para cerca de
+    PONTOS_POR_CELULA pontos por célula (e com a mesma largura em km nos dois
+    eixos, à latitude média). As consultas percorrem anéis de células à volta
+    do ponto e param quando o limite inferior da distância aos anéis por
+    visitar já não melhora o resultado; as distâncias são de haversine, como
+    em MatrizDistancias. Não trata a passagem da longitude 180°.
+    """
+
+    PONTOS_POR_CELULA = 4
+
+    def __init__(self):
+        self.m_nomes = []
+        self.m_indices = {}
+        self.m_latitudes = array('d')
+        self.m_longitudes = array('d')
+        self.m_celulas = {}
+        self.m_altura = 1.0
+        self.m_largura = 1.0
+        self.m_limites = None
+        self.m_proxima_reconstrucao = 64
+
+    def __len__(self):
+        return len(self.m_indices)
+
+    def __contains__(self, nodo):
+        return nodo in self.m_indices
+
+    def inserir(self, nodo, coordenadas):
+        """
+        Insere um nó (ou atualiza as suas coordenadas).
+        """
+        latitude, longitude = coordenadas
+        i = self.m_indices.get(nodo)
+        if i is not None:
+            self.m_celulas[self._celula(self.m_latitudes[i], self.m_longitudes[i])].remove(i)
+            self.m_latitudes[i] = latitude
+            self.m_longitudes[i] = longitude
+        else:
+            i = len(self.m_nomes)
+            self.m_indices[nodo] = i
+            self.m_nomes.append(nodo)
+            self.m_latitudes.append(latitude)
+            self.m_longitudes.append(longitude)
+            if len(self.m_nomes) >= self.m_proxima_reconstrucao:
+                self._reconstruir()
+                return
+        self._colocar(i)
+
+    def inserir_lote(self, itens):
+        """
+        Insere vários pares (nodo, coordenadas), com no máximo uma
+        reconstrução da grelha no fim.
+        """
+        novos = []
+        for nodo, coordenadas in itens:
+            if nodo in self.m_indices:
+                self.inserir(nodo, coordenadas)
+                continue
+            latitude, longitude = coordenadas
+            self.m_indices[nodo] = len(self.m_nomes)
+            novos.append(len(self.m_nomes))
+            self.m_nomes.append(nodo)
+            self.m_latitudes.append(latitude)
+            self.m_longitudes.append(longitude)
+        if len(self.m_nomes) >= self.m_proxima_reconstrucao:
+            self._reconstruir()
+        else:
+            for i in novos:
+                self._colocar(i)
+
+    def mais_proximos(self, coordenadas, k=1, filtro=None):
+        """
+        Os k nós mais próximos das coordenadas.
+
+        Args:
+            filtro: Opcional; função nó -> bool que os nós têm de cumprir
+
+        Returns:
+            list: [(nodo, distância em km)] por ordem crescente de distância
+        """
+        if k <= 0 or not self.m_celulas:
+            return []
+        latitude, longitude = coordenadas
+        ci, cj = self._celula(latitude, longitude)
+        nomes = self.m_nomes
+
+        # Max-heap dos k melhores: (-distância, -índice)
+        melhores = []
+        raio = 0
+        while True:
+            for i in self._anel(ci, cj, raio):
+                if filtro is not None and not filtro(nomes[i]):
+                    continue
+                d = haversine(coordenadas, (self.m_latitudes[i], self.m_longitudes[i]))
+                if len(melhores) < k:
+                    heapq.heappush(melhores, (-d, -i))
+                elif (d, i) < (-melhores[0][0], -melhores[0][1]):
+                    heapq.heapreplace(melhores, (-d, -i))
+            if self._cobre_tudo(ci, cj, raio):
+                break
+            if len(melhores) == k and -melhores[0][0] <= self._limite_anel(latitude, longitude, ci, cj, raio):
+                break
+            raio += 1
+
+        return [(nomes[-i], -d) for d, i in sorted(melhores, reverse=True)]
+
+    def no_raio(self, coordenadas, raio_km, filtro=None):
+        """
+        Nós a no máximo raio_km das coordenadas.
+
+        Returns:
+            list: [(nodo, distância em km)] por ordem crescente de distância
+        """
+        if raio_km < 0 or not self.m_celulas:
+            return []
+        latitude, longitude = coordenadas
+        angulo = raio_km / RAIO_TERRA
+        dlat = math.degrees(angulo)
+        seno = math.sin(min(angulo, math.pi / 2)) / max(math.cos(math.radians(latitude)), 1e-12)
+
+        i_min, j_min, i_max, j_max = self.m_limites
+        i0, j0 = self._celula(latitude - dlat, longitude)
+        i1, j1 = self._celula(latitude + dlat, longitude)
+        if seno >= 1:
+            # O círculo cobre um polo: todas as longitudes estão a menos de raio_km
+            j0, j1 = j_min, j_max
+        else:
+            dlon = math.degrees(math.asin(seno))
+            j0 = self._celula(latitude, longitude - dlon)[1]
+            j1 = self._celula(latitude, longitude + dlon)[1]
+        resultado = []
+        for ci in range(max(i0, i_min), min(i1, i_max) + 1):
+            for cj in range(max(j0, j_min), min(j1, j_max) + 1):
+                for i in self.m_celulas.get((ci, cj), ()):
+                    if filtro is not None and not filtro(self.m_nomes[i]):
+                        continue
+                    d = haversine(coordenadas, (self.m_latitudes[i], self.m_longitudes[i]))
+                    if d <= raio_km:
+                        resultado.append((d, i))
+        resultado.sort()
+        return [(self.m_nomes[i], d) for d, i in resultado]
+
+    def _celula(self, latitude, longitude):
+        return math.floor(latitude / self.m_altura), math.floor(longitude / self.m_largura)
+
+    def _colocar(self, i):
+        ci, cj = celula = self._celula(self.m_latitudes[i], self.m_longitudes[i])
+        self.m_celulas.setdefault(celula, []).append(i)
+        if self.m_limites is None:
+            self.m_limites = (ci, cj, ci, cj)
+        else:
+            i_min, j_min, i_max, j_max = self.m_limites
+            self.m_limites = (min(i_min, ci), min(j_min, cj), max(i_max, ci), max(j_max, cj))
+
+    def _reconstruir(self):
+        n = len(self.m_nomes)
+        latitudes, longitudes = self.m_latitudes, self.m_longitudes
+        altura_total = max(max(latitudes) - min(latitudes), 1e-9)
+        cosseno = max(math.cos(math.radians((max(latitudes) + min(latitudes)) / 2)), 1e-3)
+        largura_total = max((max(longitudes) - min(longitudes)) * cosseno, 1e-9)
+
+        # Células quadradas em km com cerca de PONTOS_POR_CELULA pontos cada
+        lado = math.sqrt(altura_total * largura_total * self.PONTOS_POR_CELULA / n)
+        self.m_altura = lado
+        self.m_largura = lado / cosseno
+        self.m_celulas = {}
+        self.m_limites = None
+        for i in range(n):
+            self._colocar(i)
+        self.m_proxima_reconstrucao = 2 * n
+
+    def _anel(self, ci, cj, raio):
+        """
+        Pontos das células à distância (de Chebyshev) raio da célula (ci, cj),
+        dentro dos limites ocupados.
+        """
+        celulas = self.m_celulas
+        i_min, j_min, i_max, j_max = self.m_limites
+        if raio == 0:
+            yield from celulas.get((ci, cj), ())
+            return
+        for i in (ci - raio, ci + raio):
+            if i_min <= i <= i_max:
+                for j in range(max(cj - raio, j_min), min(cj + raio, j_max) + 1):
+                    yield from celulas.get((i, j), ())
+        for j in (cj - raio, cj + raio):
+            if j_min <= j <= j_max:
+                for i in range(max(ci - raio + 1, i_min), min(ci + raio - 1, i_max) + 1):
+                    yield from celulas.get((i, j), ())
+
+    def _cobre_tudo(self, ci, cj, raio):
+        i_min, j_min, i_max, j_max = self.m_limites
+        return ci - raio <= i_min and ci + raio >= i_max and cj - raio <= j_min and cj + raio >= j_max
+
+    def _limite_anel(self, latitude, longitude, ci, cj, raio):
+        """
+        Limite inferior da distância (km) a qualquer ponto fora dos anéis 0..raio.
+        """
+        folga_lat = min(latitude - (ci - raio) * self.m_altura, (ci + raio + 1) * self.m_altura - latitude)
+        folga_lon = min(longitude - (cj - raio) * self.m_largura, (cj + raio + 1) * self.m_largura - longitude)
+        # Uma diferença de latitude dá pelo menos o arco de meridiano; uma de
+        # longitude, pelo menos a distância ao meridiano que fica a essa diferença
+        limite_lat = RAIO_TERRA * math.radians(folga_lat)
+        seno = math.cos(math.radians(latitude)) * math.sin(min(math.radians(folga_lon), math.pi / 2))
+        limite_lon = RAIO_TERRA * math.asin(min(max(seno, 0), 1))
+        return min(limite_lat, limite_lon)
@@ -0,0 +1,199 @@
+from missao import MatrizMissao, INFINITO
+
+# Tempo de descarga em cada entrega (horas), como em MotorProcura.confirmar_rota
+TEMPO_ENTREGA = 0.5
+
+
+class DespachoFrota:
+    """
+    Distribui as entregas por uma frota de veículos que partem todos do mesmo
+    ponto ao mesmo tempo, minimizando o makespan (a hora a que o último
+    veículo acaba) e, em empate, o tempo total.
+
+    Há uma MatrizMissao por classe de transporte (veículos iguais partilham-na),
+    pelo que a acessibilidade, o clima e o alcance de cada classe já estão nos
+    custos: uma entrega sem caminho para a classe nunca lhe é atribuída. Cada
+    veículo faz uma só viagem (aberta) com a carga que leva à partida.
+
+    A atribuição é um leilão com arrependimento (regret): em cada ronda cada
+    veículo licita por cada entrega pendente com a hora a que acabaria se a
+    inserisse na melhor posição da sua rota, e é atribuída a entrega com maior
+    diferença entre a melhor e a segunda melhor licitação. Depois, enquanto
+    baixar o makespan, as entregas do veículo crítico são mudadas para outros
+    veículos e cada rota é melhorada com 2-opt.
+    """
+
+    def __init__(self, grafo, partida, entregas, veiculos):
+        if not veiculos:
+            raise ValueError("A frota não tem veículos.")
+        self.m_veiculos = list(veiculos)
+        self.m_demandas = {}
+        for nodo in entregas:
+            alimentos = grafo.m_nodos[nodo].get("alimentos", 0)
+            if alimentos > 0 and nodo != partida:
+                self.m_demandas[nodo] = alimentos
+
+        matrizes = {}
+        self.m_matrizes = []
+        for veiculo in self.m_veiculos:
+            chave = (type(veiculo), veiculo.velocidade, veiculo.deposito)
+            if chave not in matrizes:
+                matrizes[chave] = MatrizMissao(grafo, partida, list(self.m_demandas), veiculo)
+            self.m_matrizes.append(matrizes[chave])
+
+    def planear(self, max_movimentos=1000):
+        """
+        Returns:
+            dict: plano de cada veículo (transporte, entregas, carga,
+            distância, tempo, caminho), makespan, distância e tempo totais e
+            entregas não atribuídas
+        """
+        rotas = [[] for _ in self.m_veiculos]
+        cargas = [0] * len(self.m_veiculos)
+        pendentes = list(self.m_demandas)
+        nao_atribuidas = []
+
+        while pendentes:
+            escolha = None
+            for nodo in pendentes:
+                licitacoes = sorted(
+                    (fim, v, posicao)
+                    for v in range(len(self.m_veiculos))
+                    if cargas[v] + self.m_demandas[nodo] <= self.m_veiculos[v].capacidade
+                    for fim, posicao in [self._melhor_insercao(v, rotas[v], nodo)]
+                    if fim < INFINITO
+                )
+                if not licitacoes:
+                    continue
+                arrependimento = licitacoes[1][0] - licitacoes[0][0] if len(licitacoes) > 1 else INFINITO
+                chave = (-arrependimento, licitacoes[0][0])
+                if escolha is None or chave < escolha[0]:
+                    escolha = (chave, nodo, licitacoes[0])
+            if escolha is None:
+                nao_atribuidas.extend(pendentes)
+                break
+            _, nodo, (_, v, posicao) = escolha
+            rotas[v].insert(posicao, nodo)
+            cargas[v] += self.m_demandas[nodo]
+            pendentes.remove(nodo)
+
+        self._melhorar(rotas, cargas, max_movimentos)
+
+        planos = []
+        for v, (veiculo, rota) in enumerate(zip(self.m_veiculos, rotas)):
+            matriz = self.m_matrizes[v]
+            distancia, tempo, caminho = matriz.percorrer([matriz.indice(nodo) for nodo in rota])
+            planos.append({
+                "transporte": veiculo.nome,
+                "entregas": list(rota),
+                "carga": cargas[v],
+                "distancia": distancia,
+                "tempo": tempo + TEMPO_ENTREGA * len(rota),
+                "caminho": caminho if rota else [],
+            })
+        return {
+            "veiculos": planos,
+            "makespan": max(plano["tempo"] for plano in planos),
+            "distancia": sum(plano["distancia"] for plano in planos),
+            "tempo": sum(plano["tempo"] for plano in planos),
+            "nao_atribuidas": nao_atribuidas,
+        }
+
+    def _tempo(self, v, rota):
+        """
+        Hora a que o veículo v acaba a rota (viagem mais descargas).
+        """
+        matriz = self.m_matrizes[v]
+        tempo = TEMPO_ENTREGA * len(rota)
+        anterior = 0
+        for nodo in rota:
+            i = matriz.indice(nodo)
+            tempo += matriz.tempo(anterior, i)
+            anterior = i
+        return tempo
+
+    def _melhor_insercao(self, v, rota, nodo):
+        """
+        Melhor posição para inserir o nó na rota do veículo v.
+
+        Returns:
+            tuple: (hora de fim com o nó inserido, posição)
+        """
+        matriz = self.m_matrizes[v]
+        pontos = [0] + [matriz.indice(n) for n in rota]
+        j = matriz.indice(nodo)
+        base = self._tempo(v, rota) + TEMPO_ENTREGA
+        melhor = (INFINITO, len(rota))
+        for posicao in range(len(rota) + 1):
+            anterior = pontos[posicao]
+            acrescimo = matriz.tempo(anterior, j)
+            if posicao < len(rota):
+                seguinte = pontos[posicao + 1]
+                acrescimo += matriz.tempo(j, seguinte) - matriz.tempo(anterior, seguinte)
+            if base + acrescimo < melhor[0]:
+                melhor = (base + acrescimo, posicao)
+        return melhor
+
+    def _melhorar(self, rotas, cargas, max_movimentos):
+        for _ in range(max_movimentos):
+            for v, rota in enumerate(rotas):
+                self._dois_opt(v, rota)
+            if not self._relocalizar(rotas, cargas):
+                break
+
+    def _dois_opt(self, v, rota):
+        tempo = self._tempo(v, rota)
+        melhorou = True
+        while melhorou:
+            melhorou = False
+            for i in range(len(rota) - 1):
+                for j in range(i + 1, len(rota)):
+                    nova = rota[:i] + rota[i:j + 1][::-1] + rota[j + 1:]
+                    tempo_nova = self._tempo(v, nova)
+                    if tempo_nova < tempo - 1e-9:
+                        rota[:] = nova
+                        tempo = tempo_nova
+                        melhorou = True
+
+    def _relocalizar(self, rotas, cargas):
+        """
+        Passa uma entrega do veículo crítico para outro se o makespan (ou, em
+        empate, o tempo total) baixar; devolve True se o fez.
+        """
+        tempos = [self._tempo(v, rota) for v, rota in enumerate(rotas)]
+        critico = max(range(len(rotas)), key=lambda v: (tempos[v], -v))
+        makespan = tempos[critico]
+        total = sum(tempos)
+        for k, nodo in enumerate(rotas[critico]):
+            restante = rotas[critico][:k] + rotas[critico][k + 1:]
+            tempo_restante = self._tempo(critico, restante)
+            outros = max((tempos[v] for v in range(len(rotas)) if v != critico), default=0)
+            for v in range(len(rotas)):
+                if v == critico or cargas[v] + self.m_demandas[nodo] > self.m_veiculos[v].capacidade:
+                    continue
+                fim, posicao = self._melhor_insercao(v, rotas[v], nodo)
+                novo_makespan = max(outros, tempo_restante, fim)
+                novo_total = total - tempos[critico] - tempos[v] + tempo_restante + fim
+                if novo_makespan < makespan - 1e-9 or (
+                    novo_makespan < makespan + 1e-9 and novo_total < total - 1e-9
+                ):
+                    rotas[critico][:] = restante
+                    rotas[v].insert(posicao, nodo)
+                    cargas[critico] -= self.m_demandas[nodo]
+                    cargas[v] += self.m_demandas[nodo]
+                    return True
+        return False
+
+
+def imprimir_despacho(plano):
+    print("[Despacho da frota]")
+    for n, veiculo in enumerate(plano["veiculos"], 1):
+        if veiculo["entregas"]:
+            print(f"Veículo {n} ({veiculo['transporte']}): {' -> '.join(veiculo['entregas'])} "
+                  f"[{veiculo['carga']} kg, {veiculo['distancia']:.2f} km, {veiculo['tempo']:.2f} h]")
+        else:
+            print(f"Veículo {n} ({veiculo['transporte']}): sem entregas")
+    print(f"Makespan: {plano['makespan']:.2f} h, distância total: {plano['distancia']:.2f} km, "
+          f"tempo total: {plano['tempo']:.2f} h")
+    if plano["nao_atribuidas"]:
+        print(f"Não atribuídas: {', '.join(plano['nao_atribuidas'])}")
@@ -1,15 +1,29 @@
 import sys
 from transporte import Carro, Mota, Helicoptero, Drone
 sys.path.append(".")
-import math
 import os
 import json
 import subprocess
 import platform
-import heapq
-import networkx as nx
-import matplotlib.pyplot as plt
+import weakref
+from collections import deque
+from distancias import MatrizDistancias, haversine_lote
+from espacial import IndiceEspacial
+from tempos import TabelaTempos, perfil_clima, tempo_viagem
+from alcance import IndiceAlcance
+from marcos import TabelaMarcos
+from hierarquia import HierarquiaContracao, TopologiaContracao
+from caminhos import RegistoCaminhos
+from replaneamento import PlaneadorIncremental
+from grafo_compilado import GrafoCompilado
+from binario import guardar_binario, abrir_binario
+from sobreposicao import NodosSobrepostos
+from procura import MotorProcura, BFS, DFS, A_ESTRELA, GULOSA, CUSTO_UNIFORME, BIDIRECIONAL, MULTI_OBJETIVO, RECURSOS, COMBUSTIVEL
 import  transporte as tr
+
+# Atributos do nó de destino que entram em calcular_peso
+ATRIBUTOS_PESO = ("prioridade", "acessibilidade", "clima")
+
 class Grafo:
     
     def __init__(self, direcionado=True):
@@ -17,11 +31,38 @@ class Grafo:
         self.m_direcionado = direcionado
         self.m_grafo = {}
         self.m_h = {}
+        # Destino -> [(origem, posição em m_grafo[origem])] das arestas com peso calculado
+        self.m_entradas = {}
+        self.m_distancias = MatrizDistancias()
+        self.m_indice_espacial = IndiceEspacial()
+        self.m_tabelas_tempo = {}
+        self.m_indices_alcance = {}
+        self.m_tabelas_marcos = {}
+        self.m_hierarquias = {}
+        # Planeadores incrementais avisados das alterações de atributos (ver planeador_incremental)
+        self.m_planeadores = weakref.WeakSet()
+        self.m_topologia_contracao = None
+        self.m_versao = 0
+        self.m_compilado = None
+
+    def __getstate__(self):
+        # Os planeadores registados pertencem ao processo que os criou e não são serializados
+        estado = dict(self.__dict__)
+        del estado["m_planeadores"]
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self.m_planeadores = weakref.WeakSet()
 
     def adicionar_nodo(self, nodo, atributos=None):
         if nodo not in self.m_nodos:
             self.m_nodos[nodo] = atributos if atributos else {}
             self.m_grafo[nodo] = []
+            self.m_distancias.adicionar(nodo, self.m_nodos[nodo].get("coordenadas"))
+            if self.m_nodos[nodo].get("coordenadas"):
+                self.m_indice_espacial.inserir(nodo, self.m_nodos[nodo]["coordenadas"])
+            self.m_versao += 1
 
     def adicionar_aresta(self, origem, destino, peso=None):
         if origem not in self.m_nodos:
@@ -32,12 +73,76 @@ class Grafo:
 
         if peso is None:
             peso = self.calcular_peso(origem, destino)
+            self.m_entradas.setdefault(destino, []).append((origem, len(self.m_grafo[origem])))
 
         self.m_grafo[origem].append((destino, peso))
+        self.m_versao += 1
+
+    def adicionar_nodos(self, nodos):
+        """
+        Carga em lote de nós: pares (nodo, atributos). Os nós que já existem
+        são ignorados, como em adicionar_nodo.
+        """
+        novos = 0
+        espaciais = []
+        for nodo, atributos in nodos:
+            if nodo in self.m_nodos:
+                continue
+            self.m_nodos[nodo] = atributos if atributos else {}
+            self.m_grafo[nodo] = []
+            coordenadas = self.m_nodos[nodo].get("coordenadas")
+            self.m_distancias.adicionar(nodo, coordenadas)
+            if coordenadas:
+                espaciais.append((nodo, coordenadas))
+            novos += 1
+        self.m_indice_espacial.inserir_lote(espaciais)
+        if novos:
+            self.m_versao += 1
+        return novos
+
+    def adicionar_arestas(self, arestas):
+        """
+        Carga em lote de arestas: tuplos (origem, destino) ou (origem, destino,
+        peso). Os pesos em falta são calculados como em calcular_peso, mas com
+        as distâncias de todo o lote num só cálculo (haversine_lote). O lote é
+        validado antes de ser aplicado.
+        """
+        arestas = [(a[0], a[1], a[2] if len(a) > 2 else None) for a in arestas]
+        nodos = self.m_nodos
+        for origem, destino, _ in arestas:
+            if origem not in nodos:
+                raise ValueError(f"Nó '{origem}' não existe no grafo.")
+            if destino not in nodos:
+                raise ValueError(f"Nó '{destino}' não existe no grafo.")
+
+        calcular = [(origem, destino) for origem, destino, peso in arestas if peso is None]
+        coordenadas = []
+        for origem, destino in calcular:
+            coordenadas_origem = nodos[origem].get("coordenadas")
+            coordenadas_destino = nodos[destino].get("coordenadas")
+            if not coordenadas_origem or not coordenadas_destino:
+                raise ValueError(f"Faltam coordenadas para os nós {origem} ou {destino}.")
+            coordenadas.append((coordenadas_origem, coordenadas_destino))
+        distancias = iter(haversine_lote([c[0] for c in coordenadas], [c[1] for c in coordenadas]))
+
+        for origem, destino, peso in arestas:
+            if peso is None:
+                peso = self._peso(next(distancias), nodos[destino])
+                self.m_entradas.setdefault(destino, []).append((origem, len(self.m_grafo[origem])))
+            self.m_grafo[origem].append((destino, peso))
+        if arestas:
+            self.m_versao += 1
+        return len(arestas)
 
     def calcular_peso(self, origem, destino):
-        atributos_destino = self.m_nodos.get(destino)
-        distancia = self.calcular_distancia(origem, destino)
+        return self._peso(self.calcular_distancia(origem, destino), self.m_nodos.get(destino))
+
+    @staticmethod
+    def _peso(distancia, atributos_destino):
+        """
+        Peso de uma aresta com a distância dada até um nó com estes atributos
+        (usado por calcular_peso e pela carga em lote de adicionar_arestas).
+        """
         prioridade = atributos_destino.get("prioridade", 1)
         acessibilidade = atributos_destino.get("acessibilidade", 1)
         clima = atributos_destino.get("clima", 1)
@@ -52,18 +157,71 @@ class Grafo:
         if not coordenadas1 or not coordenadas2:
             raise ValueError(f"Faltam coordenadas para os nós {nodo1} ou {nodo2}.")
 
-        lat1, lon1 = map(math.radians, coordenadas1)
-        lat2, lon2 = map(math.radians, coordenadas2)
+        return self.m_distancias.distancia(nodo1, coordenadas1, nodo2, coordenadas2)
 
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = math.sin(dlat / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        R = 6371
+    def nodos_proximos(self, origem, k=1, **atributos):
+        """
+        Os k nós mais próximos em linha reta de um nó ou de coordenadas, só
+        entre os que têm os atributos indicados (ex.: reabastecimento=True).
 
-        return R * c
+        Returns:
+            list: [(nodo, distância em km)] por ordem crescente de distância
+        """
+        coordenadas, excluir = self._coordenadas_consulta(origem)
+        filtro = self._filtro_atributos(atributos, excluir)
+        return self.m_indice_espacial.mais_proximos(coordenadas, k, filtro)
+
+    def nodos_no_raio(self, origem, raio, **atributos):
+        """
+        Nós a no máximo raio km em linha reta de um nó ou de coordenadas, só
+        entre os que têm os atributos indicados.
+
+        Returns:
+            list: [(nodo, distância em km)] por ordem crescente de distância
+        """
+        coordenadas, excluir = self._coordenadas_consulta(origem)
+        filtro = self._filtro_atributos(atributos, excluir)
+        return self.m_indice_espacial.no_raio(coordenadas, raio, filtro)
+
+    def _coordenadas_consulta(self, origem):
+        # Nó (excluído do resultado) ou par (latitude, longitude)
+        if isinstance(origem, str):
+            if origem not in self.m_nodos:
+                raise ValueError(f"Nó '{origem}' não existe no grafo.")
+            coordenadas = self._ler_atributos(origem).get("coordenadas")
+            if not coordenadas:
+                raise ValueError(f"Faltam coordenadas para o nó {origem}.")
+            return coordenadas, origem
+        return origem, None
+
+    def _filtro_atributos(self, atributos, excluir=None):
+        if not atributos and excluir is None:
+            return None
+        ler = self._ler_atributos
+        itens = list(atributos.items())
+        return lambda nodo: nodo != excluir and all(ler(nodo).get(chave) == valor for chave, valor in itens)
+
+    def _ler_atributos(self, nodo):
+        return self.m_nodos[nodo]
+
+    def _escrever_atributos(self, nodo):
+        """
+        Dicionário de atributos de um nó onde escrever (num snapshot, a sua cópia própria).
+        """
+        return self.m_nodos[nodo]
+
+    def snapshot(self):
+        """
+        Snapshot copy-on-write do grafo (ver GrafoSnapshot): criado em O(1),
+        as procuras podem alterá-lo sem afetar este grafo.
+        """
+        return GrafoSnapshot(self)
 
     def desenha(self):
+        # Importados só aqui, para que as procuras não paguem o arranque do networkx e do matplotlib
+        import networkx as nx
+        import matplotlib.pyplot as plt
+
         g = nx.DiGraph() if self.m_direcionado else nx.Graph()
 
         for nodo, atributos in self.m_nodos.items():
@@ -93,17 +251,42 @@ class Grafo:
         plt.show()
 
     def atualizar_atributos(self, nodo, prioridade, clima=None, acessibilidade=None, alimentos=None):
-        if nodo not in self.m_nodos:
-            raise ValueError(f"Localidade '{nodo}' não existe no grafo.")
+        atributos = {
+            "prioridade": prioridade,
+            "clima": clima,
+            "acessibilidade": acessibilidade,
+            "alimentos": alimentos,
+        }
+        self.atualizar_lote({nodo: {chave: valor for chave, valor in atributos.items() if valor is not None}})
+
+    def atualizar_lote(self, alteracoes):
+        """
+        Aplica várias alterações de atributos de uma vez.
+
+        Args:
+            alteracoes: dict (ou iterável de pares) nodo -> {atributo: valor}
+
+        Returns:
+            int: Número de arestas cujo peso foi recalculado
+        """
+        if isinstance(alteracoes, dict):
+            alteracoes = alteracoes.items()
+        alteracoes = list(alteracoes)
+
+        for nodo, _ in alteracoes:
+            if nodo not in self.m_nodos:
+                raise ValueError(f"Localidade '{nodo}' não existe no grafo.")
+
+        # Junta as alterações de cada nó para propagar (e repesar) uma só vez
+        alterados = {}
+        for nodo, atributos in alteracoes:
+            self._escrever_atributos(nodo).update(atributos)
+            alterados.setdefault(nodo, set()).update(atributos)
 
-        if prioridade is not None:
-            self.m_nodos[nodo]["prioridade"] = prioridade
-        if clima is not None:
-            self.m_nodos[nodo]["clima"] = clima
-        if acessibilidade is not None:
-            self.m_nodos[nodo]["acessibilidade"] = acessibilidade
-        if alimentos is not None:
-            self.m_nodos[nodo]["alimentos"] = alimentos
+        repesadas = 0
+        for nodo, chaves in alterados.items():
+            repesadas += self._atributos_alterados(nodo, *chaves)
+        return repesadas
 
     @staticmethod
     def escolher_transporte(acessibilidade):
@@ -129,10 +312,9 @@ class Grafo:
                 f"Coordenadas ausentes para calcular a distância entre '{origem}' e '{destino}'."
             )
 
-        lat1, lon1 = coordenadas_origem
-        lat2, lon2 = coordenadas_destino
-
-        distancia = Grafo.calcular_distancia(lat1, lon1, lat2, lon2)
+        distancia = self.m_distancias.distancia(origem, coordenadas_origem, destino, coordenadas_destino)
+        print(f"Distância entre '{origem}' e '{destino}': {distancia:.2f} km")
+        return distancia
 
     def heuristica_grafo(self):
         if not self.m_nodos:
@@ -153,21 +335,11 @@ class Grafo:
         if not coordenadas_nodo or not coordenadas_objetivo:
             return float('inf')
 
-        lat1, lon1 = coordenadas_nodo
-        lat2, lon2 = coordenadas_objetivo
-
-        lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = math.sin(dlat / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        R = 6371
-        return R * c
+        return self.m_distancias.distancia(nodo, coordenadas_nodo, objetivo, coordenadas_objetivo)
 
     def imprimir_stats_nodos(self, filename="stats_nodos.json"):
         with open(filename, "w") as file:
-            json.dump(self.m_nodos, file, indent=4)
+            json.dump(dict(self.m_nodos.items()), file, indent=4)
         print(f"Estatísticas dos nós foram salvas em '{filename}'")
         
         sistema = platform.system()
@@ -185,80 +357,53 @@ class Grafo:
             
     def encontrar_caminho(self, inicio, objetivo):
         visitados = set()
-        fila = [(inicio, [inicio])]
+        caminhos = RegistoCaminhos()
+        fila = deque([(inicio, caminhos.registar(inicio))])
 
         while fila:
-            atual, caminho = fila.pop(0)
+            atual, rotulo = fila.popleft()
 
             if atual == objetivo:
-                return caminho
+                return caminhos.caminho(rotulo)
 
             if atual not in visitados:
                 visitados.add(atual)
 
                 for vizinho, peso in self.m_grafo.get(atual, []):
                     if vizinho not in visitados:
-                        fila.append((vizinho, caminho + [vizinho]))
+                        fila.append((vizinho, caminhos.registar(vizinho, rotulo)))
 
         return None
     
     def encontrar_caminho_DFS(self, inicio, objetivo):
         visitados = set()
-        pilha = [(inicio, [inicio])]
+        caminhos = RegistoCaminhos()
+        pilha = [(inicio, caminhos.registar(inicio))]
 
         while pilha:
-            atual, caminho = pilha.pop()
+            atual, rotulo = pilha.pop()
 
             if atual == objetivo:
-                return caminho
+                return caminhos.caminho(rotulo)
 
             if atual not in visitados:
                 visitados.add(atual)
 
                 for vizinho, peso in self.m_grafo.get(atual, []):
                     if vizinho not in visitados:
-                        pilha.append((vizinho, caminho + [vizinho]))
+                        pilha.append((vizinho, caminhos.registar(vizinho, rotulo)))
 
         return None
     
     def verificar_caminho_possivel(self, origem, destino, transporte):
         """
         Verifica se existe um caminho possível entre origem e destino para o transporte dado,
-        considerando acessibilidade e autonomia.
+        considerando acessibilidade e autonomia (ver IndiceAlcance).
         """
         if origem not in self.m_nodos or destino not in self.m_nodos:
             return False
-            
-        visitados = set()
-        fila = [(origem, transporte.autonomia)]
-        
-        while fila:
-            atual, autonomia_restante = fila.pop(0)
-            
-            if atual == destino:
-                return True
-                
-            if atual not in visitados:
-                visitados.add(atual)
-                
-                for vizinho, _ in self.m_grafo.get(atual, []):
-                    if vizinho not in visitados:
-                        # Verifica acessibilidade
-                        if not transporte.transporte_pode(self.m_nodos[vizinho]["acessibilidade"]):
-                            continue
-                            
-                        # Calcula autonomia necessária
-                        distancia = self.calcular_distancia(atual, vizinho)
-                        nova_autonomia = autonomia_restante - distancia
-                        
-                        # Verifica se pode alcançar com a autonomia atual ou se há ponto de reabastecimento
-                        if nova_autonomia >= 0 or self.m_nodos[atual].get("reabastecimento", False):
-                            # Se há reabastecimento, restaura autonomia total
-                            if self.m_nodos[atual].get("reabastecimento", False):
-                                nova_autonomia = transporte.deposito
-                            fila.append((vizinho, nova_autonomia))
-                            
-        return False
+
+        return self.indice_alcance(transporte).alcancavel(origem, destino)
 
     def verificar_caminho_completo(self, caminho, transporte):
         """
@@ -286,7 +431,149 @@ class Grafo:
         if not (0 <= novo_clima <= 10):
             raise ValueError("Valor do clima deve estar entre 0 e 10")
         
-        self.m_nodos[nodo]["clima"] = novo_clima
+        self._escrever_atributos(nodo)["clima"] = novo_clima
+        self._atributos_alterados(nodo, "clima")
+
+    def _atributos_alterados(self, nodo, *atributos):
+        """
+        Propaga a alteração de atributos de um nó às estruturas pré-calculadas.
+        Devolve o número de arestas cujo peso foi recalculado.
+        """
+        if self.m_compilado is not None and nodo in self.m_compilado.indices:
+            for atributo in atributos:
+                self.m_compilado.atualizar_atributo(nodo, atributo, self.m_nodos[nodo].get(atributo))
+        repesadas = 0
+        if any(atributo in ATRIBUTOS_PESO for atributo in atributos):
+            repesadas = self._recalcular_pesos(nodo)
+        if "clima" in atributos:
+            for tabela in self.m_tabelas_tempo.values():
+                tabela.marcar(nodo)
+        if "acessibilidade" in atributos or "reabastecimento" in atributos:
+            for indice in self.m_indices_alcance.values():
+                indice.nodo_alterado(nodo)
+        if any(atributo in ATRIBUTOS_PESO or atributo == "reabastecimento" for atributo in atributos):
+            for hierarquia in self.m_hierarquias.values():
+                hierarquia.nodo_alterado(nodo, *atributos)
+        if any(atributo in ATRIBUTOS_PESO or atributo in ("acessibilidade", "reabastecimento") for atributo in atributos):
+            for planeador in self.m_planeadores:
+                planeador.nodo_alterado(nodo)
+        return repesadas
+
+    def _recalcular_pesos(self, nodo):
+        """
+        Recalcula o peso das arestas que entram no nó (só as de peso calculado).
+        """
+        repesadas = 0
+        for origem, posicao in self.m_entradas.get(nodo, ()):
+            peso = self.calcular_peso(origem, nodo)
+            if peso != self.m_grafo[origem][posicao][1]:
+                self._substituir_peso(origem, posicao, peso)
+                repesadas += 1
+        return repesadas
+
+    def _substituir_peso(self, origem, posicao, peso):
+        destino, _ = self.m_grafo[origem][posicao]
+        self.m_grafo[origem][posicao] = (destino, peso)
+        compilado = self.m_compilado
+        if compilado is not None and compilado.versao == self.m_versao:
+            compilado.atualizar_peso(compilado.inicios[compilado.indices[origem]] + posicao, peso)
+
+    def indice_alcance(self, transporte):
+        """
+        Índice de alcançabilidade para a classe do transporte.
+        """
+        chave = (type(transporte), transporte.deposito)
+        indice = self.m_indices_alcance.get(chave)
+        if indice is None:
+            indice = IndiceAlcance(self, transporte)
+            self.m_indices_alcance[chave] = indice
+        return indice
+
+    def tabela_marcos(self, n_marcos):
+        """
+        Distâncias de e para n_marcos marcos, para a heurística ALT (ver TabelaMarcos).
+        """
+        tabela = self.m_tabelas_marcos.get(n_marcos)
+        if tabela is None:
+            tabela = TabelaMarcos(self, n_marcos)
+            self.m_tabelas_marcos[n_marcos] = tabela
+        return tabela
+
+    def topologia_contracao(self):
+        """
+        Ordem de contração e arcos da hierarquia (ver TopologiaContracao), refeitos quando a topologia muda.
+        """
+        compilado = self.compilado()
+        if self.m_topologia_contracao is None or self.m_topologia_contracao.m_compilado is not compilado:
+            self.m_topologia_contracao = TopologiaContracao(compilado)
+        return self.m_topologia_contracao
+
+    def hierarquia(self, transporte):
+        """
+        Hierarquia de contração para a classe do transporte (ver HierarquiaContracao).
+        """
+        chave = (type(transporte), transporte.deposito)
+        hierarquia = self.m_hierarquias.get(chave)
+        if hierarquia is None:
+            hierarquia = HierarquiaContracao(self, transporte)
+            self.m_hierarquias[chave] = hierarquia
+        return hierarquia
+
+    def planeador_incremental(self, origem, destino, transporte, custo_clima=False):
+        """
+        Caminho de custo mínimo entre dois nós que é reparado, em vez de
+        recalculado, quando o clima ou outros atributos dos nós mudam (ver
+        PlaneadorIncremental). O planeador é avisado enquanto estiver em uso.
+        """
+        planeador = PlaneadorIncremental(self, transporte, origem, destino, custo_clima)
+        self.m_planeadores.add(planeador)
+        return planeador
+
+    def caminho_mais_curto(self, origem, destino, transporte):
+        """
+        Caminho de custo mínimo entre dois nós para o transporte, respondido
+        pela hierarquia de contração.
+
+        Returns:
+            tuple: (caminho, custo), ou (None, inf) se não houver caminho
+        """
+        for nodo in (origem, destino):
+            if nodo not in self.m_nodos:
+                raise ValueError(f"Nó '{nodo}' não existe no grafo.")
+        return self.hierarquia(transporte).consultar(origem, destino)
+
+    @classmethod
+    def abrir_binario(cls, caminho):
+        """
+        Grafo lido de um ficheiro gravado com guardar_binario, mapeado em
+        memória (ver binario.abrir_binario): os pesos não são recalculados.
+        """
+        return abrir_binario(caminho, cls())
+
+    def guardar_binario(self, caminho):
+        """
+        Grava o grafo no formato binário (ver binario.guardar_binario).
+        """
+        guardar_binario(self, caminho)
+
+    def compilado(self):
+        """
+        Forma compilada do grafo (ver GrafoCompilado), recompilada após alterações da topologia.
+        """
+        if self.m_compilado is None or self.m_compilado.versao != self.m_versao:
+            self.m_compilado = GrafoCompilado(self)
+        return self.m_compilado
+
+    def tabela_tempos(self, transporte):
+        """
+        Tabela de (tempo de viagem, seguro) das arestas para a classe do transporte.
+        """
+        chave = (type(transporte), transporte.velocidade)
+        tabela = self.m_tabelas_tempo.get(chave)
+        if tabela is None:
+            tabela = TabelaTempos(self, transporte)
+            self.m_tabelas_tempo[chave] = tabela
+        return tabela
 
     def calcular_tempo_viagem(self, origem, destino, transporte):
         """
@@ -296,45 +583,22 @@ class Grafo:
         if origem not in self.m_nodos or destino not in self.m_nodos:
             raise ValueError("Origem ou destino não existem no grafo")
 
+        resultado = self.tabela_tempos(transporte).consultar(origem, destino)
+        if resultado is not None:
+            return resultado
+
+        # Par que não é aresta do grafo: cálculo direto
         clima_origem = self.m_nodos[origem].get("clima", 0)
         clima_destino = self.m_nodos[destino].get("clima", 0)
         clima_medio = (clima_origem + clima_destino) / 2
-        
-        # Verificar condições de segurança baseadas no tipo de transporte
-        if isinstance(transporte, Helicoptero):
-            if clima_medio >= 8:  # Helicoptero não voa em tempestades severas
-                return float('inf'), False
-        elif isinstance(transporte, Drone):
-            if clima_medio >= 7:  # Drone não voa em qualquer tempestade
-                return float('inf'), False
-        
-        # Calcular penalidade de tempo baseada no clima
-        penalidade_clima = 1.0  # fator multiplicador base
-        
-        if clima_medio <= 3:  # Tempo bom
-            penalidade_clima = 1.0
-        elif clima_medio <= 6:  # Chuva moderada
-            penalidade_clima = 1.3
-            if isinstance(transporte, Mota):  # Motas são mais afetadas pela chuva
-                penalidade_clima = 1.5
-        elif clima_medio <= 8:  # Tempestade
-            penalidade_clima = 1.6
-            if isinstance(transporte, Mota):
-                penalidade_clima = 2.0
-            elif isinstance(transporte, Carro):
-                penalidade_clima = 1.8
-        else:  # Tempestade severa
-            penalidade_clima = 2.0
-            if isinstance(transporte, Mota):
-                return float('inf'), False  # Muito perigoso para Motas
-            elif isinstance(transporte, Carro):
-                penalidade_clima = 2.5
-        
+
+        perfil = perfil_clima(transporte)
+        _, limite, estrito = perfil
+        if limite is not None and (clima_medio > limite if estrito else clima_medio >= limite):
+            return float('inf'), False
+
         distancia = self.calcular_distancia(origem, destino)
-        tempo_base = distancia / transporte.velocidade
-        tempo_final = tempo_base * penalidade_clima
-        
-        return tempo_final, True
+        return tempo_viagem(distancia, clima_medio, transporte.velocidade, perfil)
 
     def verificar_seguranca_clima(self, nodo, transporte):
         """
@@ -447,876 +711,191 @@ class Grafo:
 
         return True, "OK"
     
-    def procura_BFS(self, inicio, transporte, objetivos):
+    def procurar(self, inicio, transporte, objetivos, estrategia, heuristica=None, estatisticas=None):
         """
-        Implementação atualizada do algoritmo BFS com validações melhoradas.
+        Executa uma missão de entregas com a estratégia de procura indicada (ver procura.py).
+
+        Com estatisticas (uma EstatisticasProcura, ver instrumentacao.py), a
+        missão é instrumentada e devolve (caminho, custo, tempo, estatisticas).
         """
-        # Basic input validation
-        if not objetivos:
-            return [], 0, 0
-            
-        # Filter for locations that need deliveries
-        locais_entrega = [obj for obj in objetivos if self.m_nodos[obj]["alimentos"] > 0]
-        if not locais_entrega:
-            return [], 0, 0
-
-        # Validate starting point
-        if inicio not in self.m_nodos:
-            raise ValueError(f"Nó '{inicio}' não existe no grafo.")
-            
-        # Validate all objectives exist in graph
-        for objetivo in objetivos:
-            if objetivo not in self.m_nodos:
-                raise ValueError(f"Nó objetivo '{objetivo}' não existe no grafo.")
-                
-        # Validate starting point accessibility
-        if not transporte.transporte_pode(self.m_nodos[inicio]["acessibilidade"]):
-            raise ValueError(f"Transporte {transporte.nome} não pode acessar o ponto inicial {inicio}")
-
-        # Check initial vehicle capacity
-        maior_carga = max(self.m_nodos[obj]["alimentos"] for obj in locais_entrega)
-
-        # Initialize variables
-        caminho_total = []
-        custo_total = 0
-        tempo_total = 0
-        ponto_atual = inicio
-        global_visitados = set()
-        tentativas_alternativas = 3
-
-        # Process each delivery location
-        for objetivo in locais_entrega:
-            # Verify if path is possible considering vehicle limitations
-            viavel, motivo = self.verificar_viabilidade_transporte(transporte, ponto_atual, objetivo)
-            if not viavel:
-                continue
+        resultado = MotorProcura(self, transporte, estrategia, heuristica, estatisticas).executar(inicio, objetivos)
+        if estatisticas is not None:
+            return (*resultado, estatisticas)
+        return resultado
 
-            if not self.verificar_caminho_possivel(ponto_atual, objetivo, transporte):
-                continue
+    def procura_BFS(self, inicio, transporte, objetivos, estatisticas=None):
+        """
+        Procura em largura.
+        """
+        return self.procurar(inicio, transporte, objetivos, BFS, estatisticas=estatisticas)
 
-            fila = [(ponto_atual, [ponto_atual])]
-            visitados = set()
-            caminho_encontrado = False
-            tentativas = tentativas_alternativas
-            tempos = {ponto_atual: tempo_total}
-
-            while fila and not caminho_encontrado and tentativas > 0:
-                atual, caminho = fila.pop(0)
-
-                if atual == objetivo:
-                    viavel, tempo_rota = self.verificar_caminho_tempo_critico(caminho, transporte, tempo_total)
-                    if viavel and self.verificar_caminho_completo(caminho, transporte):
-                        rota_possivel = True
-                        
-                        # Verify weather conditions for entire route
-                        for j in range(len(caminho) - 1):
-                            atual_nodo = caminho[j]
-                            proximo_nodo = caminho[j + 1]
-                            tempo_viagem, seguro = self.calcular_tempo_viagem(atual_nodo, proximo_nodo, transporte)
-                            
-                            if not seguro or tempo_viagem == float('inf'):
-                                rota_possivel = False
-                                break
-
-                        if rota_possivel:
-                            # Process confirmed route
-                            for j in range(len(caminho) - 1):
-                                atual_nodo = caminho[j]
-                                proximo_nodo = caminho[j + 1]
-                                
-                                if atual_nodo not in objetivos:
-                                    global_visitados.add(atual_nodo)
-
-                                distancia = self.calcular_distancia(atual_nodo, proximo_nodo)
-                                
-                                # Check if refueling is needed
-                                if distancia > transporte.autonomia:
-                                    if self.m_nodos[atual_nodo].get("reabastecimento", False):
-                                        transporte.abastecer()
-                                        tempo_total += 0.1  # 6 minutes for refueling
-                                        custo_total += 10   # Refueling cost
-                                    else:
-                                        rota_possivel = False
-                                        break
-
-                                transporte.viajar(distancia)
-                                custo_total += distancia
-                                tempo_viagem, _ = self.calcular_tempo_viagem(atual_nodo, proximo_nodo, transporte)
-                                tempo_total += tempo_viagem
-
-                            if rota_possivel:
-                                # Add nodes to total path
-                                for nodo in caminho:
-                                    if not caminho_total or caminho_total[-1] != nodo:
-                                        caminho_total.append(nodo)
-
-                                # Process delivery at destination
-                                if self.m_nodos[objetivo]["alimentos"] > 0:
-                                    carga = self.m_nodos[objetivo]["alimentos"]
-                                    if carga <= transporte.capacidade:
-                                        transporte.descarregar(carga)
-                                        custo_total += 15  # Delivery cost
-                                        tempo_total += 0.5  # 30 minutes for unloading
-                                        self.m_nodos[objetivo]["alimentos"] = 0
-                                        self.m_nodos[objetivo]["prioridade"] = 0
-                                    else:
-                                        continue
-
-                                # Resupply if available
-                                if self.m_nodos[objetivo].get("supply_refill", False):
-                                    transporte.carregar()
-
-                                ponto_atual = objetivo
-                                caminho_encontrado = True
-                                tempo_total = tempo_rota
-                                break
-                        
-                        if not rota_possivel:
-                            tentativas -= 1
-                            continue
-
-                if atual not in visitados:
-                    visitados.add(atual)
-                    for vizinho, _ in self.m_grafo.get(atual, []):
-                        if (vizinho not in visitados and 
-                            transporte.transporte_pode(self.m_nodos[vizinho]["acessibilidade"])):
-                            
-                            # Check weather conditions for next step
-                            tempo_viagem, seguro = self.calcular_tempo_viagem(atual, vizinho, transporte)
-                            if not seguro or tempo_viagem == float('inf'):
-                                continue
-
-                            # Verify critical time window
-                            tempo_estimado = tempos[atual] + tempo_viagem
-                            if not self.verificar_tempo_critico(vizinho, tempo_estimado):
-                                continue
-                                
-                            # Skip already visited nodes unless they're objectives
-                            if vizinho in global_visitados and vizinho not in objetivos:
-                                continue
-
-                            novo_caminho = caminho + [vizinho]
-                            if self.verificar_caminho_possivel(atual, vizinho, transporte):
-                                tempos[vizinho] = tempo_estimado
-                                fila.append((vizinho, novo_caminho))
-
-        # Return results
-        if tempo_total > 0:
-            tempo_total = (tempo_total * 60) / 100  # Convert to hours
-            print(f"Caminho total percorrido: {' -> '.join(caminho_total)}")
-            print(f"Custo total acumulado: {custo_total:.3f}")
-            print(f"Tempo total acumulado: {tempo_total:.2f} horas")
-            return caminho_total, round(custo_total, 3), tempo_total
-        else:
-            print("Nenhum caminho válido encontrado")
-            return [], 0, 0
-
-    def procura_DFS(self, inicio, transporte, objetivos):
-        """
-        Implementação atualizada do algoritmo DFS com validações melhoradas.
-        """
-        # Basic input validation
-        if not objetivos:
-            return [], 0, 0
-            
-        # Filter for locations that need deliveries
-        locais_entrega = [obj for obj in objetivos if self.m_nodos[obj]["alimentos"] > 0]
-        if not locais_entrega:
-            return [], 0, 0
-
-        # Validate starting point
-        if inicio not in self.m_nodos:
-            raise ValueError(f"Nó '{inicio}' não existe no grafo.")
-            
-        # Validate all objectives exist in graph
-        for objetivo in objetivos:
-            if objetivo not in self.m_nodos:
-                raise ValueError(f"Nó objetivo '{objetivo}' não existe no grafo.")
-                
-        # Validate starting point accessibility
-        if not transporte.transporte_pode(self.m_nodos[inicio]["acessibilidade"]):
-            raise ValueError(f"Transporte {transporte.nome} não pode acessar o ponto inicial {inicio}")
-
-        # Check initial vehicle capacity
-        maior_carga = max(self.m_nodos[obj]["alimentos"] for obj in locais_entrega)
-
-        # Initialize variables
-        caminho_total = []
-        custo_total = 0
-        tempo_total = 0
-        ponto_atual = inicio
-        global_visitados = set()
-        tentativas_alternativas = 3
-
-        # Process each delivery location
-        for objetivo in locais_entrega:
-            # Verify if path is possible considering vehicle limitations
-            viavel, motivo = self.verificar_viabilidade_transporte(transporte, ponto_atual, objetivo)
-            if not viavel:
-                continue
+    def procura_DFS(self, inicio, transporte, objetivos, estatisticas=None):
+        """
+        Procura em profundidade.
+        """
+        return self.procurar(inicio, transporte, objetivos, DFS, estatisticas=estatisticas)
 
-            if not self.verificar_caminho_possivel(ponto_atual, objetivo, transporte):
-                continue
+    def a_star(self, inicio, transporte, objetivos, heuristica=None, estatisticas=None):
+        """
+        Procura A* (custo das arestas mais heurística). A heurística é, por
+        omissão, a distância em linha reta; "marcos" usa a heurística ALT.
+        """
+        return self.procurar(inicio, transporte, objetivos, A_ESTRELA, heuristica, estatisticas)
 
-            pilha = [(ponto_atual, [ponto_atual])]
-            visitados = set()
-            caminho_encontrado = False
-            tentativas = tentativas_alternativas
-
-            while pilha and not caminho_encontrado and tentativas > 0:
-                atual, caminho = pilha.pop()
-
-                if atual == objetivo:
-                    # Check time-critical constraints and path completeness
-                    viavel, tempo_rota = self.verificar_caminho_tempo_critico(caminho, transporte, tempo_total)
-                    if viavel and self.verificar_caminho_completo(caminho, transporte):
-                        rota_possivel = True
-                        
-                        # Verify weather conditions for entire route
-                        for j in range(len(caminho) - 1):
-                            atual_nodo = caminho[j]
-                            proximo_nodo = caminho[j + 1]
-                            tempo_viagem, seguro = self.calcular_tempo_viagem(atual_nodo, proximo_nodo, transporte)
-                            
-                            if not seguro or tempo_viagem == float('inf'):
-                                rota_possivel = False
-                                break
-
-                        if rota_possivel:
-                            # Process the confirmed route
-                            for j in range(len(caminho) - 1):
-                                atual_nodo = caminho[j]
-                                proximo_nodo = caminho[j + 1]
-                                
-                                if atual_nodo not in objetivos:
-                                    global_visitados.add(atual_nodo)
-
-                                distancia = self.calcular_distancia(atual_nodo, proximo_nodo)
-                                
-                                # Check if refueling is needed
-                                if distancia > transporte.autonomia:
-                                    if self.m_nodos[atual_nodo].get("reabastecimento", False):
-                                        transporte.abastecer()
-                                        tempo_total += 0.1  # 6 minutes for refueling
-                                        custo_total += 10   # Refueling cost
-                                    else:
-                                        rota_possivel = False
-                                        break
-
-                                # Update vehicle state and costs
-                                transporte.viajar(distancia)
-                                custo_total += distancia
-                                tempo_viagem, _ = self.calcular_tempo_viagem(atual_nodo, proximo_nodo, transporte)
-                                tempo_total += tempo_viagem
-
-                            if rota_possivel:
-                                # Update total path
-                                for nodo in caminho:
-                                    if not caminho_total or caminho_total[-1] != nodo:
-                                        caminho_total.append(nodo)
-
-                                # Process delivery at destination
-                                if self.m_nodos[objetivo]["alimentos"] > 0:
-                                    carga = self.m_nodos[objetivo]["alimentos"]
-                                    if carga <= transporte.capacidade:
-                                        transporte.descarregar(carga)
-                                        custo_total += 15  # Delivery cost
-                                        tempo_total += 0.5  # 30 minutes for unloading
-                                        self.m_nodos[objetivo]["alimentos"] = 0
-                                        self.m_nodos[objetivo]["prioridade"] = 0
-                                    else:
-                                        continue
-
-                                # Resupply if available
-                                if self.m_nodos[objetivo].get("supply_refill", False):
-                                    transporte.carregar()
-
-                                ponto_atual = objetivo
-                                caminho_encontrado = True
-                                tempo_total = tempo_rota
-                                break
-
-                        if not rota_possivel:
-                            tentativas -= 1
-                            continue
-
-                if atual not in visitados:
-                    visitados.add(atual)
-                    # Get neighbors in reverse order for DFS (to maintain depth-first property)
-                    vizinhos = [(vizinho, peso) for vizinho, peso in self.m_grafo.get(atual, [])]
-                    vizinhos.reverse()  # Process neighbors in reverse order
-                    
-                    for vizinho, _ in vizinhos:
-                        if (vizinho not in visitados and 
-                            transporte.transporte_pode(self.m_nodos[vizinho]["acessibilidade"])):
-                            
-                            # Check weather conditions for next step
-                            tempo_viagem, seguro = self.calcular_tempo_viagem(atual, vizinho, transporte)
-                            if not seguro or tempo_viagem == float('inf'):
-                                continue
-                            
-                            # Skip already visited nodes unless they're objectives
-                            if vizinho in global_visitados and vizinho not in objetivos:
-                                continue
-
-                            novo_caminho = caminho + [vizinho]
-                            if self.verificar_caminho_possivel(atual, vizinho, transporte):
-                                pilha.append((vizinho, novo_caminho))
-
-        # Return results
-        if tempo_total > 0:
-            tempo_total = (tempo_total * 60) / 100  # Convert to hours
-            print(f"Caminho total percorrido: {' -> '.join(caminho_total)}")
-            print(f"Custo total acumulado: {custo_total:.3f}")
-            print(f"Tempo total acumulado: {tempo_total:.2f} horas")
-            return caminho_total, round(custo_total, 3), tempo_total
-        else:
-            print("Nenhum caminho válido encontrado")
-            return [], 0, 0
-
-    def a_star(self, inicio, transporte, objetivos):
-        """
-        Implementação atualizada do algoritmo A* com validações melhoradas.
-        """
-        # Basic input validation
-        if not objetivos:
-            return [], 0, 0
-            
-        # Filter for locations that need deliveries
-        locais_entrega = [obj for obj in objetivos if self.m_nodos[obj]["alimentos"] > 0]
-        if not locais_entrega:
-            return [], 0, 0
-
-        # Validate starting point and objectives
-        if inicio not in self.m_nodos:
-            raise ValueError(f"Nó '{inicio}' não existe no grafo.")
-        for objetivo in objetivos:
-            if objetivo not in self.m_nodos:
-                raise ValueError(f"Nó objetivo '{objetivo}' não existe no grafo.")
-                
-        # Validate starting point accessibility
-        if not transporte.transporte_pode(self.m_nodos[inicio]["acessibilidade"]):
-            raise ValueError(f"Transporte {transporte.nome} não pode acessar o ponto inicial {inicio}")
-
-        # Check initial vehicle capacity
-        maior_carga = max(self.m_nodos[obj]["alimentos"] for obj in locais_entrega)
-
-        # Initialize variables
-        caminho_total = []
-        custo_total = 0
-        tempo_total = 0
-        ponto_atual = inicio
-        global_visitados = set()
-        max_iterations = 1000
-
-        # Process each delivery location
-        for objetivo in locais_entrega:
-            # Verify if path is possible considering vehicle limitations
-            viavel, motivo = self.verificar_viabilidade_transporte(transporte, ponto_atual, objetivo)
-            if not viavel:
-                continue
+    def procura_greedy(self, inicio, transporte, objetivos, heuristica=None, estatisticas=None):
+        """
+        Procura gulosa (apenas heurística; ver a_star).
+        """
+        return self.procurar(inicio, transporte, objetivos, GULOSA, heuristica, estatisticas)
 
-            if not self.verificar_caminho_possivel(ponto_atual, objetivo, transporte):
-                continue
+    def custo_uniforme(self, inicio, transporte, objetivos, estatisticas=None):
+        """
+        Procura de custo uniforme (custo das arestas penalizado pelo clima).
+        """
+        return self.procurar(inicio, transporte, objetivos, CUSTO_UNIFORME, estatisticas=estatisticas)
 
-            # A* specific initialization
-            tentativas = 3
-            caminho_encontrado = False
-            iteration_count = 0
-
-            while not caminho_encontrado and tentativas > 0 and iteration_count < max_iterations:
-                iteration_count += 1
-                fila_prioridade = []
-                heapq.heappush(fila_prioridade, (0, 0, ponto_atual, [ponto_atual]))
-                visitados = set()
-                custos_g = {ponto_atual: 0}
-                tempos = {ponto_atual: tempo_total}
-
-                while fila_prioridade and iteration_count < max_iterations:
-                    iteration_count += 1
-                    f_atual, g_atual, atual, caminho = heapq.heappop(fila_prioridade)
-
-                    if atual == objetivo:
-                        viavel, tempo_rota = self.verificar_caminho_tempo_critico(caminho, transporte, tempo_total)
-                        if viavel and self.verificar_caminho_completo(caminho, transporte):
-                            rota_possivel = True
-                            
-                            # Verify weather conditions for entire route
-                            for j in range(len(caminho) - 1):
-                                atual_nodo = caminho[j]
-                                proximo_nodo = caminho[j + 1]
-                                tempo_viagem, seguro = self.calcular_tempo_viagem(atual_nodo, proximo_nodo, transporte)
-                                
-                                if not seguro or tempo_viagem == float('inf'):
-                                    rota_possivel = False
-                                    break
-
-                            if rota_possivel:
-                                # Process the confirmed route
-                                for j in range(len(caminho) - 1):
-                                    atual_nodo = caminho[j]
-                                    proximo_nodo = caminho[j + 1]
-                                    
-                                    if atual_nodo not in objetivos:
-                                        global_visitados.add(atual_nodo)
-
-                                    distancia = self.calcular_distancia(atual_nodo, proximo_nodo)
-                                    
-                                    # Check and handle refueling
-                                    if distancia > transporte.autonomia:
-                                        if self.m_nodos[atual_nodo].get("reabastecimento", False):
-                                            transporte.abastecer()
-                                            tempo_total += 0.1  # 6 minutes for refueling
-                                            custo_total += 10   # Refueling cost
-                                        else:
-                                            rota_possivel = False
-                                            break
-
-                                    transporte.viajar(distancia)
-                                    custo_total += distancia
-                                    tempo_viagem, _ = self.calcular_tempo_viagem(atual_nodo, proximo_nodo, transporte)
-                                    tempo_total += tempo_viagem
-
-                                if rota_possivel:
-                                    # Add nodes to total path
-                                    for nodo in caminho:
-                                        if not caminho_total or caminho_total[-1] != nodo:
-                                            caminho_total.append(nodo)
-
-                                    # Handle delivery at destination
-                                    if self.m_nodos[objetivo]["alimentos"] > 0:
-                                        carga = self.m_nodos[objetivo]["alimentos"]
-                                        if carga <= transporte.capacidade:
-                                            transporte.descarregar(carga)
-                                            custo_total += 15  # Delivery cost
-                                            tempo_total += 0.5  # 30 minutes for unloading
-                                            self.m_nodos[objetivo]["alimentos"] = 0
-                                            self.m_nodos[objetivo]["prioridade"] = 0
-                                        else:
-                                            continue
-
-                                    # Resupply if available
-                                    if self.m_nodos[objetivo].get("supply_refill", False):
-                                        transporte.carregar()
-
-                                    ponto_atual = objetivo
-                                    caminho_encontrado = True
-                                    tempo_total = tempo_rota
-                                    break
-
-                            if not rota_possivel:
-                                tentativas -= 1
-                                continue
-
-                    if atual in visitados:
-                        continue
-
-                    visitados.add(atual)
-
-                    # Process neighbors with A* specific calculations
-                    for vizinho, peso in self.m_grafo.get(atual, []):
-                        if (vizinho not in visitados and 
-                            transporte.transporte_pode(self.m_nodos[vizinho]["acessibilidade"])):
-                            
-                            # Verify weather conditions
-                            tempo_viagem, seguro = self.calcular_tempo_viagem(atual, vizinho, transporte)
-                            if not seguro or tempo_viagem == float('inf'):
-                                continue
-
-                            # Check time constraints
-                            tempo_estimado = tempos[atual] + tempo_viagem
-                            if not self.verificar_tempo_critico(vizinho, tempo_estimado):
-                                continue
-
-                            # Skip already visited nodes unless they're objectives
-                            if vizinho in global_visitados and vizinho not in objetivos:
-                                continue
-
-                            # Calculate new path and costs
-                            novo_caminho = caminho + [vizinho]
-                            if self.verificar_caminho_possivel(atual, vizinho, transporte):
-                                novo_g = g_atual + peso
-                                if vizinho not in custos_g or novo_g < custos_g[vizinho]:
-                                    custos_g[vizinho] = novo_g
-                                    tempos[vizinho] = tempo_estimado
-                                    h = self.calcular_heuristica(vizinho, objetivo)
-                                    f = novo_g + h
-                                    heapq.heappush(fila_prioridade, (f, novo_g, vizinho, novo_caminho))
-
-
-        # Return results
-        if tempo_total > 0:
-            tempo_total = (tempo_total * 60) / 100  # Convert to hours
-            print(f"Caminho total percorrido: {' -> '.join(caminho_total)}")
-            print(f"Custo total acumulado: {custo_total:.3f}")
-            print(f"Tempo total acumulado: {tempo_total:.2f} horas")
-            return caminho_total, round(custo_total, 3), tempo_total
-        else:
-            print("Nenhum caminho válido encontrado")
-            return [], 0, 0
-
-    def procura_greedy(self, inicio, transporte, objetivos):
-        """
-        Implementação atualizada do algoritmo Greedy com validações melhoradas.
-        """
-        # Basic input validation
-        if not objetivos:
-            return [], 0, 0
-            
-        # Filter for locations that need deliveries
-        locais_entrega = [obj for obj in objetivos if self.m_nodos[obj]["alimentos"] > 0]
-        if not locais_entrega:
-            return [], 0, 0
-
-        # Validate starting point and objectives
-        if inicio not in self.m_nodos:
-            raise ValueError(f"Nó '{inicio}' não existe no grafo.")
-        for objetivo in objetivos:
-            if objetivo not in self.m_nodos:
-                raise ValueError(f"Nó objetivo '{objetivo}' não existe no grafo.")
-                
-        # Validate starting point accessibility
-        if not transporte.transporte_pode(self.m_nodos[inicio]["acessibilidade"]):
-            raise ValueError(f"Transporte {transporte.nome} não pode acessar o ponto inicial {inicio}")
-
-        # Check initial vehicle capacity against requirements
-        maior_carga = max(self.m_nodos[obj]["alimentos"] for obj in locais_entrega)
-
-        # Initialize variables
-        caminho_total = []
-        custo_total = 0
-        tempo_total = 0
-        ponto_atual = inicio
-        global_visitados = set()
-        max_iterations = 1000
-
-        # Process each delivery location
-        for objetivo in locais_entrega:
-            # Check viability for current destination
-            viavel, motivo = self.verificar_viabilidade_transporte(transporte, ponto_atual, objetivo)
-            if not viavel:
-                continue
+    def procura_bidirecional(self, inicio, transporte, objetivos, estatisticas=None):
+        """
+        Procura bidirecional (Dijkstra a partir da origem e do objetivo em
+        simultâneo); recorre à procura de custo para as rotas que não confirme.
+        """
+        return self.procurar(inicio, transporte, objetivos, BIDIRECIONAL, estatisticas=estatisticas)
 
-            if not self.verificar_caminho_possivel(ponto_atual, objetivo, transporte):
-                continue
+    def procura_multi_objetivo(self, inicio, transporte, objetivos, estatisticas=None):
+        """
+        Missão planeada pelo custo real: em cada etapa uma só procura de
+        custo dá as rotas para todos os objetivos pendentes e segue-se para
+        o mais barato.
+        """
+        return self.procurar(inicio, transporte, objetivos, MULTI_OBJETIVO, estatisticas=estatisticas)
 
-            # Greedy search initialization
-            tentativas = 3
-            caminho_encontrado = False
-            iteration_count = 0
-
-            while not caminho_encontrado and tentativas > 0 and iteration_count < max_iterations:
-                iteration_count += 1
-                fila_prioridade = []
-                h_inicial = self.calcular_heuristica(ponto_atual, objetivo)
-                heapq.heappush(fila_prioridade, (h_inicial, ponto_atual, [ponto_atual]))
-                visitados = set()
-                tempos = {ponto_atual: tempo_total}
-
-                while fila_prioridade and iteration_count < max_iterations:
-                    iteration_count += 1
-                    _, atual, caminho = heapq.heappop(fila_prioridade)
-
-                    if atual == objetivo:
-                        # Verify time constraints and path completeness
-                        viavel, tempo_rota = self.verificar_caminho_tempo_critico(caminho, transporte, tempo_total)
-                        if viavel and self.verificar_caminho_completo(caminho, transporte):
-                            rota_possivel = True
-                            
-                            # Check weather conditions for entire route
-                            for j in range(len(caminho) - 1):
-                                atual_nodo = caminho[j]
-                                proximo_nodo = caminho[j + 1]
-                                tempo_viagem, seguro = self.calcular_tempo_viagem(atual_nodo, proximo_nodo, transporte)
-                                
-                                if not seguro or tempo_viagem == float('inf'):
-                                    rota_possivel = False
-                                    break
-
-                            if rota_possivel:
-                                # Process the confirmed route
-                                for j in range(len(caminho) - 1):
-                                    atual_nodo = caminho[j]
-                                    proximo_nodo = caminho[j + 1]
-                                    
-                                    if atual_nodo not in objetivos:
-                                        global_visitados.add(atual_nodo)
-
-                                    distancia = self.calcular_distancia(atual_nodo, proximo_nodo)
-                                    
-                                    # Handle refueling if needed
-                                    if distancia > transporte.autonomia:
-                                        if self.m_nodos[atual_nodo].get("reabastecimento", False):
-                                            transporte.abastecer()
-                                            tempo_total += 0.1  # 6 minutes for refueling
-                                            custo_total += 10   # Refueling cost
-                                        else:
-                                            rota_possivel = False
-                                            break
-
-                                    # Update vehicle state and costs
-                                    transporte.viajar(distancia)
-                                    custo_total += distancia
-                                    tempo_viagem, _ = self.calcular_tempo_viagem(atual_nodo, proximo_nodo, transporte)
-                                    tempo_total += tempo_viagem
-
-                                if rota_possivel:
-                                    # Update total path
-                                    for nodo in caminho:
-                                        if not caminho_total or caminho_total[-1] != nodo:
-                                            caminho_total.append(nodo)
-
-                                    # Handle delivery at destination
-                                    if self.m_nodos[objetivo]["alimentos"] > 0:
-                                        carga = self.m_nodos[objetivo]["alimentos"]
-                                        if carga <= transporte.capacidade:
-                                            transporte.descarregar(carga)
-                                            custo_total += 15  # Delivery cost
-                                            tempo_total += 0.5  # 30 minutes for unloading
-                                            self.m_nodos[objetivo]["alimentos"] = 0
-                                            self.m_nodos[objetivo]["prioridade"] = 0
-                                        else:
-                                            continue
-
-                                    # Resupply if available
-                                    if self.m_nodos[objetivo].get("supply_refill", False):
-                                        transporte.carregar()
-
-                                    ponto_atual = objetivo
-                                    caminho_encontrado = True
-                                    tempo_total = tempo_rota
-                                    break
-
-                            if not rota_possivel:
-                                tentativas -= 1
-                                continue
-
-                    if atual not in visitados:
-                        visitados.add(atual)
-                        for vizinho, _ in self.m_grafo.get(atual, []):
-                            if (vizinho not in visitados and 
-                                transporte.transporte_pode(self.m_nodos[vizinho]["acessibilidade"])):
-                                
-                                # Check weather conditions
-                                tempo_viagem, seguro = self.calcular_tempo_viagem(atual, vizinho, transporte)
-                                if not seguro or tempo_viagem == float('inf'):
-                                    continue
-
-                                # Check time constraints
-                                tempo_estimado = tempos[atual] + tempo_viagem
-                                if not self.verificar_tempo_critico(vizinho, tempo_estimado):
-                                    continue
-
-                                # Skip already visited nodes unless they're objectives
-                                if vizinho in global_visitados and vizinho not in objetivos:
-                                    continue
-
-                                novo_caminho = caminho + [vizinho]
-                                if self.verificar_caminho_possivel(atual, vizinho, transporte):
-                                    # Calculate heuristic for greedy decision
-                                    h = self.calcular_heuristica(vizinho, objetivo)
-                                    tempos[vizinho] = tempo_estimado
-                                    heapq.heappush(fila_prioridade, (h, vizinho, novo_caminho))
-
-        # Return results
-        if tempo_total > 0:
-            tempo_total = (tempo_total * 60) / 100  # Convert to hours
-            print(f"Caminho total percorrido: {' -> '.join(caminho_total)}")
-            print(f"Custo total acumulado: {custo_total:.3f}")
-            print(f"Tempo total acumulado: {tempo_total:.2f} horas")
-            return caminho_total, round(custo_total, 3), tempo_total
-        else:
-            print("Nenhum caminho válido encontrado")
-            return [], 0, 0
-        
-    def custo_uniforme(self, inicio, transporte, objetivos):
+    def procura_recursos(self, inicio, transporte, objetivos, estatisticas=None):
         """
-        Implementação atualizada do algoritmo de Custo Uniforme com validações melhoradas.
+        Procura com restrições de recursos: cada etapa é a rota de menor custo
+        que respeita o tempo crítico e a autonomia (com reabastecimentos),
+        encontrada numa só procura, sem tentativas repetidas.
         """
-        # Basic input validation
-        if not objetivos:
-            return [], 0, 0
-            
-        # Filter for locations that need deliveries
-        locais_entrega = [obj for obj in objetivos if self.m_nodos[obj]["alimentos"] > 0]
-        if not locais_entrega:
-            return [], 0, 0
-
-        # Validate starting point
-        if inicio not in self.m_nodos:
-            raise ValueError(f"Nó '{inicio}' não existe no grafo.")
-            
-        # Validate all objectives exist in graph
-        for objetivo in objetivos:
-            if objetivo not in self.m_nodos:
-                raise ValueError(f"Nó objetivo '{objetivo}' não existe no grafo.")
-                
-        # Validate starting point accessibility
-        if not transporte.transporte_pode(self.m_nodos[inicio]["acessibilidade"]):
-            raise ValueError(f"Transporte {transporte.nome} não pode acessar o ponto inicial {inicio}")
-
-        # Check initial vehicle capacity
-        maior_carga = max(self.m_nodos[obj]["alimentos"] for obj in locais_entrega)
-
-        # Initialize variables
-        caminho_total = []
-        custo_total = 0
-        tempo_total = 0
-        ponto_atual = inicio
-        visitados_global = set()
-        objetivos_restantes = locais_entrega.copy()
-        max_iterations = 1000
-
-        # Process remaining objectives
-        while objetivos_restantes:
-            objetivo_atual = objetivos_restantes[0]
-            
-            # Verify if path is possible
-            viavel, motivo = self.verificar_viabilidade_transporte(transporte, ponto_atual, objetivo_atual)
-            if not viavel:
-                objetivos_restantes.pop(0)
-                continue
+        return self.procurar(inicio, transporte, objetivos, RECURSOS, estatisticas=estatisticas)
 
-            if not self.verificar_caminho_possivel(ponto_atual, objetivo_atual, transporte):
-                objetivos_restantes.pop(0)
-                continue
+    def procura_combustivel(self, inicio, transporte, objetivos, estatisticas=None):
+        """
+        Procura sobre estados (nó, nível de autonomia) em que reabastecer é uma
+        decisão da procura: a rota pode atestar no ponto mais barato em vez de
+        só quando o troço seguinte excede a autonomia.
+        """
+        return self.procurar(inicio, transporte, objetivos, COMBUSTIVEL, estatisticas=estatisticas)
 
-            if not transporte.transporte_pode(self.m_nodos[objetivo_atual]["acessibilidade"]):
-                objetivos_restantes.pop(0)
-                continue
+    def caminhos_um_para_muitos(self, origem, destinos, transporte):
+        """
+        Rotas de custo mínimo da origem para vários destinos com uma só procura.
+
+        Returns:
+            dict: destino -> (caminho, custo, distância, tempo de viagem), só
+            para os destinos alcançáveis
+        """
+        for nodo in [origem, *destinos]:
+            if nodo not in self.m_nodos:
+                raise ValueError(f"Nó '{nodo}' não existe no grafo.")
+        motor = MotorProcura(self, transporte, MULTI_OBJETIVO)
+        motor.ponto_atual = origem
+        motor.m_objetivos = set(destinos)
+        return motor.caminhos_para(destinos)
+
+
+class GrafoSnapshot(Grafo):
+    """
+    Grafo mutável sobreposto a um grafo base que não é alterado.
+
+    A topologia, a matriz de distâncias e a forma compilada são partilhadas
+    com o base; os atributos dos nós são copiados apenas para os nós tocados
+    (ver NodosSobrepostos) e as colunas compiladas só quando alteradas; o
+    mesmo acontece às listas de adjacência cujos pesos sejam recalculados. As
+    tabelas de tempos, os índices de alcance, as tabelas de marcos e as
+    hierarquias de contração do base são reutilizados enquanto o snapshot não
+    alterar o clima, a acessibilidade ou os pesos.
+    """
+
+    def __init__(self, base):
+        super().__init__(base.m_direcionado)
+        self.m_base = base
+        self.m_nodos = NodosSobrepostos(base.m_nodos)
+        self.m_grafo = base.m_grafo
+        self.m_entradas = base.m_entradas
+        self.m_listas_proprias = set()
+        self.m_distancias = base.m_distancias
+        self.m_indice_espacial = base.m_indice_espacial
+        self.m_versao = base.m_versao
+        self.m_compilado = base.compilado().sobrepor()
+        self.m_clima_proprio = False
+        self.m_acesso_proprio = False
+        self.m_pesos_proprios = False
+        self.m_metrica_propria = False
+
+    def adicionar_nodo(self, nodo, atributos=None):
+        raise ValueError("A topologia de um snapshot não pode ser alterada.")
 
-            # Search initialization
-            tentativas = 3
-            caminho_encontrado = False
-            iteration_count = 0
-
-            while not caminho_encontrado and tentativas > 0 and iteration_count < max_iterations:
-                iteration_count += 1
-                fila_prioridade = [(0, ponto_atual, [ponto_atual])]
-                visitados = set()
-                custos = {ponto_atual: 0}
-                tempos = {ponto_atual: tempo_total}
-
-                while fila_prioridade and iteration_count < max_iterations:
-                    iteration_count += 1
-                    custo_atual, atual, caminho = heapq.heappop(fila_prioridade)
-
-                    if atual == objetivo_atual:
-                        # Verify time constraints and path completeness
-                        viavel, tempo_rota = self.verificar_caminho_tempo_critico(caminho, transporte, tempo_total)
-                        if viavel and self.verificar_caminho_completo(caminho, transporte):
-                            rota_possivel = True
-                            
-                            # Check weather conditions for entire route
-                            for j in range(len(caminho) - 1):
-                                atual_nodo = caminho[j]
-                                proximo_nodo = caminho[j + 1]
-                                tempo_viagem, seguro = self.calcular_tempo_viagem(atual_nodo, proximo_nodo, transporte)
-                                
-                                if not seguro or tempo_viagem == float('inf'):
-                                    rota_possivel = False
-                                    break
-
-                            if rota_possivel:
-                                # Process the confirmed route
-                                for j in range(len(caminho) - 1):
-                                    atual_nodo = caminho[j]
-                                    proximo_nodo = caminho[j + 1]
-                                    
-                                    if atual_nodo not in objetivos:
-                                        visitados_global.add(atual_nodo)
-
-                                    distancia = self.calcular_distancia(atual_nodo, proximo_nodo)
-                                    
-                                    # Handle refueling if needed
-                                    if distancia > transporte.autonomia:
-                                        if self.m_nodos[atual_nodo].get("reabastecimento", False):
-                                            transporte.abastecer()
-                                            tempo_total += 0.1  # 6 minutes for refueling
-                                            custo_total += 10   # Refueling cost
-                                        else:
-                                            rota_possivel = False
-                                            break
-
-                                    transporte.viajar(distancia)
-                                    custo_total += distancia
-                                    tempo_viagem, _ = self.calcular_tempo_viagem(atual_nodo, proximo_nodo, transporte)
-                                    tempo_total += tempo_viagem
-
-                                if rota_possivel:
-                                    # Update total path
-                                    for nodo in caminho:
-                                        if not caminho_total or caminho_total[-1] != nodo:
-                                            caminho_total.append(nodo)
-
-                                    # Handle delivery at destination
-                                    if self.m_nodos[objetivo_atual]["alimentos"] > 0:
-                                        carga = self.m_nodos[objetivo_atual]["alimentos"]
-                                        if carga <= transporte.capacidade:
-                                            transporte.descarregar(carga)
-                                            custo_total += 15  # Delivery cost
-                                            tempo_total += 0.5  # 30 minutes for unloading
-                                            self.m_nodos[objetivo_atual]["alimentos"] = 0
-                                            self.m_nodos[objetivo_atual]["prioridade"] = 0
-                                        else:
-                                            continue
-
-                                    # Resupply if available
-                                    if self.m_nodos[objetivo_atual].get("supply_refill", False):
-                                        transporte.carregar()
-
-                                    ponto_atual = objetivo_atual
-                                    objetivos_restantes.pop(0)
-                                    caminho_encontrado = True
-                                    tempo_total = tempo_rota
-                                    break
-
-                            if not rota_possivel:
-                                tentativas -= 1
-                                continue
-
-                    if atual not in visitados:
-                        visitados.add(atual)
-                        for vizinho, peso in self.m_grafo.get(atual, []):
-                            if (vizinho not in visitados and 
-                                transporte.transporte_pode(self.m_nodos[vizinho]["acessibilidade"]) and
-                                (vizinho not in visitados_global or vizinho in objetivos)):
-                                
-                                # Check weather safety for next step
-                                tempo_viagem, seguro = self.calcular_tempo_viagem(atual, vizinho, transporte)
-                                if not seguro or tempo_viagem == float('inf'):
-                                    continue
-                                
-                                # Check critical time window
-                                tempo_estimado = tempos[atual] + tempo_viagem
-                                if not self.verificar_tempo_critico(vizinho, tempo_estimado):
-                                    continue
-                                
-                                novo_caminho = caminho + [vizinho]
-                                if self.verificar_caminho_possivel(atual, vizinho, transporte):
-                                    # Calculate new cost considering weather
-                                    tempo_base = self.calcular_distancia(atual, vizinho) / transporte.velocidade
-                                    multiplicador_clima = tempo_viagem / tempo_base
-                                    novo_custo = custo_atual + (peso * multiplicador_clima)
-                                    
-                                    if vizinho not in custos or novo_custo < custos[vizinho]:
-                                        custos[vizinho] = novo_custo
-                                        tempos[vizinho] = tempo_estimado
-                                        heapq.heappush(fila_prioridade, (novo_custo, vizinho, novo_caminho))
-
-                if iteration_count >= max_iterations:
-                    break
-
-            if not caminho_encontrado:
-                objetivos_restantes.pop(0)
-
-        # Return results
-        if tempo_total > 0:
-            tempo_total = (tempo_total * 60) / 100  # Convert to hours
-            print(f"Caminho total percorrido: {' -> '.join(caminho_total)}")
-            print(f"Custo total acumulado: {custo_total:.3f}")
-            print(f"Tempo total acumulado: {tempo_total:.2f} horas")
-            return caminho_total, round(custo_total, 3), tempo_total
-        else:
-            print("Nenhum caminho válido encontrado")
-            return [], 0, 0
\ No newline at end of file
+    def adicionar_aresta(self, origem, destino, peso=None):
+        raise ValueError("A topologia de um snapshot não pode ser alterada.")
+
+    def adicionar_nodos(self, nodos):
+        raise ValueError("A topologia de um snapshot não pode ser alterada.")
+
+    def adicionar_arestas(self, arestas):
+        raise ValueError("A topologia de um snapshot não pode ser alterada.")
+
+    def compilado(self):
+        return self.m_compilado
+
+    def _ler_atributos(self, nodo):
+        return self.m_nodos.ler(nodo)
+
+    def _escrever_atributos(self, nodo):
+        return self.m_nodos.escrever(nodo)
+
+    def _substituir_peso(self, origem, posicao, peso):
+        if self.m_grafo is self.m_base.m_grafo:
+            self.m_grafo = dict(self.m_grafo)
+        if origem not in self.m_listas_proprias:
+            self.m_grafo[origem] = list(self.m_grafo[origem])
+            self.m_listas_proprias.add(origem)
+        if peso < self.m_grafo[origem][posicao][1]:
+            self.m_pesos_proprios = True
+        super()._substituir_peso(origem, posicao, peso)
+
+    def _atributos_alterados(self, nodo, *atributos):
+        if "clima" in atributos:
+            self.m_clima_proprio = True
+        if "acessibilidade" in atributos or "reabastecimento" in atributos:
+            self.m_acesso_proprio = True
+        if not self.m_metrica_propria and any(
+            atributo in ATRIBUTOS_PESO or atributo == "reabastecimento" for atributo in atributos
+        ):
+            # As hierarquias já calculadas no base são copiadas e só depois marcadas
+            self.m_metrica_propria = True
+            self.m_hierarquias = {
+                chave: hierarquia.copiar(self) for chave, hierarquia in self.m_base.m_hierarquias.items()
+            }
+        return super()._atributos_alterados(nodo, *atributos)
+
+    def tabela_tempos(self, transporte):
+        if not self.m_clima_proprio:
+            return self.m_base.tabela_tempos(transporte)
+        return super().tabela_tempos(transporte)
+
+    def indice_alcance(self, transporte):
+        if not self.m_acesso_proprio:
+            return self.m_base.indice_alcance(transporte)
+        return super().indice_alcance(transporte)
+
+    def tabela_marcos(self, n_marcos):
+        if not self.m_pesos_proprios:
+            return self.m_base.tabela_marcos(n_marcos)
+        return super().tabela_marcos(n_marcos)
+
+    def topologia_contracao(self):
+        return self.m_base.topologia_contracao()
+
+    def hierarquia(self, transporte):
+        if not self.m_metrica_propria:
+            return self.m_base.hierarquia(transporte)
+        return super().hierarquia(transporte)
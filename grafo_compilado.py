@@ -0,0 +1,232 @@
+import copy
+import os
+from array import array
+from distancias import haversine_lote
+
+INFINITO = float('inf')
+NAN = float('nan')
+
+# Atributos dos nós guardados em colunas: nome -> (tipo do array, valor por omissão)
+COLUNAS = {
+    "acessibilidade": ('d', 0),
+    "clima": ('d', 0),
+    "prioridade": ('d', 0),
+    "alimentos": ('d', 0),
+    "TTL": ('d', INFINITO),
+    "reabastecimento": ('b', False),
+    "supply_refill": ('b', False),
+}
+# Arrays da forma compilada que GrafoCompilado.mapear recebe de um ficheiro binário
+ARRAYS = ("ordem", "inicios", "destinos", "pesos", "origens",
+          "entradas_inicios", "entradas", "tem_coordenadas", "distancias")
+
+
+class GrafoCompilado:
+    """
+    Forma compilada (só de leitura) de um Grafo.
+
+    Os nomes das localidades são convertidos em inteiros (pela ordem de
+    m_nodos), a adjacência fica em arrays CSR (inicios, destinos, pesos) e os
+    atributos dos nós em colunas tipadas. É reconstruída preguiçosamente pelo
+    Grafo quando a topologia muda; alterações de atributos e de pesos feitas
+    através do Grafo são aplicadas diretamente nas colunas e em pesos.
+    """
+
+    def __init__(self, grafo):
+        self.versao = grafo.m_versao
+        self.nomes = list(grafo.m_nodos)
+        self.indices = {nome: i for i, nome in enumerate(self.nomes)}
+        n = len(self.nomes)
+
+        # Posição de cada nome na ordem alfabética, para desempates iguais aos do nome
+        self.ordem = array('q', bytes(8 * n))
+        for posicao, i in enumerate(sorted(range(n), key=self.nomes.__getitem__)):
+            self.ordem[i] = posicao
+
+        self.inicios = array('q', [0])
+        self.destinos = array('q')
+        self.pesos = array('d')
+        for nome in self.nomes:
+            for destino, peso in grafo.m_grafo.get(nome, []):
+                self.destinos.append(self.indices[destino])
+                self.pesos.append(peso)
+            self.inicios.append(len(self.destinos))
+
+        self.origens = array('q', bytes(8 * len(self.destinos)))
+        for u in range(n):
+            for e in range(self.inicios[u], self.inicios[u + 1]):
+                self.origens[e] = u
+
+        # CSR inverso: arestas de entrada de cada nó
+        graus = [0] * (n + 1)
+        for v in self.destinos:
+            graus[v + 1] += 1
+        self.entradas_inicios = array('q', graus)
+        for v in range(n):
+            self.entradas_inicios[v + 1] += self.entradas_inicios[v]
+        proximas = list(self.entradas_inicios[:n])
+        self.entradas = array('q', bytes(8 * len(self.destinos)))
+        for e, v in enumerate(self.destinos):
+            self.entradas[proximas[v]] = e
+            proximas[v] += 1
+
+        self.colunas = {}
+        # Ficheiro binário de onde vêm as vistas (ver mapear)
+        self.m_ficheiro = None
+        self.m_colunas_partilhadas = set()
+        self.m_pesos_partilhados = False
+        # Muda quando algum peso desce (subidas mantêm válidos os limites da heurística ALT)
+        self.versao_pesos = 0
+        for chave, (tipo, omissao) in COLUNAS.items():
+            self.colunas[chave] = array(tipo, (grafo.m_nodos[nome].get(chave, omissao) for nome in self.nomes))
+
+        coordenadas = [grafo.m_nodos[nome].get("coordenadas") for nome in self.nomes]
+        self.tem_coordenadas = array('b', (bool(c) for c in coordenadas))
+        self.distancias = self._distancias_arestas(grafo, coordenadas)
+
+    @classmethod
+    def mapear(cls, grafo, seccoes, caminho=None):
+        """
+        Forma compilada sobre arrays já feitos (por exemplo, vistas de um
+        ficheiro binário mapeado em memória, ver binario.py), sem copiar.
+        As vistas são tratadas como partilhadas: a primeira alteração de uma
+        coluna ou dos pesos copia-a, como num snapshot. Com o caminho do
+        ficheiro, as vistas não são serializadas: quem recebe a forma
+        compilada noutro processo volta a mapear o ficheiro.
+        """
+        compilado = cls.__new__(cls)
+        compilado.versao = grafo.m_versao
+        compilado.nomes = list(grafo.m_nodos)
+        compilado.indices = {nome: i for i, nome in enumerate(compilado.nomes)}
+        for chave in ARRAYS:
+            setattr(compilado, chave, seccoes[chave])
+        compilado.colunas = {chave: seccoes["coluna_" + chave] for chave in COLUNAS}
+        compilado.m_ficheiro = os.path.abspath(caminho) if caminho is not None else None
+        compilado.m_colunas_partilhadas = set(compilado.colunas)
+        compilado.m_pesos_partilhados = True
+        compilado.versao_pesos = 0
+        matriz = grafo.m_distancias
+        compilado.indices_distancia = array('q', (matriz.m_indices.get(nome, -1) for nome in compilado.nomes))
+        return compilado
+
+    def __getstate__(self):
+        estado = dict(self.__dict__)
+        if self.m_ficheiro is not None:
+            # As vistas ainda não copiadas são refeitas em __setstate__
+            for chave in ARRAYS:
+                if isinstance(estado[chave], memoryview):
+                    estado[chave] = None
+            estado["colunas"] = {
+                chave: None if isinstance(coluna, memoryview) else coluna
+                for chave, coluna in self.colunas.items()
+            }
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        if self.m_ficheiro is not None:
+            from binario import mapear_ficheiro
+            _, seccoes = mapear_ficheiro(self.m_ficheiro)
+            for chave in ARRAYS:
+                if getattr(self, chave) is None:
+                    setattr(self, chave, seccoes[chave])
+            for chave, coluna in self.colunas.items():
+                if coluna is None:
+                    self.colunas[chave] = seccoes["coluna_" + chave]
+
+    def __copy__(self):
+        # Cópia rasa sem passar por __getstate__ (que voltaria a mapear o ficheiro)
+        copia = type(self).__new__(type(self))
+        copia.__dict__.update(self.__dict__)
+        return copia
+
+    @property
+    def n_nodos(self):
+        return len(self.nomes)
+
+    @property
+    def n_arestas(self):
+        return len(self.destinos)
+
+    def coluna(self, chave):
+        return self.colunas[chave]
+
+    def aresta(self, u, v):
+        """
+        Índice da primeira aresta u -> v, ou -1.
+        """
+        destinos = self.destinos
+        for e in range(self.inicios[u], self.inicios[u + 1]):
+            if destinos[e] == v:
+                return e
+        return -1
+
+    def arestas_incidentes(self, u):
+        """
+        Índices das arestas que saem ou entram no nó u.
+        """
+        arestas = list(range(self.inicios[u], self.inicios[u + 1]))
+        arestas.extend(self.entradas[self.entradas_inicios[u]:self.entradas_inicios[u + 1]])
+        return arestas
+
+    def atualizar_atributo(self, nodo, chave, valor):
+        """
+        Atualiza a coluna de um atributo sem recompilar.
+        """
+        coluna = self.colunas.get(chave)
+        if coluna is not None:
+            tipo, omissao = COLUNAS[chave]
+            if chave in self.m_colunas_partilhadas:
+                coluna = self.colunas[chave] = array(tipo, coluna)
+                self.m_colunas_partilhadas.discard(chave)
+            coluna[self.indices[nodo]] = omissao if valor is None else valor
+
+    def atualizar_peso(self, aresta, peso):
+        """
+        Atualiza o peso de uma aresta sem recompilar.
+        """
+        if self.m_pesos_partilhados:
+            self.pesos = array('d', self.pesos)
+            self.m_pesos_partilhados = False
+        if peso < self.pesos[aresta]:
+            self.versao_pesos += 1
+        self.pesos[aresta] = peso
+
+    def sobrepor(self):
+        """
+        Cópia em O(1) para um snapshot: partilha a topologia e as colunas, e
+        cada coluna (e os pesos) só é copiada quando o snapshot a altera.
+        """
+        copia = copy.copy(self)
+        copia.colunas = dict(self.colunas)
+        copia.m_colunas_partilhadas = set(self.colunas)
+        copia.m_pesos_partilhados = True
+        return copia
+
+    def _distancias_arestas(self, grafo, coordenadas):
+        matriz = grafo.m_distancias
+        for nome, c in zip(self.nomes, coordenadas):
+            if c:
+                matriz.adicionar(nome, c)
+
+        self.indices_distancia = array('q', (matriz.m_indices.get(nome, -1) for nome in self.nomes))
+
+        distancias = array('d', [NAN]) * len(self.destinos)
+        validas = [
+            e for e in range(len(self.destinos))
+            if coordenadas[self.origens[e]] and coordenadas[self.destinos[e]]
+        ]
+
+        if len(self.nomes) <= matriz.LIMITE_MATRIZ_COMPLETA:
+            # Mesmos valores que Grafo.calcular_distancia
+            for e in validas:
+                linha = matriz.linha(matriz.m_indices[self.nomes[self.origens[e]]])
+                distancias[e] = linha[matriz.m_indices[self.nomes[self.destinos[e]]]]
+        else:
+            valores = haversine_lote(
+                [coordenadas[self.origens[e]] for e in validas],
+                [coordenadas[self.destinos[e]] for e in validas],
+            )
+            for e, valor in zip(validas, valores):
+                distancias[e] = valor
+        return distancias
@@ -0,0 +1,366 @@
+import heapq
+from array import array
+
+INFINITO = float('inf')
+
+
+class TopologiaContracao:
+    """
+    Parte da hierarquia de contração que não depende dos pesos (CCH).
+
+    Os nós são contraídos pela ordem do grau mínimo sobre o grafo não
+    direcionado subjacente e, ao contrair um nó, todos os seus vizinhos ainda
+    não contraídos ficam ligados entre si. Cada ligação u - w com u contraído
+    antes de w é um arco do grafo ascendente; os triângulos inferiores de um
+    arco (nós v contraídos antes de u e w e ligados a ambos) são os atalhos
+    possíveis por v. É calculada uma vez por topologia e partilhada por todas
+    as classes de transporte.
+
+    Em grafos sem bons separadores (muitas arestas longas) o número de arcos
+    cresce depressa; os triângulos não são guardados, são enumerados.
+    """
+
+    def __init__(self, compilado):
+        self.m_compilado = compilado
+        n = compilado.n_nodos
+        ordem = compilado.ordem
+
+        vizinhos = [set() for _ in range(n)]
+        for e in range(compilado.n_arestas):
+            u, v = compilado.origens[e], compilado.destinos[e]
+            if u != v:
+                vizinhos[u].add(v)
+                vizinhos[v].add(u)
+
+        # Eliminação pelo grau mínimo (desempate pela ordem dos nomes)
+        self.rank = array('q', bytes(8 * n))
+        self.acima = [None] * n
+        self.abaixo = [set() for _ in range(n)]
+        contraidos = bytearray(n)
+        heap = [(len(vizinhos[u]), ordem[u], u) for u in range(n)]
+        heapq.heapify(heap)
+        posicao = 0
+        while heap:
+            grau, _, u = heapq.heappop(heap)
+            if contraidos[u] or grau != len(vizinhos[u]):
+                continue
+            contraidos[u] = 1
+            self.rank[u] = posicao
+            posicao += 1
+            restantes = vizinhos[u]
+            self.acima[u] = sorted(restantes, key=ordem.__getitem__)
+            for w in restantes:
+                self.abaixo[w].add(u)
+                vizinhos[w].discard(u)
+                vizinhos[w].update(x for x in restantes if x != w)
+                heapq.heappush(heap, (len(vizinhos[w]), ordem[w], w))
+            vizinhos[u] = set()
+
+        # Arcos (u, w) com rank[u] < rank[w]
+        self.arcos = {}
+        self.arco_inferior = array('q')
+        self.arco_superior = array('q')
+        for u in range(n):
+            for w in self.acima[u]:
+                self.arcos[(u, w)] = len(self.arco_inferior)
+                self.arco_inferior.append(u)
+                self.arco_superior.append(w)
+
+    @property
+    def n_arcos(self):
+        return len(self.arco_inferior)
+
+    def triangulos(self, a):
+        """
+        Triângulos inferiores do arco a = (x, y): tuplos (v, arco (v, x), arco (v, y)).
+        """
+        x, y = self.arco_inferior[a], self.arco_superior[a]
+        arcos = self.arcos
+        return [(v, arcos[(v, x)], arcos[(v, y)]) for v in self.abaixo[x] & self.abaixo[y]]
+
+    def arco(self, u, w):
+        """
+        Índice do arco entre u e w e se vai de u para w no sentido ascendente.
+        """
+        if self.rank[u] < self.rank[w]:
+            return self.arcos[(u, w)], True
+        return self.arcos[(w, u)], False
+
+
+class HierarquiaContracao:
+    """
+    Hierarquia de contração de uma classe de transporte, para consultas
+    ponto a ponto repetidas sobre o mesmo grafo.
+
+    O custo de uma aresta é o seu peso (negativos contam como 0, como nas
+    outras procuras de Dijkstra) e só entram as arestas que o transporte pode
+    usar: destino acessível, clima seguro, troço alcançável (IndiceAlcance)
+    e com coordenadas. A TopologiaContracao é partilhada; aqui guardam-se só
+    os pesos dos arcos, calculados pela personalização da CCH: cada arco é o
+    mínimo entre a aresta original e os seus triângulos inferiores,
+    processados por ordem de contração.
+
+    Quando os pesos ou o clima mudam (ver Grafo._atributos_alterados) só os
+    arcos das arestas incidentes nesses nós, e os que deles dependem, são
+    recalculados; mudanças de acessibilidade ou de reabastecimento, que
+    alteram o alcance, levam a uma personalização completa.
+    """
+
+    def __init__(self, grafo, transporte):
+        self.m_grafo = grafo
+        self.m_transporte = transporte
+        self.m_topologia = None
+        self.m_completa = True
+        self.m_sujos = set()
+        self.m_original = (array('d'), array('d'))
+        self.m_subir = array('d')
+        self.m_descer = array('d')
+        self.m_meio_subir = array('q')
+        self.m_meio_descer = array('q')
+
+    def atualizar(self):
+        """
+        Garante que a hierarquia corresponde ao grafo atual e devolve-a.
+        """
+        topologia = self.m_grafo.topologia_contracao()
+        if self.m_topologia is not topologia or self.m_completa:
+            self.personalizar(topologia)
+        elif self.m_sujos:
+            self._personalizar_parcial()
+        return self
+
+    def copiar(self, grafo):
+        """
+        Cópia para um snapshot do grafo, que parte dos pesos já personalizados.
+        """
+        copia = HierarquiaContracao(grafo, self.m_transporte)
+        copia.m_topologia = self.m_topologia
+        copia.m_completa = self.m_completa
+        copia.m_sujos = set(self.m_sujos)
+        copia.m_original = (array('d', self.m_original[0]), array('d', self.m_original[1]))
+        copia.m_subir = array('d', self.m_subir)
+        copia.m_descer = array('d', self.m_descer)
+        copia.m_meio_subir = array('q', self.m_meio_subir)
+        copia.m_meio_descer = array('q', self.m_meio_descer)
+        return copia
+
+    def nodo_alterado(self, nodo, *atributos):
+        """
+        Marca os arcos afetados pela alteração de atributos de um nó.
+        """
+        topologia = self.m_topologia
+        if topologia is None or nodo not in topologia.m_compilado.indices:
+            return
+        if "acessibilidade" in atributos or "reabastecimento" in atributos:
+            self.m_completa = True
+        else:
+            self.m_sujos.add(topologia.m_compilado.indices[nodo])
+
+    def personalizar(self, topologia):
+        self.m_topologia = topologia
+        self.m_completa = False
+        self.m_sujos = set()
+        n_arcos = topologia.n_arcos
+        self.m_original = (array('d', [INFINITO]) * n_arcos, array('d', [INFINITO]) * n_arcos)
+        self.m_subir = array('d', [INFINITO]) * n_arcos
+        self.m_descer = array('d', [INFINITO]) * n_arcos
+        self.m_meio_subir = array('q', [-1]) * n_arcos
+        self.m_meio_descer = array('q', [-1]) * n_arcos
+
+        subir_original, descer_original = self.m_original
+        subir, descer = self.m_subir, self.m_descer
+        meio_subir, meio_descer = self.m_meio_subir, self.m_meio_descer
+        self._pesos_originais(range(topologia.m_compilado.n_arestas))
+        subir[:] = subir_original
+        descer[:] = descer_original
+
+        # Por ordem de contração: quando v é processado os seus arcos já estão finais
+        arcos = topologia.arcos
+        rank = topologia.rank
+        for v in sorted(range(len(rank)), key=rank.__getitem__):
+            acima = topologia.acima[v]
+            for i, x in enumerate(acima):
+                for y in acima[i + 1:]:
+                    baixo, alto = (x, y) if rank[x] < rank[y] else (y, x)
+                    a, a_vx, a_vy = arcos[(baixo, alto)], arcos[(v, baixo)], arcos[(v, alto)]
+                    # baixo -> v -> alto e alto -> v -> baixo
+                    custo = descer[a_vx] + subir[a_vy]
+                    if custo < subir[a]:
+                        subir[a], meio_subir[a] = custo, v
+                    custo = descer[a_vy] + subir[a_vx]
+                    if custo < descer[a]:
+                        descer[a], meio_descer[a] = custo, v
+
+    def _personalizar_parcial(self):
+        topologia = self.m_topologia
+        compilado = topologia.m_compilado
+        arestas = set()
+        for u in self.m_sujos:
+            arestas.update(compilado.arestas_incidentes(u))
+        self.m_sujos = set()
+
+        rank = topologia.rank
+        pendentes = [(rank[topologia.arco_inferior[a]], a) for a in self._pesos_originais(arestas)]
+        heapq.heapify(pendentes)
+        vistos = set()
+        while pendentes:
+            _, a = heapq.heappop(pendentes)
+            if a in vistos:
+                continue
+            vistos.add(a)
+            if not self._recalcular(a):
+                continue
+            # Arcos com um triângulo inferior que passa por este arco
+            x, y = topologia.arco_inferior[a], topologia.arco_superior[a]
+            for z in topologia.acima[x]:
+                if z != y:
+                    b, _ = topologia.arco(y, z)
+                    heapq.heappush(pendentes, (rank[topologia.arco_inferior[b]], b))
+
+    def _pesos_originais(self, arestas):
+        """
+        Recalcula o peso original dos arcos das arestas dadas e devolve esses arcos.
+        """
+        topologia = self.m_topologia
+        grafo = self.m_grafo
+        compilado = grafo.compilado()
+        tabela = grafo.tabela_tempos(self.m_transporte).atualizar()
+        alcance = grafo.indice_alcance(self.m_transporte).atualizar()
+        acessiveis = alcance.m_acessiveis
+        tempos = tabela.m_tempos
+        seguros = tabela.m_seguros
+        origens = compilado.origens
+        destinos = compilado.destinos
+        pesos = compilado.pesos
+        subir_original, descer_original = self.m_original
+
+        arcos = {topologia.arco(origens[e], destinos[e])[0] for e in arestas if origens[e] != destinos[e]}
+        for a in arcos:
+            u, w = topologia.arco_inferior[a], topologia.arco_superior[a]
+            subir = descer = INFINITO
+            # Todas as arestas entre os dois nós, nos dois sentidos
+            for x, y in ((u, w), (w, u)):
+                for e in range(compilado.inicios[x], compilado.inicios[x + 1]):
+                    if destinos[e] != y or not acessiveis[y] or not seguros[e]:
+                        continue
+                    if tempos[e] != tempos[e] or tempos[e] == INFINITO or not alcance.alcancavel_indices(x, y):
+                        continue
+                    custo = max(pesos[e], 0)
+                    if x == u:
+                        subir = min(subir, custo)
+                    else:
+                        descer = min(descer, custo)
+            subir_original[a] = subir
+            descer_original[a] = descer
+        return list(arcos)
+
+    def _recalcular(self, a):
+        """
+        Peso do arco a pela aresta original e pelos triângulos inferiores.
+        Devolve True se mudou.
+        """
+        subir_original, descer_original = self.m_original
+        subir, descer = self.m_subir, self.m_descer
+        melhor_subir, melhor_descer = subir_original[a], descer_original[a]
+        meio_subir = meio_descer = -1
+        for v, a_vx, a_vy in self.m_topologia.triangulos(a):
+            # x -> v -> y e y -> v -> x
+            custo = descer[a_vx] + subir[a_vy]
+            if custo < melhor_subir:
+                melhor_subir, meio_subir = custo, v
+            custo = descer[a_vy] + subir[a_vx]
+            if custo < melhor_descer:
+                melhor_descer, meio_descer = custo, v
+
+        mudou = (melhor_subir, melhor_descer) != (subir[a], descer[a])
+        subir[a], descer[a] = melhor_subir, melhor_descer
+        self.m_meio_subir[a], self.m_meio_descer[a] = meio_subir, meio_descer
+        return mudou
+
+    def consultar(self, origem, destino):
+        """
+        Caminho de custo mínimo entre dois nós (nomes).
+
+        Returns:
+            tuple: (caminho, custo), ou (None, inf) se não houver caminho
+        """
+        self.atualizar()
+        compilado = self.m_topologia.m_compilado
+        caminho, custo = self.consultar_indices(compilado.indices[origem], compilado.indices[destino])
+        if caminho is None:
+            return None, custo
+        return [compilado.nomes[u] for u in caminho], custo
+
+    def consultar_indices(self, origem, destino):
+        """
+        Versão de consultar para índices do GrafoCompilado (sem atualizar a hierarquia).
+        """
+        if origem == destino:
+            return [origem], 0
+        topologia = self.m_topologia
+        acima = topologia.acima
+        arcos = topologia.arcos
+        ordem = topologia.m_compilado.ordem
+
+        # Duas procuras só no sentido ascendente: 0 a partir da origem (subir), 1 do destino (descer)
+        pesos = (self.m_subir, self.m_descer)
+        custos = ({origem: 0}, {destino: 0})
+        pais = ({origem: -1}, {destino: -1})
+        fronteiras = ([(0, ordem[origem], origem)], [(0, ordem[destino], destino)])
+        melhor = INFINITO
+        encontro = -1
+        for lado in (0, 1):
+            fronteira = fronteiras[lado]
+            custos_lado, pais_lado, pesos_lado = custos[lado], pais[lado], pesos[lado]
+            while fronteira:
+                g, _, u = heapq.heappop(fronteira)
+                if g > custos_lado[u] or g >= melhor:
+                    continue
+                if lado == 1 and u in custos[0] and g + custos[0][u] < melhor:
+                    melhor = g + custos[0][u]
+                    encontro = u
+                for w in acima[u]:
+                    novo = g + pesos_lado[arcos[(u, w)]]
+                    if novo < custos_lado.get(w, INFINITO):
+                        custos_lado[w] = novo
+                        pais_lado[w] = u
+                        heapq.heappush(fronteira, (novo, ordem[w], w))
+
+        if encontro < 0:
+            return None, INFINITO
+
+        subida = []
+        u = encontro
+        while u != -1:
+            subida.append(u)
+            u = pais[0][u]
+        subida.reverse()
+        descida = []
+        u = pais[1][encontro]
+        while u != -1:
+            descida.append(u)
+            u = pais[1][u]
+
+        caminho = [origem]
+        for x, y in zip(subida, subida[1:]):
+            self._desdobrar(x, y, caminho)
+        anterior = encontro
+        for y in descida:
+            self._desdobrar(anterior, y, caminho)
+            anterior = y
+        return caminho, melhor
+
+    def _desdobrar(self, x, y, caminho):
+        """
+        Acrescenta ao caminho os nós da ligação x -> y (sem x), desfazendo os atalhos.
+        """
+        pilha = [(x, y)]
+        while pilha:
+            x, y = pilha.pop()
+            a, ascendente = self.m_topologia.arco(x, y)
+            meio = self.m_meio_subir[a] if ascendente else self.m_meio_descer[a]
+            if meio < 0:
+                caminho.append(y)
+            else:
+                pilha.append((meio, y))
+                pilha.append((x, meio))
@@ -0,0 +1,118 @@
+import time
+
+# Fases em que é dividido o tempo de uma missão (ver MotorProcura._instrumentar)
+FASES = ("viabilidade", "caminho_possivel", "procura", "confirmacao", "outros")
+
+
+class EstatisticasProcura:
+    """
+    Contadores e tempos por fase de uma ou mais missões do MotorProcura.
+
+    Os hooks opcionais são chamados com nomes de localidades:
+    ao_expandir(nodo), ao_inserir(nodo), ao_aceitar(objetivo, caminho) e
+    ao_rejeitar(objetivo, caminho, estado), em que estado é o resultado de
+    confirmar_rota (rejeitada, expandir ou sem_capacidade).
+
+    O tempo de cada fase é exclusivo (sem o das fases chamadas dentro dela),
+    pelo que a soma das fases é a duração total.
+    """
+
+    def __init__(self, ao_expandir=None, ao_inserir=None, ao_aceitar=None, ao_rejeitar=None):
+        self.ao_expandir = ao_expandir
+        self.ao_inserir = ao_inserir
+        self.ao_aceitar = ao_aceitar
+        self.ao_rejeitar = ao_rejeitar
+
+        self.missoes = 0
+        self.expansoes = 0
+        self.insercoes = 0
+        self.rotas_aceites = 0
+        self.rotas_rejeitadas = {}
+        self.objetivos_inviaveis = 0
+        self.verificacoes_caminho = 0
+        self.limites_iteracoes = 0
+        self.fases = dict.fromkeys(FASES, 0.0)
+        self.m_abertas = []
+        self.m_marca = 0.0
+
+    @property
+    def duracao(self):
+        return sum(self.fases.values())
+
+    @property
+    def tentativas(self):
+        """
+        Rotas rejeitadas pelo clima, cada uma gasta uma das TENTATIVAS da procura.
+        """
+        return self.rotas_rejeitadas.get("rejeitada", 0)
+
+    def medir(self, fase, funcao):
+        """
+        Versão de funcao cujo tempo conta para a fase.
+        """
+        def medida(*args, **kwargs):
+            self._entrar(fase)
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                self._sair()
+        return medida
+
+    def contar_insercoes(self, inserir, nodo):
+        """
+        Versão de inserir (heapq.heappush ou Fronteira*.inserir) que conta as
+        inserções; nodo(*argumentos) dá o nome do nó inserido, para o hook.
+        """
+        def inserir_contado(*args):
+            self.insercoes += 1
+            if self.ao_inserir is not None:
+                self.ao_inserir(nodo(*args))
+            return inserir(*args)
+        return inserir_contado
+
+    def _entrar(self, fase):
+        agora = time.perf_counter()
+        if self.m_abertas:
+            self.fases[self.m_abertas[-1]] += agora - self.m_marca
+        self.m_abertas.append(fase)
+        self.m_marca = agora
+
+    def _sair(self):
+        agora = time.perf_counter()
+        self.fases[self.m_abertas.pop()] += agora - self.m_marca
+        self.m_marca = agora
+
+    def resumo(self):
+        """
+        Returns:
+            dict: contadores, duração e segundos por fase (serializável em JSON)
+        """
+        return {
+            "missoes": self.missoes,
+            "expansoes": self.expansoes,
+            "insercoes": self.insercoes,
+            "rotas_aceites": self.rotas_aceites,
+            "rotas_rejeitadas": dict(self.rotas_rejeitadas),
+            "tentativas": self.tentativas,
+            "objetivos_inviaveis": self.objetivos_inviaveis,
+            "verificacoes_caminho": self.verificacoes_caminho,
+            "limites_iteracoes": self.limites_iteracoes,
+            "duracao": self.duracao,
+            "fases": dict(self.fases),
+        }
+
+
+def imprimir_estatisticas(estatisticas):
+    print(f"Missões: {estatisticas.missoes}, expansões: {estatisticas.expansoes}, "
+          f"inserções na fronteira: {estatisticas.insercoes}")
+    rejeitadas = ", ".join(f"{estado}: {n}" for estado, n in sorted(estatisticas.rotas_rejeitadas.items()))
+    print(f"Rotas aceites: {estatisticas.rotas_aceites}, rejeitadas: {rejeitadas or 0} "
+          f"(tentativas gastas: {estatisticas.tentativas})")
+    print(f"Objetivos inviáveis: {estatisticas.objetivos_inviaveis}, verificações de caminho: "
+          f"{estatisticas.verificacoes_caminho}, limite de iterações atingido: {estatisticas.limites_iteracoes}")
+    duracao = estatisticas.duracao
+    print(f"{'Fase':<18}{'Segundos':>10}{'%':>8}")
+    for fase, segundos in estatisticas.fases.items():
+        percentagem = 100 * segundos / duracao if duracao > 0 else 0
+        print(f"{fase:<18}{segundos:>10.4f}{percentagem:>8.1f}")
+    print(f"{'total':<18}{duracao:>10.4f}")
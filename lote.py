@@ -0,0 +1,109 @@
+import argparse
+import json
+import sys
+import time
+from grafo import Grafo
+from carregador import carregar
+from avaliacao import ALGORITMOS, TRANSPORTES, avaliar_todos
+from resultados import RegistoResultados
+
+
+def abrir_grafo(caminho, caminho_arestas=None):
+    """
+    Grafo de um ficheiro binário (.bin, ver binario.py) ou de ficheiros de
+    nós e arestas em JSON Lines ou CSV (ver carregador.py).
+    """
+    if caminho.lower().endswith(".bin"):
+        return Grafo.abrir_binario(caminho)
+    if caminho_arestas is None:
+        raise ValueError("Falta o ficheiro de arestas (--arestas).")
+    grafo, _ = carregar(caminho, caminho_arestas)
+    return grafo
+
+
+def objetivos_por_prioridade(grafo):
+    """
+    Localidades que precisam de alimentos, por prioridade decrescente (como
+    a lista de prioridades do menu).
+    """
+    prioridades = [
+        (nodo, atributos.get("prioridade", 0))
+        for nodo, atributos in grafo.m_nodos.items()
+        if atributos.get("alimentos", 0) > 0
+    ]
+    return [nodo for nodo, _ in sorted(prioridades, key=lambda x: x[1], reverse=True)]
+
+
+def _escolher(nomes, opcoes, tipo):
+    """
+    Valores de `opcoes` (nome -> valor) pedidos em `nomes`, sem distinguir maiúsculas.
+    """
+    por_nome = {nome.lower(): valor for nome, valor in opcoes.items()}
+    escolhidos = []
+    for nome in nomes:
+        if nome.lower() not in por_nome:
+            raise ValueError(f"{tipo} desconhecido: {nome} (opções: {', '.join(opcoes)})")
+        escolhidos.append(por_nome[nome.lower()])
+    return escolhidos
+
+
+def executar_lote(grafo, inicio, algoritmos=None, transportes=None, objetivos=None, processos=None):
+    """
+    Avalia os algoritmos com os transportes indicados (todos, por omissão)
+    a partir de inicio, sem interação.
+
+    Returns:
+        dict: início, objetivos, versão do grafo, duração (segundos) e
+        resultados (ver avaliacao.avaliar_combinacao)
+    """
+    if inicio not in grafo.m_nodos:
+        raise ValueError(f"Nó '{inicio}' não existe no grafo.")
+    objetivos = objetivos if objetivos else objetivos_por_prioridade(grafo)
+    inicio_relogio = time.perf_counter()
+    resultados = avaliar_todos(grafo, inicio, objetivos, algoritmos, transportes, processos)
+    return {
+        "inicio": inicio,
+        "objetivos": objetivos,
+        "versao_grafo": grafo.m_versao,
+        "duracao": time.perf_counter() - inicio_relogio,
+        "resultados": resultados,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa procuras sem interação e grava os resultados em JSON.")
+    parser.add_argument("grafo", help="grafo binário (.bin) ou ficheiro de nós (.jsonl ou .csv)")
+    parser.add_argument("--arestas", help="ficheiro de arestas, se o grafo não for binário")
+    parser.add_argument("--inicio", default="Centro")
+    parser.add_argument("--algoritmos", nargs="+", default=list(ALGORITMOS), help=", ".join(ALGORITMOS))
+    parser.add_argument("--transportes", nargs="+", default=[classe.__name__ for classe in TRANSPORTES])
+    parser.add_argument("--objetivos", nargs="+", help="por omissão, as localidades com alimentos por prioridade")
+    parser.add_argument("--processos", type=int, help="1 para executar no próprio processo")
+    parser.add_argument("--saida", help="ficheiro JSON de resultados (por omissão, a saída padrão)")
+    parser.add_argument("--registo", help="base de dados SQLite onde acrescentar os resultados (ver resultados.py)")
+    args = parser.parse_args()
+
+    try:
+        algoritmos = _escolher(args.algoritmos, {nome: nome for nome in ALGORITMOS}, "Algoritmo")
+        transportes = _escolher(args.transportes, {classe.__name__: classe for classe in TRANSPORTES}, "Transporte")
+        grafo = abrir_grafo(args.grafo, args.arestas)
+        relatorio = executar_lote(grafo, args.inicio, algoritmos, transportes, args.objetivos, args.processos)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+
+    if args.registo:
+        with RegistoResultados(args.registo) as registo:
+            for resultado in relatorio["resultados"]:
+                registo.registar_avaliacao(resultado, args.inicio, relatorio["versao_grafo"])
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as ficheiro:
+            json.dump(relatorio, ficheiro, ensure_ascii=False, indent=2)
+    else:
+        json.dump(relatorio, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,24 +2,20 @@ import sys
 from grafo import Grafo
 import random
 from transporte import Carro, Mota, Helicoptero, Drone
-import copy
+import time
+from avaliacao import avaliar_todos, imprimir_relatorio
+from missao import comparar_ordens, imprimir_comparacao
+from viagens import PlaneadorViagens, imprimir_plano
+from frota import DespachoFrota, imprimir_despacho
+from resultados import RegistoResultados, imprimir_resumo
+from instrumentacao import EstatisticasProcura
 
 sys.path.append(".")
 
-def guardar_resultados(nome_algoritmo, caminho, custo, tempo_execucao=None, detalhes_erro=None):
-    with open(f"Resultados_{nome_algoritmo}.txt", "w", encoding='utf-8') as arquivo:
-        arquivo.write(f"Algoritmo: {nome_algoritmo}\n")
-        
-        if not caminho:
-            arquivo.write("AVISO: Nenhum caminho encontrado\n")
-        else:
-            arquivo.write(f"Caminho: {' -> '.join(map(str, caminho))}\n")
-            arquivo.write(f"Custo total: {custo}\n")
-            if tempo_execucao is not None:
-                arquivo.write(f"Tempo total: {tempo_execucao:.2f} horas\n")
-
 def main():
     g = Grafo()
+    # Resultados de todas as procuras do menu (ver resultados.py)
+    registo = RegistoResultados()
 
     def gerar_atributos_aleatorios():
         return {
@@ -62,12 +58,6 @@ def main():
 
     lista_prioridades = organizar_prioridade(g)
 
-    def copiar_grafo(grafo_original):
-        grafo_copiado = Grafo()
-        grafo_copiado.m_nodos = copy.deepcopy(grafo_original.m_nodos)
-        grafo_copiado.m_grafo = copy.deepcopy(grafo_original.m_grafo)
-        return grafo_copiado
-
     g.adicionar_aresta("Esposende", "Barcelos")
     g.adicionar_aresta("Barcelos", "Esposende")
     
@@ -152,6 +142,9 @@ def main():
     g.adicionar_aresta("Amares", "Povoa de Lanhoso")
     g.adicionar_aresta("Povoa de Lanhoso", "Amares")
 
+    # (origem, destino, classe do transporte) -> PlaneadorIncremental sobre g (opção 21)
+    planeadores = {}
+
     saida = -1
     while saida != 0:
         print("\n(1) Imprimir Grafo")
@@ -163,23 +156,35 @@ def main():
         print("(7) Custo uniforme")
         print("(8) Greedy")
         print("(9) Modificar situação de localidade")
+        print("(10) Executar todos os algoritmos e transportes (em paralelo)")
+        print("(11) Bidirecional")
+        print("(12) Multi-objetivo (próxima entrega pelo custo real)")
+        print("(13) Otimizar a ordem das entregas")
+        print("(14) Planear viagens com reabastecimento de carga")
+        print("(15) Procura com restrições de recursos (tempo crítico e autonomia)")
+        print("(16) Procura com decisões de reabastecimento")
+        print("(17) Caminho mais curto entre duas localidades")
+        print("(18) Pontos de reabastecimento mais próximos de uma localidade")
+        print("(19) Despachar uma frota (2 carros, mota, helicóptero e drone)")
+        print("(20) Comparar os resultados registados")
+        print("(21) Rota incremental entre duas localidades (reparada após a opção 9)")
         print("(0) Sair")
 
-        gg = copiar_grafo(g)
+        gg = g.snapshot()
 
         try:
             user_input = input("Introduza a sua opcao -> ")
             if user_input.strip() == "":
-                print("Por favor, introduza um número entre 0 e 9")
+                print("Por favor, introduza um número entre 0 e 21")
                 input("Pressione Enter para continuar...")
                 continue
             saida = int(user_input)
-            if saida < 0 or saida > 9:
-                print("Por favor, introduza um número entre 0 e 9")
+            if saida < 0 or saida > 21:
+                print("Por favor, introduza um número entre 0 e 21")
                 input("Pressione Enter para continuar...")
                 continue
         except ValueError:
-            print("Por favor, introduza um número válido entre 0 e 9")
+            print("Por favor, introduza um número válido entre 0 e 21")
             input("Pressione Enter para continuar...")
             continue
 
@@ -198,8 +203,10 @@ def main():
             transportes = [Carro(), Mota(), Helicoptero(), Drone()]
             for transporte in transportes:
                 try:
-                    caminho, custo_total, tempo_total = gg.procura_DFS(inicio, transporte, lista_prioridades)
-                    guardar_resultados(f"DFS_{transporte.nome}", caminho, custo_total, tempo_total)
+                    caminho, custo_total, tempo_total, estatisticas = gg.procura_DFS(
+                        inicio, transporte, lista_prioridades, estatisticas=EstatisticasProcura())
+                    registo.registar("DFS", transporte.nome, caminho, custo_total, tempo_total,
+                                     estatisticas.expansoes, estatisticas.duracao, gg.m_versao, inicio)
                     print(f"[DFS - {transporte.nome}]")
                     print(f"Caminho encontrado: {caminho}")
                     print(f"Custo total: {custo_total}")
@@ -212,8 +219,10 @@ def main():
             transportes = [Carro(), Mota(), Helicoptero(), Drone()]
             for transporte in transportes:
                 try:
-                    caminho, custo_total, tempo_total = gg.procura_BFS(inicio, transporte, lista_prioridades)
-                    guardar_resultados(f"BFS_{transporte.nome}", caminho, custo_total, tempo_total)
+                    caminho, custo_total, tempo_total, estatisticas = gg.procura_BFS(
+                        inicio, transporte, lista_prioridades, estatisticas=EstatisticasProcura())
+                    registo.registar("BFS", transporte.nome, caminho, custo_total, tempo_total,
+                                     estatisticas.expansoes, estatisticas.duracao, gg.m_versao, inicio)
                     print(f"[BFS - {transporte.nome}]")
                     print(f"Caminho encontrado: {caminho}")
                     print(f"Custo total: {custo_total}")
@@ -226,8 +235,10 @@ def main():
             transportes = [Carro(), Mota(), Helicoptero(), Drone()]
             for transporte in transportes:
                 try:
-                    caminho, custo_total, tempo_total = gg.a_star(inicio, transporte, lista_prioridades)
-                    guardar_resultados(f"A*_{transporte.nome}", caminho, custo_total, tempo_total)
+                    caminho, custo_total, tempo_total, estatisticas = gg.a_star(
+                        inicio, transporte, lista_prioridades, estatisticas=EstatisticasProcura())
+                    registo.registar("A*", transporte.nome, caminho, custo_total, tempo_total,
+                                     estatisticas.expansoes, estatisticas.duracao, gg.m_versao, inicio)
                     print(f"[A* - {transporte.nome}]")
                     print(f"Caminho encontrado: {caminho}")
                     print(f"Custo total: {custo_total}")
@@ -240,12 +251,14 @@ def main():
             transportes = [Carro(), Mota(), Helicoptero(), Drone()]
             for transporte in transportes:
                 try:
-                    caminho, custo_total, tempo_total = gg.custo_uniforme(inicio, transporte, lista_prioridades)
+                    caminho, custo_total, tempo_total, estatisticas = gg.custo_uniforme(
+                        inicio, transporte, lista_prioridades, estatisticas=EstatisticasProcura())
                     print(f"[Custo Uniforme - {transporte.nome}]")
                     print(f"Caminho: {caminho}")
                     print(f"Custo Total: {custo_total}")
                     print(f"Tempo Total: {tempo_total:.2f} horas")
-                    guardar_resultados(f"CustoUniforme_{transporte.nome}", caminho, custo_total, tempo_total)
+                    registo.registar("CustoUniforme", transporte.nome, caminho, custo_total, tempo_total,
+                                     estatisticas.expansoes, estatisticas.duracao, gg.m_versao, inicio)
                 except ValueError as e:
                     print(e)
             input("Pressione Enter para continuar...")
@@ -254,12 +267,14 @@ def main():
             transportes = [Carro(), Mota(), Helicoptero(), Drone()]
             for transporte in transportes:
                 try:
-                    caminho, custo_total, tempo_total = gg.procura_greedy(inicio, transporte, lista_prioridades)
+                    caminho, custo_total, tempo_total, estatisticas = gg.procura_greedy(
+                        inicio, transporte, lista_prioridades, estatisticas=EstatisticasProcura())
                     print(f"[Greedy - {transporte.nome}]")
                     print(f"Caminho encontrado: {caminho}")
                     print(f"Custo total: {custo_total}")
                     print(f"Tempo total: {tempo_total:.2f} horas")
-                    guardar_resultados(f"Greedy_{transporte.nome}", caminho, custo_total, tempo_total)
+                    registo.registar("Greedy", transporte.nome, caminho, custo_total, tempo_total,
+                                     estatisticas.expansoes, estatisticas.duracao, gg.m_versao, inicio)
                 except ValueError as e:
                     print(e)
             input("Pressione Enter para continuar...")
@@ -282,9 +297,152 @@ def main():
                 print(e)
 
             l = input("Pressione Enter para continuar...")
+        elif saida == 10:
+            inicio_relogio = time.perf_counter()
+            resultados = avaliar_todos(g, "Centro", lista_prioridades)
+            duracao_total = time.perf_counter() - inicio_relogio
+            for r in resultados:
+                registo.registar_avaliacao(r, "Centro", g.m_versao)
+            imprimir_relatorio(resultados, duracao_total)
+            input("Pressione Enter para continuar...")
+        elif saida == 11:
+            inicio = "Centro"
+            transportes = [Carro(), Mota(), Helicoptero(), Drone()]
+            for transporte in transportes:
+                try:
+                    caminho, custo_total, tempo_total, estatisticas = gg.procura_bidirecional(
+                        inicio, transporte, lista_prioridades, estatisticas=EstatisticasProcura())
+                    print(f"[Bidirecional - {transporte.nome}]")
+                    print(f"Caminho encontrado: {caminho}")
+                    print(f"Custo total: {custo_total}")
+                    print(f"Tempo total: {tempo_total:.2f} horas")
+                    registo.registar("Bidirecional", transporte.nome, caminho, custo_total, tempo_total,
+                                     estatisticas.expansoes, estatisticas.duracao, gg.m_versao, inicio)
+                except ValueError as e:
+                    print(e)
+            input("Pressione Enter para continuar...")
+        elif saida == 12:
+            inicio = "Centro"
+            transportes = [Carro(), Mota(), Helicoptero(), Drone()]
+            for transporte in transportes:
+                try:
+                    caminho, custo_total, tempo_total, estatisticas = gg.procura_multi_objetivo(
+                        inicio, transporte, lista_prioridades, estatisticas=EstatisticasProcura())
+                    print(f"[Multi-objetivo - {transporte.nome}]")
+                    print(f"Caminho encontrado: {caminho}")
+                    print(f"Custo total: {custo_total}")
+                    print(f"Tempo total: {tempo_total:.2f} horas")
+                    registo.registar("MultiObjetivo", transporte.nome, caminho, custo_total, tempo_total,
+                                     estatisticas.expansoes, estatisticas.duracao, gg.m_versao, inicio)
+                except ValueError as e:
+                    print(e)
+            input("Pressione Enter para continuar...")
+        elif saida == 13:
+            for transporte in [Carro(), Mota(), Helicoptero(), Drone()]:
+                try:
+                    imprimir_comparacao(comparar_ordens(g, "Centro", lista_prioridades, transporte))
+                except ValueError as e:
+                    print(e)
+            input("Pressione Enter para continuar...")
+        elif saida == 14:
+            for transporte in [Carro(), Mota(), Helicoptero(), Drone()]:
+                try:
+                    imprimir_plano(transporte, PlaneadorViagens(g, "Centro", lista_prioridades, transporte).planear())
+                except ValueError as e:
+                    print(e)
+            input("Pressione Enter para continuar...")
+        elif saida == 15:
+            inicio = "Centro"
+            transportes = [Carro(), Mota(), Helicoptero(), Drone()]
+            for transporte in transportes:
+                try:
+                    caminho, custo_total, tempo_total, estatisticas = gg.procura_recursos(
+                        inicio, transporte, lista_prioridades, estatisticas=EstatisticasProcura())
+                    print(f"[Recursos - {transporte.nome}]")
+                    print(f"Caminho encontrado: {caminho}")
+                    print(f"Custo total: {custo_total}")
+                    print(f"Tempo total: {tempo_total:.2f} horas")
+                    registo.registar("Recursos", transporte.nome, caminho, custo_total, tempo_total,
+                                     estatisticas.expansoes, estatisticas.duracao, gg.m_versao, inicio)
+                except ValueError as e:
+                    print(e)
+            input("Pressione Enter para continuar...")
+        elif saida == 16:
+            inicio = "Centro"
+            transportes = [Carro(), Mota(), Helicoptero(), Drone()]
+            for transporte in transportes:
+                try:
+                    caminho, custo_total, tempo_total, estatisticas = gg.procura_combustivel(
+                        inicio, transporte, lista_prioridades, estatisticas=EstatisticasProcura())
+                    print(f"[Combustível - {transporte.nome}]")
+                    print(f"Caminho encontrado: {caminho}")
+                    print(f"Custo total: {custo_total}")
+                    print(f"Tempo total: {tempo_total:.2f} horas")
+                    registo.registar("Combustivel", transporte.nome, caminho, custo_total, tempo_total,
+                                     estatisticas.expansoes, estatisticas.duracao, gg.m_versao, inicio)
+                except ValueError as e:
+                    print(e)
+            input("Pressione Enter para continuar...")
+        elif saida == 17:
+            origem = input("Localidade de partida: ")
+            destino = input("Localidade de chegada: ")
+            # No grafo g: as hierarquias ficam entre consultas e só são atualizadas após a opção 9
+            for transporte in [Carro(), Mota(), Helicoptero(), Drone()]:
+                try:
+                    caminho, custo = g.caminho_mais_curto(origem, destino, transporte)
+                    if caminho is None:
+                        print(f"[{transporte.nome}] Não existe caminho de {origem} para {destino}")
+                    else:
+                        print(f"[{transporte.nome}] {' -> '.join(caminho)} (custo {custo:.3f})")
+                except ValueError as e:
+                    print(e)
+            input("Pressione Enter para continuar...")
+        elif saida == 18:
+            nodo = input("Localidade: ")
+            try:
+                for titulo, atributo in (("Combustível", "reabastecimento"), ("Carga", "supply_refill")):
+                    proximos = g.nodos_proximos(nodo, 3, **{atributo: True})
+                    print(f"[{titulo}] " + (", ".join(f"{n} ({d:.2f} km)" for n, d in proximos) or "nenhum"))
+            except ValueError as e:
+                print(e)
+            input("Pressione Enter para continuar...")
+        elif saida == 19:
+            frota = [Carro(), Carro(), Mota(), Helicoptero(), Drone()]
+            try:
+                imprimir_despacho(DespachoFrota(g, "Centro", lista_prioridades, frota).planear())
+            except ValueError as e:
+                print(e)
+            input("Pressione Enter para continuar...")
+        elif saida == 20:
+            imprimir_resumo(registo.comparar())
+            input("Pressione Enter para continuar...")
+        elif saida == 21:
+            origem = input("Localidade de partida: ")
+            destino = input("Localidade de chegada: ")
+            # Os planeadores ficam entre consultas e só repetem a procura onde a opção 9 mudou algo
+            for transporte in [Carro(), Mota(), Helicoptero(), Drone()]:
+                try:
+                    chave = (origem, destino, type(transporte))
+                    if chave not in planeadores:
+                        planeadores[chave] = g.planeador_incremental(origem, destino, transporte)
+                    planeador = planeadores[chave]
+                    expansoes = planeador.expansoes
+                    caminho, custo = planeador.caminho()
+                    if caminho is None:
+                        print(f"[{transporte.nome}] Não existe caminho de {origem} para {destino}")
+                    else:
+                        print(f"[{transporte.nome}] {' -> '.join(caminho)} (custo {custo:.3f}, "
+                              f"{planeador.expansoes - expansoes} expansões)")
+                except ValueError as e:
+                    print(e)
+            input("Pressione Enter para continuar...")
         else:
             print("you didn't add anything")
             l = input("Pressione Enter para continuar...")
 
+        registo.descarregar()
+
+    registo.fechar()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
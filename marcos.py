@@ -0,0 +1,133 @@
+import heapq
+from array import array
+
+INFINITO = float('inf')
+
+
+class TabelaMarcos:
+    """
+    Distâncias de e para um conjunto de marcos (landmarks), para a heurística
+    ALT (A*, marcos e desigualdade triangular).
+
+    Os marcos são escolhidos pelo método do mais afastado e as distâncias são
+    calculadas com Dijkstra sobre os pesos das arestas do GrafoCompilado. Os
+    pesos negativos (prioridades altas) são tratados como 0, porque o Dijkstra
+    não os suporta; o A* com esta heurística soma os custos da mesma forma
+    (ver HeuristicaMarcos), pelo que os limites são admissíveis. A tabela é
+    reconstruída quando a topologia muda ou algum peso desce (ver
+    Grafo.atualizar_lote); se os pesos só sobem, como quando uma entrega
+    anula a prioridade do destino, os limites continuam válidos.
+    """
+
+    def __init__(self, grafo, n_marcos):
+        self.m_grafo = grafo
+        self.m_n_marcos = n_marcos
+        self.m_compilado = None
+        self.m_versao_pesos = -1
+        self.m_marcos = []
+        self.m_de = []
+        self.m_para = []
+
+    def atualizar(self):
+        """
+        Garante que a tabela corresponde ao grafo atual e devolve-a.
+        """
+        compilado = self.m_grafo.compilado()
+        if self.m_compilado is not compilado or self.m_versao_pesos != compilado.versao_pesos:
+            self.construir(compilado)
+        return self
+
+    @property
+    def marcos(self):
+        """
+        Nomes das localidades escolhidas como marcos.
+        """
+        nomes = self.atualizar().m_compilado.nomes
+        return [nomes[marco] for marco in self.m_marcos]
+
+    def construir(self, compilado):
+        self.m_compilado = compilado
+        self.m_versao_pesos = compilado.versao_pesos
+        self.m_marcos = []
+        self.m_de = []
+        self.m_para = []
+
+        n = compilado.n_nodos
+        if not n:
+            return
+
+        # Mais afastado: cada marco é o nó mais longe dos anteriores (primeiro os não alcançados)
+        minimos = [INFINITO] * n
+        ordem = compilado.ordem
+        for _ in range(min(self.m_n_marcos, n)):
+            marco = max(
+                (u for u in range(n) if u not in self.m_marcos),
+                key=lambda u: (minimos[u], -ordem[u]),
+            )
+            de = self._dijkstra(compilado, marco, False)
+            para = self._dijkstra(compilado, marco, True)
+            self.m_marcos.append(marco)
+            self.m_de.append(de)
+            self.m_para.append(para)
+            for u in range(n):
+                minimos[u] = min(minimos[u], de[u], para[u])
+
+    def limite_inferior(self, objetivo):
+        """
+        Devolve a função nó -> limite inferior da distância até ao objetivo
+        (índices do GrafoCompilado).
+        """
+        self.atualizar()
+        limites = []
+        for de, para in zip(self.m_de, self.m_para):
+            limites.append((de, de[objetivo], para, para[objetivo]))
+
+        def h(u):
+            melhor = 0
+            for de, de_objetivo, para, para_objetivo in limites:
+                # d(u, t) >= d(u, L) - d(t, L)
+                if para[u] == INFINITO:
+                    if para_objetivo != INFINITO:
+                        return INFINITO
+                elif para[u] - para_objetivo > melhor:
+                    melhor = para[u] - para_objetivo
+                # d(u, t) >= d(L, t) - d(L, u)
+                if de_objetivo == INFINITO:
+                    if de[u] != INFINITO:
+                        return INFINITO
+                elif de_objetivo - de[u] > melhor:
+                    melhor = de_objetivo - de[u]
+            return melhor
+
+        return h
+
+    @staticmethod
+    def _dijkstra(compilado, origem, inverso):
+        """
+        Distâncias a partir da origem (ou até ela, se inverso) com pesos não negativos.
+        """
+        pesos = compilado.pesos
+        if inverso:
+            inicios = compilado.entradas_inicios
+            arestas = compilado.entradas
+            vizinhos = compilado.origens
+        else:
+            inicios = compilado.inicios
+            arestas = None
+            vizinhos = compilado.destinos
+
+        distancias = array('d', [INFINITO]) * compilado.n_nodos
+        distancias[origem] = 0
+        heap = [(0, origem)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > distancias[u]:
+                continue
+            for i in range(inicios[u], inicios[u + 1]):
+                e = arestas[i] if inverso else i
+                v = vizinhos[e]
+                nova = d + max(pesos[e], 0)
+                if nova < distancias[v]:
+                    distancias[v] = nova
+                    heapq.heappush(heap, (nova, v))
+        return distancias
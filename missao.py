@@ -0,0 +1,303 @@
+INFINITO = float('inf')
+
+# Custo usado para troços sem caminho, para que as variações continuem finitas
+PENALIZACAO = 1e9
+
+
+class MatrizMissao:
+    """
+    Distâncias (km) e tempos (horas) dos caminhos mínimos entre um ponto de
+    partida e os pontos de entrega, para um transporte.
+
+    É feita uma só procura um para muitos por origem (ver
+    Grafo.caminhos_um_para_muitos) e os caminhos ficam guardados, pelo que o
+    otimizador pode avaliar qualquer ordem de visita sem voltar a procurar.
+    O índice 0 é o ponto de partida.
+    """
+
+    def __init__(self, grafo, partida, entregas, transporte, origens=None):
+        self.m_grafo = grafo
+        self.m_transporte = transporte
+        self.m_nodos = [partida] + [nodo for nodo in dict.fromkeys(entregas) if nodo != partida]
+        self.m_indices = {nodo: i for i, nodo in enumerate(self.m_nodos)}
+        n = len(self.m_nodos)
+        self.m_distancias = [[INFINITO] * n for _ in range(n)]
+        self.m_tempos = [[INFINITO] * n for _ in range(n)]
+        self.m_caminhos = {}
+        self.m_linhas = set()
+
+        # Linhas dos nós em origens (por omissão todas); as restantes são calculadas a pedido
+        for nodo in self.m_nodos if origens is None else origens:
+            self.linha(self.m_indices[nodo])
+
+    def linha(self, i):
+        """
+        Garante que a linha i (caminhos a partir do nó i) está calculada.
+        """
+        if i in self.m_linhas:
+            return
+        self.m_linhas.add(i)
+        self.m_distancias[i][i] = self.m_tempos[i][i] = 0
+        rotas = self.m_grafo.caminhos_um_para_muitos(self.m_nodos[i], self.m_nodos, self.m_transporte)
+        for destino, (caminho, _, distancia, tempo) in rotas.items():
+            j = self.m_indices[destino]
+            self.m_distancias[i][j] = distancia
+            self.m_tempos[i][j] = tempo
+            self.m_caminhos[(i, j)] = caminho
+
+    @property
+    def nodos(self):
+        return self.m_nodos
+
+    def indice(self, nodo):
+        return self.m_indices[nodo]
+
+    def distancia(self, i, j):
+        self.linha(i)
+        return self.m_distancias[i][j]
+
+    def tempo(self, i, j):
+        self.linha(i)
+        return self.m_tempos[i][j]
+
+    def caminho(self, i, j):
+        """
+        Caminho (nomes) de i para j, ou None se não existir.
+        """
+        if i == j:
+            return [self.m_nodos[i]]
+        self.linha(i)
+        return self.m_caminhos.get((i, j))
+
+    def alcancaveis(self):
+        """
+        Índices dos pontos de entrega alcançáveis a partir do ponto de partida.
+        """
+        return [j for j in range(1, len(self.m_nodos)) if self.m_distancias[0][j] < INFINITO]
+
+    def percorrer(self, ordem):
+        """
+        Distância e tempo de viagem de uma ordem de visita (índices, sem o 0).
+
+        Returns:
+            tuple: (distância, tempo, caminho completo)
+        """
+        distancia = tempo = 0
+        caminho = [self.m_nodos[0]]
+        anterior = 0
+        for i in ordem:
+            distancia += self.m_distancias[anterior][i]
+            tempo += self.m_tempos[anterior][i]
+            troco = self.caminho(anterior, i)
+            if troco:
+                caminho.extend(troco[1:])
+            anterior = i
+        return distancia, tempo, caminho
+
+
+class OtimizadorRota:
+    """
+    Ordem de visita dos pontos de entrega que minimiza
+
+        distância total + peso_prioridade * soma(prioridade * distância até à entrega)
+
+    ou seja, a distância percorrida mais um custo por cada quilómetro que uma
+    entrega prioritária espera. A rota é aberta (não volta ao ponto de
+    partida). Constrói-se com o vizinho mais próximo e melhora-se com 2-opt e
+    Or-opt; cada movimento é avaliado em O(1) com somas prefixas da rota atual.
+    """
+
+    def __init__(self, matriz, prioridades, peso_prioridade=0.1):
+        n = len(matriz.nodos)
+        self.m_distancias = [
+            [d if d < INFINITO else PENALIZACAO for d in matriz.m_distancias[i]] for i in range(n)
+        ]
+        self.m_prioridades = [0] + [prioridades.get(nodo, 0) for nodo in matriz.nodos[1:]]
+        self.m_peso = peso_prioridade
+
+    def avaliar(self, ordem):
+        """
+        Valor do objetivo de uma ordem de visita (índices, sem o 0).
+        """
+        d = self.m_distancias
+        p = self.m_prioridades
+        total = espera = 0
+        anterior = 0
+        for i in ordem:
+            total += d[anterior][i]
+            espera += p[i] * total
+            anterior = i
+        return total + self.m_peso * espera
+
+    def vizinho_mais_proximo(self, pontos):
+        d = self.m_distancias
+        por_visitar = list(pontos)
+        ordem = []
+        atual = 0
+        while por_visitar:
+            proximo = min(por_visitar, key=lambda j: (d[atual][j], -self.m_prioridades[j]))
+            por_visitar.remove(proximo)
+            ordem.append(proximo)
+            atual = proximo
+        return ordem
+
+    def otimizar(self, pontos, max_movimentos=10000):
+        """
+        Devolve a melhor ordem encontrada para os pontos (índices da matriz).
+        """
+        ordem = self.vizinho_mais_proximo(pontos)
+        return self.melhorar(ordem, max_movimentos)
+
+    def melhorar(self, ordem, max_movimentos=10000):
+        """
+        2-opt e Or-opt (segmentos de 1 a 3 pontos) até não haver melhoria.
+        """
+        rota = [0] + list(ordem)
+        for _ in range(max_movimentos):
+            if not (self._dois_opt(rota) or self._or_opt(rota)):
+                break
+        return rota[1:]
+
+    def _prefixos(self, rota):
+        d = self.m_distancias
+        p = self.m_prioridades
+        n = len(rota) - 1
+        chegada = [0] * (n + 1)
+        inverso = [0] * (n + 1)
+        pesos = [0] * (n + 1)
+        espera = [0] * (n + 1)
+        espera_inverso = [0] * (n + 1)
+        for k in range(1, n + 1):
+            chegada[k] = chegada[k - 1] + d[rota[k - 1]][rota[k]]
+            inverso[k] = inverso[k - 1] + d[rota[k]][rota[k - 1]]
+            pesos[k] = pesos[k - 1] + p[rota[k]]
+            espera[k] = espera[k - 1] + p[rota[k]] * chegada[k]
+            espera_inverso[k] = espera_inverso[k - 1] + p[rota[k]] * inverso[k]
+        return chegada, inverso, pesos, espera, espera_inverso
+
+    def _dois_opt(self, rota):
+        """
+        Primeira inversão rota[i..j] que melhora o objetivo; aplica-a e devolve True.
+        """
+        d = self.m_distancias
+        n = len(rota) - 1
+        chegada, inverso, pesos, espera, espera_inverso = self._prefixos(rota)
+        for i in range(1, n):
+            a, b = rota[i - 1], rota[i]
+            for j in range(i + 1, n + 1):
+                c = rota[j]
+                delta_distancia = d[a][c] + (inverso[j] - inverso[i]) - d[a][b] - (chegada[j] - chegada[i])
+                if j < n:
+                    e = rota[j + 1]
+                    delta_distancia += d[b][e] - d[c][e]
+                peso_segmento = pesos[j] - pesos[i - 1]
+                espera_nova = (peso_segmento * (chegada[i - 1] + d[a][c] + inverso[j])
+                               - (espera_inverso[j] - espera_inverso[i - 1]))
+                delta_espera = (espera_nova - (espera[j] - espera[i - 1])
+                                + (pesos[n] - pesos[j]) * delta_distancia)
+                if delta_distancia + self.m_peso * delta_espera < -1e-9:
+                    rota[i:j + 1] = rota[i:j + 1][::-1]
+                    return True
+        return False
+
+    def _or_opt(self, rota):
+        """
+        Primeira deslocação de um segmento de 1 a 3 pontos que melhora o
+        objetivo; aplica-a e devolve True.
+        """
+        d = self.m_distancias
+        n = len(rota) - 1
+        chegada, _, pesos, _, _ = self._prefixos(rota)
+        for comprimento in (1, 2, 3):
+            for s in range(1, n - comprimento + 2):
+                f = s + comprimento - 1
+                a, primeiro, ultimo = rota[s - 1], rota[s], rota[f]
+                interno = chegada[f] - chegada[s]
+                peso_segmento = pesos[f] - pesos[s - 1]
+
+                # Inserir depois de rota[k], para a frente (k > f) ou para trás (k < s - 1)
+                for k in list(range(f + 1, n + 1)) + list(range(0, s - 1)):
+                    x = rota[k]
+                    if k > f:
+                        seguinte = rota[f + 1]
+                        desvio = chegada[s - 1] + d[a][seguinte] - chegada[f + 1]
+                        inicio_segmento = chegada[k] + desvio + d[x][primeiro]
+                        fim_segmento = inicio_segmento + interno
+                        if k < n:
+                            delta_distancia = fim_segmento + d[ultimo][rota[k + 1]] - chegada[k + 1]
+                        else:
+                            delta_distancia = fim_segmento - chegada[n]
+                        delta_espera = ((pesos[k] - pesos[f]) * desvio
+                                        + peso_segmento * (inicio_segmento - chegada[s])
+                                        + (pesos[n] - pesos[k]) * delta_distancia)
+                    else:
+                        inicio_segmento = chegada[k] + d[x][primeiro]
+                        desvio = inicio_segmento + interno + d[ultimo][rota[k + 1]] - chegada[k + 1]
+                        if f < n:
+                            delta_distancia = chegada[s - 1] + desvio + d[rota[s - 1]][rota[f + 1]] - chegada[f + 1]
+                        else:
+                            delta_distancia = chegada[s - 1] + desvio - chegada[n]
+                        delta_espera = (peso_segmento * (inicio_segmento - chegada[s])
+                                        + (pesos[s - 1] - pesos[k]) * desvio
+                                        + (pesos[n] - pesos[f]) * delta_distancia)
+
+                    if delta_distancia + self.m_peso * delta_espera < -1e-9:
+                        segmento = rota[s:f + 1]
+                        del rota[s:f + 1]
+                        posicao = k + 1 if k < s else k + 1 - comprimento
+                        rota[posicao:posicao] = segmento
+                        return True
+        return False
+
+
+def comparar_ordens(grafo, partida, entregas, transporte, peso_prioridade=0.1):
+    """
+    Otimiza a ordem das entregas e compara-a com a ordem dada (por prioridade).
+
+    Returns:
+        dict: transporte, ordem e rota de cada alternativa, distância e tempo
+        de cada uma, poupanças e pontos inalcançáveis
+    """
+    matriz = MatrizMissao(grafo, partida, entregas, transporte)
+    prioridades = {nodo: grafo.m_nodos[nodo].get("prioridade", 0) for nodo in matriz.nodos}
+    otimizador = OtimizadorRota(matriz, prioridades, peso_prioridade)
+
+    alcancaveis = matriz.alcancaveis()
+    original = [matriz.indice(nodo) for nodo in entregas if matriz.indice(nodo) in alcancaveis]
+    otimizada = otimizador.otimizar(alcancaveis)
+    if otimizador.avaliar(original) <= otimizador.avaliar(otimizada):
+        otimizada = original
+
+    distancia_original, tempo_original, _ = matriz.percorrer(original)
+    distancia_otimizada, tempo_otimizado, rota_otimizada = matriz.percorrer(otimizada)
+    # Sem poupança definida se alguma das ordens tiver um troço sem caminho
+    completas = distancia_original < INFINITO and distancia_otimizada < INFINITO
+    return {
+        "transporte": transporte.nome,
+        "ordem_original": [matriz.nodos[i] for i in original],
+        "ordem_otimizada": [matriz.nodos[i] for i in otimizada],
+        "rota_otimizada": rota_otimizada,
+        "distancia_original": distancia_original,
+        "distancia_otimizada": distancia_otimizada,
+        "tempo_original": tempo_original,
+        "tempo_otimizado": tempo_otimizado,
+        "poupanca_distancia": distancia_original - distancia_otimizada if completas else None,
+        "poupanca_tempo": tempo_original - tempo_otimizado if completas else None,
+        "inalcancaveis": [matriz.nodos[i] for i in range(1, len(matriz.nodos)) if i not in alcancaveis],
+    }
+
+
+def imprimir_comparacao(r):
+    print(f"[Otimização da ordem - {r['transporte']}]")
+    print(f"Ordem por prioridade: {' -> '.join(r['ordem_original'])}")
+    print(f"Ordem otimizada: {' -> '.join(r['ordem_otimizada'])}")
+    if r["poupanca_distancia"] is None:
+        print("Há troços sem caminho numa das ordens: não é possível comparar.")
+        print(f"Distância otimizada: {r['distancia_otimizada']:.2f} km, tempo: {r['tempo_otimizado']:.2f} h")
+    else:
+        print(f"Distância: {r['distancia_original']:.2f} km -> {r['distancia_otimizada']:.2f} km "
+              f"(poupança {r['poupanca_distancia']:.2f} km)")
+        print(f"Tempo: {r['tempo_original']:.2f} h -> {r['tempo_otimizado']:.2f} h "
+              f"(poupança {r['poupanca_tempo']:.2f} h)")
+    if r["inalcancaveis"]:
+        print(f"Inalcançáveis: {', '.join(r['inalcancaveis'])}")
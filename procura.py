@@ -0,0 +1,1080 @@
+import heapq
+from collections import deque
+from caminhos import RegistoCaminhos
+
+TENTATIVAS = 3
+INFINITO = float('inf')
+
+# Resultado da confirmação de uma rota até ao objetivo
+ACEITE = "aceite"
+REJEITADA = "rejeitada"
+SEM_CAPACIDADE = "sem_capacidade"
+EXPANDIR = "expandir"
+
+
+class FronteiraFIFO:
+    """
+    Fila (procura em largura).
+    """
+
+    def __init__(self):
+        self.m_fila = deque()
+
+    def __len__(self):
+        return len(self.m_fila)
+
+    def inserir(self, nodo, rotulo, g, h):
+        self.m_fila.append((nodo, rotulo))
+
+    def retirar(self):
+        nodo, rotulo = self.m_fila.popleft()
+        return nodo, rotulo, 0
+
+
+class FronteiraLIFO:
+    """
+    Pilha (procura em profundidade).
+    """
+
+    def __init__(self):
+        self.m_pilha = []
+
+    def __len__(self):
+        return len(self.m_pilha)
+
+    def inserir(self, nodo, rotulo, g, h):
+        self.m_pilha.append((nodo, rotulo))
+
+    def retirar(self):
+        nodo, rotulo = self.m_pilha.pop()
+        return nodo, rotulo, 0
+
+
+class FronteiraPrioridade:
+    """
+    Fila de prioridade ordenada por g, h ou g+h.
+
+    As entradas são (prioridade, g, posição do nome, chave do caminho), pelo
+    que os empates se resolvem pelo nome do nó e depois pelo caminho.
+    """
+
+    def __init__(self, modo, caminhos, ordem):
+        self.m_modo = modo
+        self.m_caminhos = caminhos
+        self.m_ordem = ordem
+        self.m_heap = []
+
+    def __len__(self):
+        return len(self.m_heap)
+
+    def inserir(self, nodo, rotulo, g, h):
+        if self.m_modo == "g":
+            prioridade = g
+        elif self.m_modo == "h":
+            prioridade, g = h, 0
+        else:
+            prioridade = g + h
+        heapq.heappush(self.m_heap, (prioridade, g, self.m_ordem[nodo], self.m_caminhos.ordenavel(rotulo)))
+
+    def retirar(self):
+        _, g, _, chave = heapq.heappop(self.m_heap)
+        rotulo = chave.rotulo
+        return self.m_caminhos.nodo(rotulo), rotulo, g
+
+
+class Estrategia:
+    """
+    Configuração de um algoritmo sobre o motor de procura.
+
+    Args:
+        nome: Nome do algoritmo
+        fronteira: "fifo", "lifo", "g", "h" ou "g+h"
+        usa_custo: Guarda o melhor g por nó e só insere caminhos que o melhorem
+        custo_clima: O custo de cada aresta é o peso multiplicado pela penalidade de clima
+        verifica_ttl: Verifica a janela de tempo crítico de cada vizinho
+        inverter_vizinhos: Expande os vizinhos pela ordem inversa
+        max_iteracoes: Limite de iterações; com limite a procura é reiniciada
+            enquanto houver tentativas
+        verifica_acesso_objetivo: Ignora objetivos inacessíveis ao transporte
+        bidirecional: Tenta primeiro uma procura bidirecional (ver
+            MotorProcura._procurar_bidirecional)
+        um_para_muitos: Escolhe o próximo objetivo pelo custo real, com uma
+            só procura por etapa (ver MotorProcura.caminhos_para)
+        recursos: Procura com rótulos (custo, tempo, autonomia) que devolve a
+            rota ótima viável numa só procura (ver MotorProcura._procurar_recursos)
+        niveis_autonomia: Procura sobre estados (nó, nível de autonomia), com o
+            reabastecimento como ação explícita (ver MotorProcura._procurar_combustivel)
+    """
+
+    def __init__(self, nome, fronteira, usa_custo=False, custo_clima=False, verifica_ttl=True,
+                 inverter_vizinhos=False, max_iteracoes=None, verifica_acesso_objetivo=False,
+                 bidirecional=False, um_para_muitos=False, recursos=False, niveis_autonomia=None):
+        self.nome = nome
+        self.fronteira = fronteira
+        self.usa_custo = usa_custo
+        self.custo_clima = custo_clima
+        self.verifica_ttl = verifica_ttl
+        self.inverter_vizinhos = inverter_vizinhos
+        self.max_iteracoes = max_iteracoes
+        self.verifica_acesso_objetivo = verifica_acesso_objetivo
+        self.bidirecional = bidirecional
+        self.um_para_muitos = um_para_muitos
+        self.recursos = recursos
+        self.niveis_autonomia = niveis_autonomia
+
+    @property
+    def usa_heuristica(self):
+        return self.fronteira in ("h", "g+h")
+
+    def criar_fronteira(self, caminhos, ordem):
+        if self.fronteira == "fifo":
+            return FronteiraFIFO()
+        elif self.fronteira == "lifo":
+            return FronteiraLIFO()
+        return FronteiraPrioridade(self.fronteira, caminhos, ordem)
+
+
+class HeuristicaDistancia:
+    """
+    Distância em linha reta (haversine) até ao objetivo, lida da matriz de
+    distâncias do grafo. Equivalente a Grafo.calcular_heuristica.
+    """
+
+    def preparar(self, grafo, compilado, objetivo):
+        """
+        Devolve a função nó -> estimativa para o objetivo (índices do GrafoCompilado).
+        """
+        if not compilado.tem_coordenadas[objetivo]:
+            return lambda u: INFINITO
+        indices = compilado.indices_distancia
+        tem_coordenadas = compilado.tem_coordenadas
+        linha = grafo.m_distancias.linha(indices[objetivo])
+        return lambda u: linha[indices[u]] if tem_coordenadas[u] else INFINITO
+
+
+class HeuristicaMarcos:
+    """
+    Heuristica ALT: limites inferiores da distância (na escala dos pesos das
+    arestas) obtidos pela desigualdade triangular sobre marcos (ver TabelaMarcos).
+    """
+
+    # Os limites são calculados com os pesos negativos a 0, pelo que o A* que
+    # usa esta heurística soma os custos da mesma forma
+    custo_nao_negativo = True
+
+    def __init__(self, n_marcos=4):
+        self.m_n_marcos = n_marcos
+
+    def preparar(self, grafo, compilado, objetivo):
+        return grafo.tabela_marcos(self.m_n_marcos).limite_inferior(objetivo)
+
+
+class HeuristicaNomes:
+    """
+    Adapta uma função heurística (nodo, objetivo) sobre nomes de localidades.
+    """
+
+    def __init__(self, funcao):
+        self.m_funcao = funcao
+
+    def preparar(self, grafo, compilado, objetivo):
+        funcao = self.m_funcao
+        nomes = compilado.nomes
+        nome_objetivo = nomes[objetivo]
+        return lambda u: funcao(nomes[u], nome_objetivo)
+
+
+# Heurísticas selecionáveis pelo nome em a_star e procura_greedy
+HEURISTICAS = {
+    "distancia": HeuristicaDistancia,
+    "marcos": HeuristicaMarcos,
+}
+
+BFS = Estrategia("BFS", "fifo")
+DFS = Estrategia("DFS", "lifo", verifica_ttl=False, inverter_vizinhos=True)
+A_ESTRELA = Estrategia("A*", "g+h", usa_custo=True, max_iteracoes=1000)
+GULOSA = Estrategia("Greedy", "h", max_iteracoes=1000)
+CUSTO_UNIFORME = Estrategia("CustoUniforme", "g", usa_custo=True, custo_clima=True,
+                            max_iteracoes=1000, verifica_acesso_objetivo=True)
+BIDIRECIONAL = Estrategia("Bidirecional", "g", usa_custo=True, max_iteracoes=1000, bidirecional=True)
+MULTI_OBJETIVO = Estrategia("MultiObjetivo", "g", usa_custo=True, um_para_muitos=True)
+RECURSOS = Estrategia("Recursos", "g", usa_custo=True, recursos=True)
+COMBUSTIVEL = Estrategia("Combustivel", "g", usa_custo=True, niveis_autonomia=20)
+
+
+class MotorProcura:
+    """
+    Motor de procura partilhado por todos os algoritmos do Grafo.
+
+    Percorre os objetivos com entregas por ordem, procura uma rota até cada um
+    com a fronteira da estratégia e confirma-a (tempo crítico, clima,
+    reabastecimento, entrega) com a mesma lógica para todos os algoritmos.
+    """
+
+    def __init__(self, grafo, transporte, estrategia, heuristica=None, estatisticas=None):
+        self.m_grafo = grafo
+        self.m_transporte = transporte
+        self.m_estrategia = estrategia
+        if heuristica is None:
+            heuristica = HeuristicaDistancia()
+        elif isinstance(heuristica, str):
+            if heuristica not in HEURISTICAS:
+                raise ValueError(f"Heurística '{heuristica}' desconhecida.")
+            heuristica = HEURISTICAS[heuristica]()
+        elif not hasattr(heuristica, "preparar"):
+            heuristica = HeuristicaNomes(heuristica)
+        self.m_heuristica = heuristica
+
+        self.caminho_total = []
+        self.custo_total = 0
+        self.tempo_total = 0
+        self.ponto_atual = None
+        self.m_objetivos = set()
+        self.m_visitados_global = set()
+        self.m_tentativas = 0
+        self.m_iteracoes = 0
+        self.m_expansoes = 0
+
+        # Instrumentação (ver instrumentacao.py); sem estatísticas, o motor não é alterado
+        self.m_estatisticas = estatisticas
+        self.m_ao_expandir = None
+        if estatisticas is not None:
+            self._instrumentar(estatisticas)
+
+    def _instrumentar(self, estatisticas):
+        """
+        Substitui, só nesta instância, as fases da missão por versões que
+        contam e medem para as estatísticas (e chamam os hooks).
+
+        As verificações de caminho são feitas também dentro de confirmar_rota
+        (Grafo.verificar_caminho_completo), por isso durante cada execução é o
+        método do próprio grafo que é substituído, para que todas contem na
+        fase caminho_possivel.
+        """
+        executar = self.executar
+        objetivo_viavel = self.objetivo_viavel
+        confirmar_rota = self.confirmar_rota
+        medir = estatisticas.medir
+
+        def executar_contado(inicio, objetivos):
+            grafo = self.m_grafo
+            anterior = grafo.__dict__.get("verificar_caminho_possivel")
+            caminho_possivel = grafo.verificar_caminho_possivel
+
+            def caminho_possivel_contado(origem, destino, transporte):
+                estatisticas.verificacoes_caminho += 1
+                return caminho_possivel(origem, destino, transporte)
+
+            grafo.verificar_caminho_possivel = medir("caminho_possivel", caminho_possivel_contado)
+            expansoes = self.m_expansoes
+            try:
+                return executar(inicio, objetivos)
+            finally:
+                if anterior is None:
+                    del grafo.verificar_caminho_possivel
+                else:
+                    grafo.verificar_caminho_possivel = anterior
+                estatisticas.missoes += 1
+                estatisticas.expansoes += self.m_expansoes - expansoes
+
+        def objetivo_viavel_contado(objetivo):
+            viavel = objetivo_viavel(objetivo)
+            if not viavel:
+                estatisticas.objetivos_inviaveis += 1
+            return viavel
+
+        def confirmar_rota_contado(caminho, objetivo, abastecimentos=()):
+            estado = confirmar_rota(caminho, objetivo, abastecimentos)
+            if estado == ACEITE:
+                estatisticas.rotas_aceites += 1
+                if estatisticas.ao_aceitar is not None:
+                    estatisticas.ao_aceitar(objetivo, caminho)
+            else:
+                estatisticas.rotas_rejeitadas[estado] = estatisticas.rotas_rejeitadas.get(estado, 0) + 1
+                if estatisticas.ao_rejeitar is not None:
+                    estatisticas.ao_rejeitar(objetivo, caminho, estado)
+            return estado
+
+        self.executar = medir("outros", executar_contado)
+        self.objetivo_viavel = medir("viabilidade", objetivo_viavel_contado)
+        self.procurar_objetivo = medir("procura", self.procurar_objetivo)
+        self.caminhos_para = medir("procura", self.caminhos_para)
+        self.confirmar_rota = medir("confirmacao", confirmar_rota_contado)
+        self.m_ao_expandir = estatisticas.ao_expandir
+
+    def _inserir_heap(self, nodo):
+        """
+        heapq.heappush ou, com estatísticas, a versão que conta as inserções
+        (nodo(fila, entrada) dá o nome do nó, para o hook).
+        """
+        if self.m_estatisticas is None:
+            return heapq.heappush
+        return self.m_estatisticas.contar_insercoes(heapq.heappush, nodo)
+
+    def executar(self, inicio, objetivos):
+        grafo = self.m_grafo
+        transporte = self.m_transporte
+
+        # Basic input validation
+        if not objetivos:
+            return [], 0, 0
+
+        # Filter for locations that need deliveries
+        locais_entrega = [obj for obj in objetivos if grafo.m_nodos[obj]["alimentos"] > 0]
+        if not locais_entrega:
+            return [], 0, 0
+
+        # Validate starting point and objectives
+        if inicio not in grafo.m_nodos:
+            raise ValueError(f"Nó '{inicio}' não existe no grafo.")
+        for objetivo in objetivos:
+            if objetivo not in grafo.m_nodos:
+                raise ValueError(f"Nó objetivo '{objetivo}' não existe no grafo.")
+
+        # Validate starting point accessibility
+        if not transporte.transporte_pode(grafo.m_nodos[inicio]["acessibilidade"]):
+            raise ValueError(f"Transporte {transporte.nome} não pode acessar o ponto inicial {inicio}")
+
+        self.ponto_atual = inicio
+        self.m_objetivos = set(objetivos)
+
+        if self.m_estrategia.um_para_muitos:
+            self._executar_por_custo(locais_entrega)
+            return self.resultado()
+
+        # Process each delivery location
+        for objetivo in locais_entrega:
+            if not self.objetivo_viavel(objetivo):
+                continue
+            self.procurar_objetivo(objetivo)
+
+        return self.resultado()
+
+    def _executar_por_custo(self, locais_entrega):
+        """
+        Em cada etapa, uma só procura a partir do ponto atual dá as rotas para
+        todos os objetivos pendentes; tenta-se o mais barato primeiro (empates
+        pela ordem da lista) e os seguintes se a rota não for aceite.
+        """
+        pendentes = list(locais_entrega)
+        while pendentes:
+            viaveis = [objetivo for objetivo in pendentes if self.objetivo_viavel(objetivo)]
+            rotas = self.caminhos_para(viaveis)
+            candidatos = sorted(rotas, key=lambda objetivo: (rotas[objetivo][1], pendentes.index(objetivo)))
+
+            for objetivo in candidatos:
+                if self.confirmar_rota(rotas[objetivo][0], objetivo) == ACEITE:
+                    pendentes.remove(objetivo)
+                    break
+            else:
+                break
+
+    def caminhos_para(self, alvos):
+        """
+        Dijkstra único (um para muitos) a partir do ponto atual, que termina
+        quando todos os alvos estão fechados. Aplica as restrições de
+        _restricoes e o tempo crítico de cada nó.
+
+        Returns:
+            dict: alvo -> (caminho, custo, distância, tempo de viagem), só
+            para os alvos alcançados
+        """
+        compilado, passagem, aresta = self._restricoes()
+        inicios = compilado.inicios
+        destinos = compilado.destinos
+        distancias = compilado.distancias
+        ttl = compilado.coluna("TTL")
+        nomes = compilado.nomes
+        ordem = compilado.ordem
+        verifica_ttl = self.m_estrategia.verifica_ttl
+        heappush = self._inserir_heap(lambda fila, entrada: nomes[entrada[2]])
+        ao_expandir = self.m_ao_expandir
+
+        origem = compilado.indices[self.ponto_atual]
+        pendentes = {compilado.indices[alvo] for alvo in alvos}
+        pendentes.discard(origem)
+
+        custos = {origem: 0}
+        pais = {origem: -1}
+        tempos = {origem: self.tempo_total}
+        quilometros = {origem: 0}
+        fronteira = [(0, ordem[origem], origem)]
+        fechados = set()
+        rotas = {}
+
+        while fronteira and pendentes:
+            g_atual, _, atual = heapq.heappop(fronteira)
+            if atual in fechados or g_atual > custos[atual]:
+                continue
+            fechados.add(atual)
+            self.m_expansoes += 1
+            if ao_expandir is not None:
+                ao_expandir(nomes[atual])
+
+            if atual in pendentes:
+                pendentes.discard(atual)
+                caminho = []
+                nodo = atual
+                while nodo != -1:
+                    caminho.append(nomes[nodo])
+                    nodo = pais[nodo]
+                rotas[nomes[atual]] = (caminho[::-1], g_atual, quilometros[atual], tempos[atual] - self.tempo_total)
+
+            for e in range(inicios[atual], inicios[atual + 1]):
+                vizinho = destinos[e]
+                if vizinho in fechados or not passagem(vizinho):
+                    continue
+                utilizavel = aresta(e, atual, vizinho)
+                if utilizavel is None:
+                    continue
+                tempo_viagem, custo = utilizavel
+                tempo_estimado = tempos[atual] + tempo_viagem
+                if verifica_ttl and not tempo_estimado <= ttl[vizinho]:
+                    continue
+
+                novo_g = g_atual + custo
+                if novo_g >= custos.get(vizinho, INFINITO):
+                    continue
+                custos[vizinho] = novo_g
+                pais[vizinho] = atual
+                tempos[vizinho] = tempo_estimado
+                quilometros[vizinho] = quilometros[atual] + distancias[e]
+                heappush(fronteira, (novo_g, ordem[vizinho], vizinho))
+
+        return rotas
+
+    def objetivo_viavel(self, objetivo):
+        grafo = self.m_grafo
+        transporte = self.m_transporte
+
+        if self.m_estrategia.recursos or self.m_estrategia.niveis_autonomia:
+            # Só verificações exatas: autonomia, clima e tempo crítico ficam para a procura
+            if grafo.m_nodos[objetivo].get("alimentos", 0) > transporte.capacidade:
+                return False
+            if not transporte.transporte_pode(grafo.m_nodos[objetivo]["acessibilidade"]):
+                return False
+            return self._caminho_possivel(objetivo)
+
+        # Verify if path is possible considering vehicle limitations
+        viavel, motivo = grafo.verificar_viabilidade_transporte(transporte, self.ponto_atual, objetivo)
+        if not viavel:
+            return False
+
+        if not self._caminho_possivel(objetivo):
+            return False
+
+        if (self.m_estrategia.verifica_acesso_objetivo and
+                not transporte.transporte_pode(grafo.m_nodos[objetivo]["acessibilidade"])):
+            return False
+
+        return True
+
+    def _caminho_possivel(self, objetivo):
+        return self.m_grafo.verificar_caminho_possivel(self.ponto_atual, objetivo, self.m_transporte)
+
+    def procurar_objetivo(self, objetivo):
+        """
+        Procura e confirma uma rota do ponto atual até ao objetivo.
+        """
+        if self.m_estrategia.recursos:
+            return self._procurar_recursos(objetivo)
+        if self.m_estrategia.niveis_autonomia:
+            return self._procurar_combustivel(objetivo)
+        if self.m_estrategia.bidirecional and self._procurar_bidirecional(objetivo):
+            return True
+
+        self.m_tentativas = TENTATIVAS
+        limite = self.m_estrategia.max_iteracoes
+        if limite is None:
+            return self._procurar(objetivo)
+
+        encontrado = False
+        self.m_iteracoes = 0
+        while not encontrado and self.m_tentativas > 0 and self.m_iteracoes < limite:
+            self.m_iteracoes += 1
+            encontrado = self._procurar(objetivo)
+        if not encontrado and self.m_iteracoes >= limite and self.m_estatisticas is not None:
+            self.m_estatisticas.limites_iteracoes += 1
+        return encontrado
+
+    def _procurar(self, objetivo):
+        grafo = self.m_grafo
+        transporte = self.m_transporte
+        estrategia = self.m_estrategia
+        limite = estrategia.max_iteracoes
+
+        # Estruturas compiladas (índices inteiros, CSR, tabelas por aresta)
+        compilado = grafo.compilado()
+        inicios = compilado.inicios
+        destinos = compilado.destinos
+        pesos = compilado.pesos
+        distancias = compilado.distancias
+        ttl = compilado.coluna("TTL")
+        nomes = compilado.nomes
+        tabela = grafo.tabela_tempos(transporte).atualizar()
+        tempos_arestas = tabela.m_tempos
+        seguros = tabela.m_seguros
+        alcance = grafo.indice_alcance(transporte).atualizar()
+        acessiveis = alcance.m_acessiveis
+        alcancavel = alcance.alcancavel_indices
+        indices = compilado.indices
+        objetivos = {indices[nodo] for nodo in self.m_objetivos}
+        visitados_global = {indices[nodo] for nodo in self.m_visitados_global}
+
+        origem = indices[self.ponto_atual]
+        destino = indices[objetivo]
+        heuristica = None
+        custo_nao_negativo = False
+        if estrategia.usa_heuristica:
+            heuristica = self.m_heuristica.preparar(grafo, compilado, destino)
+            custo_nao_negativo = getattr(self.m_heuristica, "custo_nao_negativo", False)
+
+        caminhos = RegistoCaminhos(compilado.ordem)
+        fronteira = estrategia.criar_fronteira(caminhos, compilado.ordem)
+        if self.m_estatisticas is not None:
+            fronteira.inserir = self.m_estatisticas.contar_insercoes(fronteira.inserir, lambda nodo, *_: nomes[nodo])
+        ao_expandir = self.m_ao_expandir
+        h_inicial = heuristica(origem) if heuristica else 0
+        fronteira.inserir(origem, caminhos.registar(origem), 0, h_inicial)
+        visitados = set()
+        custos = {origem: 0}
+        tempos = {origem: self.tempo_total}
+
+        while fronteira:
+            if limite is None:
+                if self.m_tentativas <= 0:
+                    break
+            else:
+                if self.m_iteracoes >= limite:
+                    break
+                self.m_iteracoes += 1
+
+            atual, rotulo, g_atual = fronteira.retirar()
+
+            if atual == destino:
+                caminho = [nomes[u] for u in caminhos.caminho(rotulo)]
+                estado = self.confirmar_rota(caminho, objetivo)
+                if estado == ACEITE:
+                    return True
+                if estado == REJEITADA:
+                    visitados_global = {indices[nodo] for nodo in self.m_visitados_global}
+                    self.m_tentativas -= 1
+                    continue
+                if estado == SEM_CAPACIDADE:
+                    visitados_global = {indices[nodo] for nodo in self.m_visitados_global}
+                    continue
+
+            if atual in visitados:
+                continue
+            visitados.add(atual)
+            self.m_expansoes += 1
+            if ao_expandir is not None:
+                ao_expandir(nomes[atual])
+
+            arestas = range(inicios[atual], inicios[atual + 1])
+            if estrategia.inverter_vizinhos:
+                arestas = reversed(arestas)
+
+            for e in arestas:
+                vizinho = destinos[e]
+                if vizinho in visitados or not acessiveis[vizinho]:
+                    continue
+
+                # Skip already visited nodes unless they're objectives
+                if vizinho in visitados_global and vizinho not in objetivos:
+                    continue
+
+                # Check weather conditions for next step
+                tempo_viagem = tempos_arestas[e]
+                if tempo_viagem != tempo_viagem:
+                    tempo_viagem, seguro = grafo.calcular_tempo_viagem(nomes[atual], nomes[vizinho], transporte)
+                else:
+                    seguro = seguros[e]
+                if not seguro or tempo_viagem == INFINITO:
+                    continue
+
+                # Verify critical time window
+                if estrategia.verifica_ttl:
+                    tempo_estimado = tempos[atual] + tempo_viagem
+                    if not tempo_estimado <= ttl[vizinho]:
+                        continue
+
+                if not alcancavel(atual, vizinho):
+                    continue
+
+                novo_g = 0
+                if estrategia.usa_custo:
+                    peso = pesos[e]
+                    if custo_nao_negativo and peso < 0:
+                        peso = 0
+                    if estrategia.custo_clima:
+                        tempo_base = distancias[e] / transporte.velocidade
+                        novo_g = g_atual + (peso * (tempo_viagem / tempo_base))
+                    else:
+                        novo_g = g_atual + peso
+                    if vizinho in custos and novo_g >= custos[vizinho]:
+                        continue
+                    custos[vizinho] = novo_g
+
+                if estrategia.verifica_ttl:
+                    tempos[vizinho] = tempo_estimado
+
+                h = heuristica(vizinho) if heuristica else 0
+                fronteira.inserir(vizinho, caminhos.registar(vizinho, rotulo), novo_g, h)
+
+        return False
+
+    def _restricoes(self):
+        """
+        Restrições partilhadas pelas procuras de Dijkstra (bidirecional e um
+        para muitos), sobre índices do GrafoCompilado.
+
+        Returns:
+            tuple: (compilado, passagem, aresta) em que passagem(v) diz se o
+            transporte pode passar pelo nó v e aresta(e, u, v) devolve
+            (tempo, custo) da aresta e, ou None se não for utilizável
+        """
+        grafo = self.m_grafo
+        transporte = self.m_transporte
+        custo_clima = self.m_estrategia.custo_clima
+
+        compilado = grafo.compilado()
+        pesos = compilado.pesos
+        distancias = compilado.distancias
+        nomes = compilado.nomes
+        tabela = grafo.tabela_tempos(transporte).atualizar()
+        tempos_arestas = tabela.m_tempos
+        seguros = tabela.m_seguros
+        alcance = grafo.indice_alcance(transporte).atualizar()
+        acessiveis = alcance.m_acessiveis
+        alcancavel = alcance.alcancavel_indices
+        indices = compilado.indices
+        objetivos = {indices[nodo] for nodo in self.m_objetivos}
+        visitados_global = {indices[nodo] for nodo in self.m_visitados_global}
+
+        def passagem(v):
+            # Skip already visited nodes unless they're objectives
+            return acessiveis[v] and (v not in visitados_global or v in objetivos)
+
+        def aresta(e, u, v):
+            tempo_viagem = tempos_arestas[e]
+            if tempo_viagem != tempo_viagem:
+                tempo_viagem, seguro = grafo.calcular_tempo_viagem(nomes[u], nomes[v], transporte)
+            else:
+                seguro = seguros[e]
+            if not seguro or tempo_viagem == INFINITO or not alcancavel(u, v):
+                return None
+            # Pesos negativos contam como 0 (Dijkstra)
+            custo = max(pesos[e], 0)
+            if custo_clima:
+                custo *= tempo_viagem / (distancias[e] / transporte.velocidade)
+            return tempo_viagem, custo
+
+        return compilado, passagem, aresta
+
+    def _procurar_recursos(self, objetivo):
+        """
+        Caminho mais curto com restrições de recursos (label-setting).
+
+        Cada rótulo guarda (custo, tempo, autonomia) de um caminho parcial,
+        calculados como em confirmar_rota e Grafo.verificar_caminho_tempo_critico:
+        o custo é a distância mais 10 por reabastecimento, o tempo soma a
+        viagem, 0.5h por nó com alimentos e 0.1h por nó de reabastecimento, e
+        o depósito só é atestado quando o troço seguinte excede a autonomia.
+        Rótulos que violam o tempo crítico ou a autonomia são descartados e
+        os dominados (custo e tempo maiores, autonomia menor) são podados,
+        pelo que o primeiro rótulo a chegar ao objetivo é a rota viável de
+        menor custo. Devolve True se a rota foi aceite.
+        """
+        transporte = self.m_transporte
+        compilado, passagem, aresta = self._restricoes()
+        inicios = compilado.inicios
+        destinos = compilado.destinos
+        distancias = compilado.distancias
+        ttl = compilado.coluna("TTL")
+        alimentos = compilado.coluna("alimentos")
+        reabastecimento = compilado.coluna("reabastecimento")
+        nomes = compilado.nomes
+        ordem = compilado.ordem
+        deposito = transporte.deposito
+
+        origem = compilado.indices[self.ponto_atual]
+        destino = compilado.indices[objetivo]
+        if origem == destino or not self.tempo_total <= ttl[origem]:
+            return False
+        ao_expandir = self.m_ao_expandir
+
+        # Rótulos: (custo, tempo, autonomia) e rótulo anterior; por nó, os não dominados
+        nodos = [origem]
+        pais = [-1]
+        valores = [(0, self.tempo_total, transporte.autonomia)]
+        pareto = {origem: [0]}
+        fronteira = [(0, self.tempo_total, -transporte.autonomia, ordem[origem], 0)]
+        heappush = self._inserir_heap(lambda fila, entrada: nomes[nodos[entrada[4]]])
+
+        while fronteira:
+            custo, tempo, _, _, rotulo = heapq.heappop(fronteira)
+            if rotulo not in pareto.get(nodos[rotulo], ()):
+                continue
+            atual = nodos[rotulo]
+            autonomia = valores[rotulo][2]
+
+            if atual == destino:
+                caminho = []
+                while rotulo != -1:
+                    caminho.append(nomes[nodos[rotulo]])
+                    rotulo = pais[rotulo]
+                return self.confirmar_rota(caminho[::-1], objetivo) == ACEITE
+            self.m_expansoes += 1
+            if ao_expandir is not None:
+                ao_expandir(nomes[atual])
+
+            for e in range(inicios[atual], inicios[atual + 1]):
+                vizinho = destinos[e]
+                if not passagem(vizinho):
+                    continue
+                utilizavel = aresta(e, atual, vizinho)
+                if utilizavel is None:
+                    continue
+                tempo_viagem, _ = utilizavel
+
+                distancia = distancias[e]
+                novo_custo = custo + distancia
+                restante = autonomia
+                if distancia > restante:
+                    if not reabastecimento[atual]:
+                        continue
+                    restante = deposito
+                    novo_custo += 10
+                restante -= distancia
+                if restante < 0:
+                    continue
+
+                novo_tempo = tempo + tempo_viagem
+                if alimentos[vizinho] > 0:
+                    novo_tempo += 0.5
+                if reabastecimento[atual]:
+                    novo_tempo += 0.1
+                if not novo_tempo <= ttl[vizinho]:
+                    continue
+
+                # Dominância
+                rotulos = pareto.setdefault(vizinho, [])
+                if any(valores[r][0] <= novo_custo and valores[r][1] <= novo_tempo and valores[r][2] >= restante
+                       for r in rotulos):
+                    continue
+                rotulos[:] = [
+                    r for r in rotulos
+                    if not (novo_custo <= valores[r][0] and novo_tempo <= valores[r][1] and restante >= valores[r][2])
+                ]
+
+                novo = len(nodos)
+                nodos.append(vizinho)
+                pais.append(rotulo)
+                valores.append((novo_custo, novo_tempo, restante))
+                rotulos.append(novo)
+                heappush(fronteira, (novo_custo, novo_tempo, -restante, ordem[vizinho], novo))
+
+        return False
+
+    def _procurar_combustivel(self, objetivo):
+        """
+        Dijkstra sobre estados (nó, nível de autonomia).
+
+        Ao contrário de confirmar_rota, que só reabastece quando o troço
+        seguinte excede a autonomia, aqui reabastecer num nó de reabastecimento
+        é uma ação própria (custo 10), pelo que a rota pode atestar antes, no
+        ponto em que sai mais barato. O tempo segue
+        Grafo.verificar_caminho_tempo_critico, que já conta 0.1h em cada nó de
+        reabastecimento, e os estados que violam o tempo crítico são podados.
+
+        A autonomia é dividida em niveis_autonomia níveis de deposito/níveis km;
+        cada estado guarda o rótulo de menor custo do seu nível, com a
+        autonomia exata, pelo que as rotas encontradas são sempre viáveis e o
+        número de estados fica limitado a nós x (níveis + 1).
+        Devolve True se a rota foi aceite.
+        """
+        transporte = self.m_transporte
+        compilado, passagem, aresta = self._restricoes()
+        inicios = compilado.inicios
+        destinos = compilado.destinos
+        distancias = compilado.distancias
+        ttl = compilado.coluna("TTL")
+        alimentos = compilado.coluna("alimentos")
+        reabastecimento = compilado.coluna("reabastecimento")
+        nomes = compilado.nomes
+        ordem = compilado.ordem
+        deposito = transporte.deposito
+        niveis = self.m_estrategia.niveis_autonomia
+        largura = deposito / niveis
+
+        def estado(nodo, autonomia):
+            return nodo * (niveis + 1) + min(niveis, max(0, int(autonomia // largura)))
+
+        origem = compilado.indices[self.ponto_atual]
+        destino = compilado.indices[objetivo]
+        if origem == destino or not self.tempo_total <= ttl[origem]:
+            return False
+
+        # Melhor rótulo por estado: (custo, autonomia, tempo, nó, estado anterior, reabasteceu)
+        inicial = estado(origem, transporte.autonomia)
+        rotulos = {inicial: (0, transporte.autonomia, self.tempo_total, origem, None, False)}
+        fronteira = [(0, self.tempo_total, ordem[origem], -transporte.autonomia, inicial)]
+        heappush = self._inserir_heap(lambda fila, entrada: nomes[rotulos[entrada[4]][3]])
+        ao_expandir = self.m_ao_expandir
+
+        def relaxar(novo, custo, autonomia, tempo, nodo, anterior, reabasteceu):
+            melhor = rotulos.get(novo)
+            if melhor is not None and (melhor[0], -melhor[1], melhor[2]) <= (custo, -autonomia, tempo):
+                return
+            rotulos[novo] = (custo, autonomia, tempo, nodo, anterior, reabasteceu)
+            heappush(fronteira, (custo, tempo, ordem[nodo], -autonomia, novo))
+
+        while fronteira:
+            custo, tempo, _, negativa, atual_estado = heapq.heappop(fronteira)
+            rotulo = rotulos[atual_estado]
+            if (rotulo[0], rotulo[2], rotulo[1]) != (custo, tempo, -negativa):
+                continue
+            atual = rotulo[3]
+            autonomia = rotulo[1]
+
+            if atual == destino:
+                passos = []
+                while atual_estado is not None:
+                    _, _, _, nodo, atual_estado, reabasteceu = rotulos[atual_estado]
+                    passos.append((nodo, reabasteceu))
+                caminho = []
+                abastecimentos = set()
+                for nodo, reabasteceu in reversed(passos):
+                    if reabasteceu:
+                        abastecimentos.add(len(caminho) - 1)
+                    else:
+                        caminho.append(nomes[nodo])
+                return self.confirmar_rota(caminho, objetivo, abastecimentos) == ACEITE
+            self.m_expansoes += 1
+            if ao_expandir is not None:
+                ao_expandir(nomes[atual])
+
+            # Reabastecer: mesmo nó, depósito cheio
+            if reabastecimento[atual] and autonomia < deposito:
+                relaxar(estado(atual, deposito), custo + 10, deposito, tempo, atual, atual_estado, True)
+
+            for e in range(inicios[atual], inicios[atual + 1]):
+                vizinho = destinos[e]
+                distancia = distancias[e]
+                if distancia > autonomia or not passagem(vizinho):
+                    continue
+                utilizavel = aresta(e, atual, vizinho)
+                if utilizavel is None:
+                    continue
+
+                novo_tempo = tempo + utilizavel[0]
+                if alimentos[vizinho] > 0:
+                    novo_tempo += 0.5
+                if reabastecimento[atual]:
+                    novo_tempo += 0.1
+                if not novo_tempo <= ttl[vizinho]:
+                    continue
+                restante = autonomia - distancia
+                relaxar(estado(vizinho, restante), custo + distancia, restante, novo_tempo,
+                        vizinho, atual_estado, False)
+
+        return False
+
+    def _procurar_bidirecional(self, objetivo):
+        """
+        Dijkstra bidirecional do ponto atual até ao objetivo: uma procura para
+        a frente e outra para trás (CSR inverso), que param quando a soma dos
+        mínimos das duas fronteiras já não melhora o melhor encontro.
+
+        Aplica as mesmas restrições das outras procuras (acessibilidade,
+        clima, alcance e nós já percorridos); o tempo crítico só pode ser
+        verificado para a frente, pelo que a rota é confirmada no fim. Os
+        pesos negativos contam como 0, para que a condição de paragem seja
+        válida. Devolve True se a rota foi aceite; caso contrário o motor
+        recorre à procura unidirecional.
+        """
+        compilado, passagem, aresta = self._restricoes()
+        inicios = compilado.inicios
+        destinos = compilado.destinos
+        entradas_inicios = compilado.entradas_inicios
+        entradas = compilado.entradas
+        origens = compilado.origens
+        ttl = compilado.coluna("TTL")
+        nomes = compilado.nomes
+        ordem = compilado.ordem
+        verifica_ttl = self.m_estrategia.verifica_ttl
+        heappush = self._inserir_heap(lambda fila, entrada: nomes[entrada[2]])
+        ao_expandir = self.m_ao_expandir
+
+        origem = compilado.indices[self.ponto_atual]
+        destino = compilado.indices[objetivo]
+        if not passagem(destino):
+            return False
+
+        # Índice 0: para a frente a partir da origem; 1: para trás a partir do destino
+        custos = ({origem: 0}, {destino: 0})
+        pais = ({origem: -1}, {destino: -1})
+        fronteiras = ([(0, ordem[origem], origem)], [(0, ordem[destino], destino)])
+        fechados = (set(), set())
+        tempos = {origem: self.tempo_total}
+        melhor = 0 if origem == destino else INFINITO
+        encontro = origem if origem == destino else -1
+
+        while fronteiras[0] and fronteiras[1]:
+            if fronteiras[0][0][0] + fronteiras[1][0][0] >= melhor:
+                break
+            lado = 0 if len(fronteiras[0]) <= len(fronteiras[1]) else 1
+            g_atual, _, atual = heapq.heappop(fronteiras[lado])
+            if atual in fechados[lado] or g_atual > custos[lado][atual]:
+                continue
+            fechados[lado].add(atual)
+            self.m_expansoes += 1
+            if ao_expandir is not None:
+                ao_expandir(nomes[atual])
+
+            if lado == 0:
+                arestas = ((e, atual, destinos[e]) for e in range(inicios[atual], inicios[atual + 1]))
+            else:
+                arestas = (
+                    (e, origens[e], atual)
+                    for e in entradas[entradas_inicios[atual]:entradas_inicios[atual + 1]]
+                )
+
+            for e, u, v in arestas:
+                vizinho = v if lado == 0 else u
+                if vizinho in fechados[lado]:
+                    continue
+                if (lado == 0 or vizinho != origem) and not passagem(vizinho):
+                    continue
+
+                utilizavel = aresta(e, u, v)
+                if utilizavel is None:
+                    continue
+                tempo_viagem, custo = utilizavel
+                if lado == 0 and verifica_ttl:
+                    tempo_estimado = tempos[atual] + tempo_viagem
+                    if not tempo_estimado <= ttl[vizinho]:
+                        continue
+
+                novo_g = g_atual + custo
+                if novo_g >= custos[lado].get(vizinho, INFINITO):
+                    continue
+                custos[lado][vizinho] = novo_g
+                pais[lado][vizinho] = atual
+                if lado == 0:
+                    tempos[vizinho] = tempo_estimado if verifica_ttl else 0
+                heappush(fronteiras[lado], (novo_g, ordem[vizinho], vizinho))
+
+                outro = custos[1 - lado].get(vizinho)
+                if outro is not None and novo_g + outro < melhor:
+                    melhor = novo_g + outro
+                    encontro = vizinho
+
+        if encontro < 0:
+            return False
+
+        caminho = []
+        nodo = encontro
+        while nodo != -1:
+            caminho.append(nodo)
+            nodo = pais[0][nodo]
+        caminho.reverse()
+        nodo = pais[1][encontro]
+        while nodo != -1:
+            caminho.append(nodo)
+            nodo = pais[1][nodo]
+
+        return self.confirmar_rota([nomes[u] for u in caminho], objetivo) == ACEITE
+
+    def confirmar_rota(self, caminho, objetivo, abastecimentos=()):
+        """
+        Verifica a rota até ao objetivo e, se for viável, percorre-a: atualiza o
+        transporte, custos e tempos e faz a entrega. abastecimentos são as
+        posições do caminho onde se reabastece mesmo sem ser preciso.
+        """
+        grafo = self.m_grafo
+        nodos = grafo.m_nodos
+        transporte = self.m_transporte
+
+        viavel, tempo_rota = grafo.verificar_caminho_tempo_critico(caminho, transporte, self.tempo_total)
+        if not (viavel and grafo.verificar_caminho_completo(caminho, transporte)):
+            return EXPANDIR
+
+        # Verify weather conditions for entire route
+        for j in range(len(caminho) - 1):
+            tempo_viagem, seguro = grafo.calcular_tempo_viagem(caminho[j], caminho[j + 1], transporte)
+            if not seguro or tempo_viagem == INFINITO:
+                return REJEITADA
+
+        # Autonomia e reabastecimentos simulados antes de alterar o estado da missão
+        autonomia = transporte.autonomia
+        distancias = []
+        for j in range(len(caminho) - 1):
+            distancia = grafo.calcular_distancia(caminho[j], caminho[j + 1])
+            if distancia > autonomia or j in abastecimentos:
+                if not nodos[caminho[j]].get("reabastecimento", False):
+                    return REJEITADA
+                autonomia = transporte.deposito
+            autonomia -= distancia
+            distancias.append(distancia)
+
+        # Process the confirmed route
+        for j in range(len(caminho) - 1):
+            atual_nodo = caminho[j]
+            proximo_nodo = caminho[j + 1]
+
+            if atual_nodo not in self.m_objetivos:
+                self.m_visitados_global.add(atual_nodo)
+
+            distancia = distancias[j]
+
+            # Check and handle refueling
+            if distancia > transporte.autonomia or j in abastecimentos:
+                transporte.abastecer()
+                self.tempo_total += 0.1  # 6 minutes for refueling
+                self.custo_total += 10   # Refueling cost
+
+            transporte.viajar(distancia)
+            self.custo_total += distancia
+            tempo_viagem, _ = grafo.calcular_tempo_viagem(atual_nodo, proximo_nodo, transporte)
+            self.tempo_total += tempo_viagem
+
+        # Add nodes to total path
+        for nodo in caminho:
+            if not self.caminho_total or self.caminho_total[-1] != nodo:
+                self.caminho_total.append(nodo)
+
+        # Handle delivery at destination
+        if nodos[objetivo]["alimentos"] > 0:
+            carga = nodos[objetivo]["alimentos"]
+            if carga <= transporte.capacidade:
+                transporte.descarregar(carga)
+                self.custo_total += 15  # Delivery cost
+                self.tempo_total += 0.5  # 30 minutes for unloading
+                atributos = grafo._escrever_atributos(objetivo)
+                atributos["alimentos"] = 0
+                atributos["prioridade"] = 0
+                grafo._atributos_alterados(objetivo, "alimentos", "prioridade")
+            else:
+                return SEM_CAPACIDADE
+
+        # Resupply if available
+        if nodos[objetivo].get("supply_refill", False):
+            transporte.carregar()
+
+        self.ponto_atual = objetivo
+        self.tempo_total = tempo_rota
+        return ACEITE
+
+    def resultado(self):
+        # Return results
+        if self.tempo_total > 0:
+            tempo_total = (self.tempo_total * 60) / 100  # Convert to hours
+            print(f"Caminho total percorrido: {' -> '.join(self.caminho_total)}")
+            print(f"Custo total acumulado: {self.custo_total:.3f}")
+            print(f"Tempo total acumulado: {tempo_total:.2f} horas")
+            return self.caminho_total, round(self.custo_total, 3), tempo_total
+        else:
+            print("Nenhum caminho válido encontrado")
+            return [], 0, 0
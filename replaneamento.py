@@ -0,0 +1,220 @@
+import heapq
+from array import array
+
+INFINITO = float('inf')
+# Valor de g e rhs de um nó sem caminho até ao destino
+SEM_CAMINHO = (INFINITO, 0)
+
+
+class PlaneadorIncremental:
+    """
+    Caminho de custo mínimo entre dois nós mantido entre alterações do grafo
+    (D* Lite, Koenig e Likhachev).
+
+    A procura é feita para trás, do destino para a origem, e guarda g e rhs
+    de cada nó e a fila de prioridade entre chamadas. Quando o clima, a
+    acessibilidade, a prioridade ou o reabastecimento de nós mudam (o Grafo
+    avisa através de nodo_alterado), só os custos das arestas desses nós são
+    recalculados e só os nós cujo custo até ao destino muda voltam a ser
+    expandidos. A origem pode avançar com mover, sem perder o trabalho feito.
+
+    O custo de uma aresta segue MotorProcura._restricoes: o peso (negativos
+    contam como 0), multiplicado pela penalidade de clima com custo_clima.
+    Uma aresta não é utilizável se o clima a torna insegura, se o transporte
+    não pode aceder ao destino ou se o troço não cabe num depósito cheio e a
+    origem não é um ponto de reabastecimento (a versão local da condição do
+    IndiceAlcance, que não obriga a refazer o fecho transitivo). Os pesos
+    descontam a prioridade, pelo que não há heurística admissível além de 0:
+    as chaves dependem só de min(g, rhs), e mover a origem não as altera.
+
+    O D* Lite exige custos positivos e há arestas de custo 0 (num ciclo delas
+    dois nós desatualizados sustentam-se um ao outro), por isso g e rhs são
+    pares (custo, arestas) comparados lexicograficamente: entre caminhos do
+    mesmo custo fica o de menos arestas.
+    """
+
+    def __init__(self, grafo, transporte, origem, destino, custo_clima=False):
+        for nodo in (origem, destino):
+            if nodo not in grafo.m_nodos:
+                raise ValueError(f"Nó '{nodo}' não existe no grafo.")
+        self.m_grafo = grafo
+        self.m_transporte = transporte
+        self.m_custo_clima = custo_clima
+        self.m_origem = origem
+        self.m_destino = destino
+        self.m_compilado = None
+        self.m_sujos = set()
+        self.expansoes = 0
+
+    def nodo_alterado(self, nodo):
+        """
+        Marca as arestas de um nó para recalcular na próxima consulta.
+        """
+        compilado = self.m_compilado
+        if compilado is not None and nodo in compilado.indices:
+            self.m_sujos.add(compilado.indices[nodo])
+
+    def mover(self, nodo):
+        """
+        Muda a origem (o transporte avançou para nodo).
+        """
+        if nodo not in self.m_grafo.m_nodos:
+            raise ValueError(f"Nó '{nodo}' não existe no grafo.")
+        self.m_origem = nodo
+
+    def caminho(self):
+        """
+        Repara a procura com as alterações pendentes e devolve o caminho.
+
+        Returns:
+            tuple: (caminho, custo), ou (None, INFINITO) se não houver caminho
+        """
+        compilado = self.m_grafo.compilado()
+        if compilado is not self.m_compilado:
+            self._iniciar(compilado)
+        elif self.m_sujos:
+            self._atualizar_custos()
+        origem = compilado.indices[self.m_origem]
+        self._calcular(origem)
+
+        g = self.m_g
+        if g[origem] == SEM_CAMINHO:
+            return None, INFINITO
+        inicios, destinos, custos = compilado.inicios, compilado.destinos, self.m_custos
+        destino = compilado.indices[self.m_destino]
+        caminho = [origem]
+        u = origem
+        # Cada aresta soma uma aresta ao par, pelo que g desce sempre ao longo do caminho
+        while u != destino:
+            e = min(range(inicios[u], inicios[u + 1]), key=lambda e: _somar(custos[e], g[destinos[e]]))
+            u = destinos[e]
+            caminho.append(u)
+        return [compilado.nomes[u] for u in caminho], g[origem][0]
+
+    def _iniciar(self, compilado):
+        self.m_compilado = compilado
+        self.m_sujos = set()
+        self.m_custos = array('d', (self._custo_aresta(e) for e in range(compilado.n_arestas)))
+        self.m_g = [SEM_CAMINHO] * compilado.n_nodos
+        self.m_rhs = [SEM_CAMINHO] * compilado.n_nodos
+        destino = compilado.indices[self.m_destino]
+        self.m_rhs[destino] = (0, 0)
+        # Fila com remoção preguiçosa: m_chaves guarda a chave atual de cada nó na fila
+        self.m_fila = [((0, 0), compilado.ordem[destino], destino)]
+        self.m_chaves = {destino: (0, 0)}
+
+    def _custo_aresta(self, e):
+        compilado = self.m_compilado
+        transporte = self.m_transporte
+        u, v = compilado.origens[e], compilado.destinos[e]
+        if not transporte.transporte_pode(compilado.coluna("acessibilidade")[v]):
+            return INFINITO
+        distancia = compilado.distancias[e]
+        # Distância NaN (sem coordenadas) -> comparação falsa, como no IndiceAlcance
+        if not distancia <= transporte.deposito and not compilado.coluna("reabastecimento")[u]:
+            return INFINITO
+
+        tabela = self.m_grafo.tabela_tempos(transporte).atualizar()
+        tempo_viagem = tabela.m_tempos[e]
+        if tempo_viagem != tempo_viagem:
+            tempo_viagem, seguro = self.m_grafo.calcular_tempo_viagem(compilado.nomes[u], compilado.nomes[v], transporte)
+        else:
+            seguro = tabela.m_seguros[e]
+        if not seguro or tempo_viagem == INFINITO:
+            return INFINITO
+
+        custo = max(compilado.pesos[e], 0)
+        if self.m_custo_clima:
+            custo *= tempo_viagem / (distancia / transporte.velocidade)
+        return custo
+
+    def _atualizar_custos(self):
+        """
+        Recalcula as arestas dos nós alterados e corrige rhs das suas origens.
+        """
+        compilado = self.m_compilado
+        origens, destinos = compilado.origens, compilado.destinos
+        custos, g, rhs = self.m_custos, self.m_g, self.m_rhs
+        destino = compilado.indices[self.m_destino]
+
+        arestas = set()
+        for u in self.m_sujos:
+            arestas.update(compilado.arestas_incidentes(u))
+        self.m_sujos = set()
+
+        for e in sorted(arestas):
+            antigo, novo = custos[e], self._custo_aresta(e)
+            if novo == antigo:
+                continue
+            custos[e] = novo
+            u, v = origens[e], destinos[e]
+            if u == destino:
+                continue
+            if novo < antigo:
+                rhs[u] = min(rhs[u], _somar(novo, g[v]))
+            elif rhs[u] == _somar(antigo, g[v]):
+                rhs[u] = self._melhor_sucessor(u)
+            self._atualizar_nodo(u)
+
+    def _melhor_sucessor(self, u):
+        compilado = self.m_compilado
+        destinos, custos, g = compilado.destinos, self.m_custos, self.m_g
+        return min((_somar(custos[e], g[destinos[e]]) for e in range(compilado.inicios[u], compilado.inicios[u + 1])),
+                   default=SEM_CAMINHO)
+
+    def _atualizar_nodo(self, u):
+        g, rhs = self.m_g[u], self.m_rhs[u]
+        if g != rhs:
+            chave = min(g, rhs)
+            if self.m_chaves.get(u) != chave:
+                self.m_chaves[u] = chave
+                heapq.heappush(self.m_fila, (chave, self.m_compilado.ordem[u], u))
+        else:
+            self.m_chaves.pop(u, None)
+
+    def _calcular(self, origem):
+        compilado = self.m_compilado
+        origens, entradas, entradas_inicios = compilado.origens, compilado.entradas, compilado.entradas_inicios
+        custos, g, rhs = self.m_custos, self.m_g, self.m_rhs
+        fila, chaves = self.m_fila, self.m_chaves
+        destino = compilado.indices[self.m_destino]
+
+        while fila:
+            chave, _, u = fila[0]
+            if chaves.get(u) != chave:
+                heapq.heappop(fila)
+                continue
+            if chave >= g[origem] and rhs[origem] == g[origem]:
+                break
+            heapq.heappop(fila)
+            del chaves[u]
+            self.expansoes += 1
+
+            anteriores = entradas[entradas_inicios[u]:entradas_inicios[u + 1]]
+            if g[u] > rhs[u]:
+                g[u] = rhs[u]
+                for e in anteriores:
+                    p = origens[e]
+                    valor = _somar(custos[e], g[u])
+                    if p != destino and valor < rhs[p]:
+                        rhs[p] = valor
+                        self._atualizar_nodo(p)
+            else:
+                antigo = g[u]
+                g[u] = SEM_CAMINHO
+                self._atualizar_nodo(u)
+                for e in anteriores:
+                    p = origens[e]
+                    if p != destino and rhs[p] == _somar(custos[e], antigo):
+                        rhs[p] = self._melhor_sucessor(p)
+                        self._atualizar_nodo(p)
+
+
+def _somar(custo, valor):
+    """
+    Par (custo, arestas) de um caminho que começa com uma aresta de custo
+    `custo` e continua com o par `valor`.
+    """
+    if custo == INFINITO or valor[0] == INFINITO:
+        return SEM_CAMINHO
+    return custo + valor[0], valor[1] + 1
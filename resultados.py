@@ -0,0 +1,153 @@
+import json
+import sqlite3
+import time
+
+COLUNAS_RESULTADO = (
+    "execucao", "instante", "algoritmo", "transporte", "inicio", "caminho",
+    "custo", "tempo", "expansoes", "duracao", "versao_grafo", "erro",
+)
+# Colunas pelas quais os resultados podem ser agrupados em comparar()
+AGRUPAVEIS = ("execucao", "algoritmo", "transporte", "inicio", "versao_grafo")
+
+
+class RegistoResultados:
+    """
+    Registo só de acréscimo dos resultados das procuras, numa base de dados
+    SQLite (uma tabela, uma linha por missão).
+
+    Os resultados ficam em memória e são escritos em lotes de tamanho_lote,
+    numa só transação, ou quando se chama descarregar (ou fechar). Cada
+    abertura do registo é uma nova execução, para comparar execuções entre si.
+    """
+
+    TAMANHO_LOTE = 100
+
+    def __init__(self, caminho="resultados.db", tamanho_lote=TAMANHO_LOTE):
+        self.m_ligacao = sqlite3.connect(caminho)
+        self.m_ligacao.execute(
+            "CREATE TABLE IF NOT EXISTS resultados ("
+            "id INTEGER PRIMARY KEY, execucao INTEGER, instante REAL, algoritmo TEXT, "
+            "transporte TEXT, inicio TEXT, caminho TEXT, custo REAL, tempo REAL, "
+            "expansoes INTEGER, duracao REAL, versao_grafo INTEGER, erro TEXT)"
+        )
+        self.m_ligacao.execute(
+            "CREATE INDEX IF NOT EXISTS resultados_algoritmo ON resultados (algoritmo, transporte)"
+        )
+        self.m_ligacao.commit()
+        ultima = self.m_ligacao.execute("SELECT MAX(execucao) FROM resultados").fetchone()[0]
+        self.execucao = (ultima or 0) + 1
+        self.m_tamanho_lote = tamanho_lote
+        self.m_pendentes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+    def registar(self, algoritmo, transporte, caminho, custo, tempo, expansoes=None,
+                 duracao=None, versao_grafo=None, inicio=None, erro=None):
+        """
+        Acrescenta o resultado de uma missão ao lote pendente.
+        """
+        if inicio is None and caminho:
+            inicio = caminho[0]
+        self.m_pendentes.append((
+            self.execucao, time.time(), algoritmo, transporte, inicio,
+            json.dumps(list(caminho or []), ensure_ascii=False),
+            custo, tempo, expansoes, duracao, versao_grafo, erro,
+        ))
+        if len(self.m_pendentes) >= self.m_tamanho_lote:
+            self.descarregar()
+
+    def registar_avaliacao(self, resultado, inicio=None, versao_grafo=None):
+        """
+        Acrescenta um resultado de avaliacao.avaliar_combinacao.
+        """
+        self.registar(
+            resultado["algoritmo"], resultado["transporte"], resultado["caminho"],
+            resultado["custo"], resultado["tempo"], resultado.get("expansoes"),
+            resultado.get("duracao"), versao_grafo, inicio, resultado.get("erro"),
+        )
+
+    def descarregar(self):
+        """
+        Escreve o lote pendente.
+        """
+        if not self.m_pendentes:
+            return
+        with self.m_ligacao:
+            self.m_ligacao.executemany(
+                f"INSERT INTO resultados ({', '.join(COLUNAS_RESULTADO)}) "
+                f"VALUES ({', '.join('?' * len(COLUNAS_RESULTADO))})",
+                self.m_pendentes,
+            )
+        self.m_pendentes = []
+
+    def fechar(self):
+        self.descarregar()
+        self.m_ligacao.close()
+
+    def consultar(self, algoritmo=None, transporte=None, execucao=None, limite=None):
+        """
+        Resultados registados (incluindo os pendentes), do mais antigo para o
+        mais recente, filtrados pelos argumentos indicados.
+
+        Returns:
+            list: dicionários com as colunas de COLUNAS_RESULTADO (o caminho como lista)
+        """
+        self.descarregar()
+        filtros = {"algoritmo": algoritmo, "transporte": transporte, "execucao": execucao}
+        condicoes = [(f"{coluna} = ?", valor) for coluna, valor in filtros.items() if valor is not None]
+        sql = f"SELECT {', '.join(COLUNAS_RESULTADO)} FROM resultados"
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicao for condicao, _ in condicoes)
+        sql += " ORDER BY id"
+        if limite is not None:
+            sql += f" LIMIT {int(limite)}"
+        linhas = self.m_ligacao.execute(sql, [valor for _, valor in condicoes])
+        resultados = []
+        for linha in linhas:
+            resultado = dict(zip(COLUNAS_RESULTADO, linha))
+            resultado["caminho"] = json.loads(resultado["caminho"])
+            resultados.append(resultado)
+        return resultados
+
+    def comparar(self, agrupar_por=("algoritmo", "transporte"), execucao=None):
+        """
+        Resumo por grupo: número de missões, missões com caminho, médias de
+        custo, tempo, expansões e duração (só das missões com caminho, exceto
+        a duração) e número de erros.
+
+        Returns:
+            list: um dicionário por grupo, ordenado pelas colunas do grupo
+        """
+        for coluna in agrupar_por:
+            if coluna not in AGRUPAVEIS:
+                raise ValueError(f"Não é possível agrupar por '{coluna}' (opções: {', '.join(AGRUPAVEIS)}).")
+        self.descarregar()
+        grupo = ", ".join(agrupar_por)
+        sucesso = "caminho != '[]'"
+        sql = (
+            f"SELECT {grupo + ', ' if grupo else ''}COUNT(*), SUM({sucesso}), "
+            f"AVG(CASE WHEN {sucesso} THEN custo END), AVG(CASE WHEN {sucesso} THEN tempo END), "
+            f"AVG(CASE WHEN {sucesso} THEN expansoes END), AVG(duracao), SUM(erro IS NOT NULL) FROM resultados"
+        )
+        parametros = []
+        if execucao is not None:
+            sql += " WHERE execucao = ?"
+            parametros.append(execucao)
+        if grupo:
+            sql += f" GROUP BY {grupo} ORDER BY {grupo}"
+        chaves = list(agrupar_por) + ["missoes", "com_caminho", "custo", "tempo", "expansoes", "duracao", "erros"]
+        return [dict(zip(chaves, linha)) for linha in self.m_ligacao.execute(sql, parametros)]
+
+
+def imprimir_resumo(resumo):
+    print(f"{'Algoritmo':<15}{'Transporte':<14}{'Missões':>9}{'Com caminho':>13}{'Custo':>12}"
+          f"{'Tempo (h)':>12}{'Expansões':>11}{'Duração (s)':>13}")
+    for linha in resumo:
+        valores = [linha[chave] for chave in ("custo", "tempo", "expansoes", "duracao")]
+        custo, tempo, expansoes, duracao = (f"{v:.3f}" if v is not None else "-" for v in valores)
+        print(f"{linha.get('algoritmo', ''):<15}{linha.get('transporte', ''):<14}{linha['missoes']:>9}"
+              f"{linha['com_caminho']:>13}{custo:>12}{tempo:>12}{expansoes:>11}{duracao:>13}")
@@ -0,0 +1,70 @@
+from collections.abc import MutableMapping
+
+
+class NodosSobrepostos(MutableMapping):
+    """
+    Atributos dos nós de um snapshot: sobreposição copy-on-write sobre o
+    m_nodos de um grafo base.
+
+    nodos[nodo], nodos.get(nodo), items() e values() devolvem os dicionários
+    de atributos sem os copiar e servem apenas para leitura, pelo que uma
+    procura que só lê os nós não copia nenhum. Para alterar os atributos de
+    um nó usa-se escrever(nodo) (ou os métodos do Grafo, que passam por
+    Grafo._escrever_atributos): o dicionário é copiado (superficialmente) na
+    primeira escrita e a partir daí as alterações ficam apenas no snapshot.
+    """
+
+    def __init__(self, base):
+        self.m_base = base
+        self.m_locais = {}
+
+    def __getitem__(self, nodo):
+        atributos = self.m_locais.get(nodo)
+        return self.m_base[nodo] if atributos is None else atributos
+
+    def __setitem__(self, nodo, atributos):
+        if nodo not in self.m_base:
+            raise ValueError(f"Não é possível adicionar o nó '{nodo}' a um snapshot.")
+        self.m_locais[nodo] = atributos
+
+    def __delitem__(self, nodo):
+        raise ValueError(f"Não é possível remover o nó '{nodo}' de um snapshot.")
+
+    def __contains__(self, nodo):
+        return nodo in self.m_base
+
+    def __iter__(self):
+        return iter(self.m_base)
+
+    def __len__(self):
+        return len(self.m_base)
+
+    def ler(self, nodo):
+        """
+        Atributos de um nó só para leitura, sem os copiar.
+        """
+        return self[nodo]
+
+    def escrever(self, nodo):
+        """
+        Atributos de um nó para alterar: a cópia própria do snapshot.
+        """
+        atributos = self.m_locais.get(nodo)
+        if atributos is None:
+            atributos = dict(self.m_base[nodo])
+            self.m_locais[nodo] = atributos
+        return atributos
+
+    def items(self):
+        locais = self.m_locais
+        return [(nodo, locais.get(nodo, atributos)) for nodo, atributos in self.m_base.items()]
+
+    def values(self):
+        return [atributos for _, atributos in self.items()]
+
+    @property
+    def alterados(self):
+        """
+        Nós que já têm cópia própria neste snapshot.
+        """
+        return set(self.m_locais)
@@ -0,0 +1,156 @@
+from array import array
+from transporte import Carro, Mota, Helicoptero, Drone
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional; sem ele usa-se o cálculo escalar
+    np = None
+
+INFINITO = float('inf')
+
+# Escalões de clima médio: <=3 tempo bom, <=6 chuva, <=8 tempestade, >8 tempestade severa
+LIMITES_ESCALOES = (3, 6, 8)
+
+
+def perfil_clima(transporte):
+    """
+    Regras de clima de um transporte.
+
+    Returns:
+        tuple: (multiplicadores de tempo por escalão, limite de clima inseguro,
+                limite estrito) - o transporte não pode viajar se o clima médio
+                for >= limite (ou > limite quando estrito).
+    """
+    if isinstance(transporte, Helicoptero):
+        return (1.0, 1.3, 1.6, 2.0), 8, False  # Helicoptero não voa em tempestades severas
+    elif isinstance(transporte, Drone):
+        return (1.0, 1.3, 1.6, 2.0), 7, False  # Drone não voa em qualquer tempestade
+    elif isinstance(transporte, Mota):
+        return (1.0, 1.5, 2.0, INFINITO), 8, True  # Motas são mais afetadas pela chuva
+    elif isinstance(transporte, Carro):
+        return (1.0, 1.3, 1.8, 2.5), None, False
+    return (1.0, 1.3, 1.6, 2.0), None, False
+
+
+def escalao_clima(clima_medio):
+    if clima_medio <= LIMITES_ESCALOES[0]:
+        return 0
+    elif clima_medio <= LIMITES_ESCALOES[1]:
+        return 1
+    elif clima_medio <= LIMITES_ESCALOES[2]:
+        return 2
+    return 3
+
+
+def tempo_viagem(distancia, clima_medio, velocidade, perfil):
+    """
+    Tempo de viagem (horas) e segurança de um troço, segundo um perfil de clima.
+    """
+    multiplicadores, limite, estrito = perfil
+    if limite is not None and (clima_medio > limite if estrito else clima_medio >= limite):
+        return INFINITO, False
+
+    penalidade_clima = multiplicadores[escalao_clima(clima_medio)]
+    if penalidade_clima == INFINITO:
+        return INFINITO, False
+
+    tempo_base = distancia / velocidade
+    return tempo_base * penalidade_clima, True
+
+
+class TabelaTempos:
+    """
+    Tabela (tempo de viagem, seguro) de todas as arestas do grafo para uma
+    classe de transporte, indexada pelas arestas do GrafoCompilado.
+
+    É construída numa só passagem sobre as arestas e, depois disso, só as
+    arestas incidentes em nós cujo clima mudou (ver Grafo.atualizar_clima e
+    Grafo.atualizar_atributos) são recalculadas. Arestas sem coordenadas
+    ficam com tempo NaN e são tratadas por Grafo.calcular_tempo_viagem.
+    """
+
+    def __init__(self, grafo, transporte):
+        self.m_grafo = grafo
+        self.m_velocidade = transporte.velocidade
+        self.m_perfil = perfil_clima(transporte)
+        self.m_compilado = None
+        self.m_tempos = array('d')
+        self.m_seguros = bytearray()
+        self.m_sujos = set()
+
+    def atualizar(self):
+        """
+        Garante que a tabela corresponde ao grafo atual e devolve-a.
+        """
+        compilado = self.m_grafo.compilado()
+        if self.m_compilado is not compilado:
+            self.construir(compilado)
+        elif self.m_sujos:
+            arestas = set()
+            for u in self.m_sujos:
+                arestas.update(compilado.arestas_incidentes(u))
+            self.m_sujos = set()
+            self._calcular(sorted(arestas))
+        return self
+
+    def consultar(self, origem, destino):
+        """
+        Devolve (tempo, seguro) da aresta origem -> destino, ou None se a aresta não existir.
+        """
+        self.atualizar()
+        compilado = self.m_compilado
+        e = compilado.aresta(compilado.indices[origem], compilado.indices[destino])
+        if e < 0 or self.m_tempos[e] != self.m_tempos[e]:
+            return None
+        return self.m_tempos[e], bool(self.m_seguros[e])
+
+    def marcar(self, nodo):
+        """
+        Marca o clima de um nó como alterado.
+        """
+        if self.m_compilado is not None and nodo in self.m_compilado.indices:
+            self.m_sujos.add(self.m_compilado.indices[nodo])
+
+    def construir(self, compilado):
+        self.m_compilado = compilado
+        self.m_tempos = array('d', bytes(8 * compilado.n_arestas))
+        self.m_seguros = bytearray(compilado.n_arestas)
+        self.m_sujos = set()
+        self._calcular(range(compilado.n_arestas))
+
+    def _calcular(self, arestas):
+        compilado = self.m_compilado
+        origens = compilado.origens
+        destinos = compilado.destinos
+        clima = compilado.coluna("clima")
+        distancias = compilado.distancias
+        tempos = self.m_tempos
+        seguros = self.m_seguros
+
+        if np is None:
+            for e in arestas:
+                clima_medio = (clima[origens[e]] + clima[destinos[e]]) / 2
+                tempos[e], seguros[e] = tempo_viagem(distancias[e], clima_medio, self.m_velocidade, self.m_perfil)
+            return
+
+        arestas = np.fromiter(arestas, dtype=np.int64)
+        if not len(arestas):
+            return
+        clima = np.frombuffer(clima, dtype=float)
+        climas = (clima[np.frombuffer(origens, dtype=np.int64)[arestas]] +
+                  clima[np.frombuffer(destinos, dtype=np.int64)[arestas]]) / 2
+
+        multiplicadores, limite, estrito = self.m_perfil
+        penalidades = np.select(
+            [climas <= LIMITES_ESCALOES[0], climas <= LIMITES_ESCALOES[1], climas <= LIMITES_ESCALOES[2]],
+            multiplicadores[:3],
+            default=multiplicadores[3],
+        )
+        seguro = penalidades != INFINITO
+        if limite is not None:
+            seguro &= (climas <= limite) if estrito else (climas < limite)
+
+        tempo = np.frombuffer(distancias, dtype=float)[arestas] / self.m_velocidade * penalidades
+        tempo[~seguro] = INFINITO
+        np.frombuffer(tempos, dtype=float)[arestas] = tempo
+        np.frombuffer(seguros, dtype=np.uint8)[arestas] = seguro
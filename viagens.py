@@ -0,0 +1,236 @@
+from missao import MatrizMissao, INFINITO, PENALIZACAO
+
+
+class PlaneadorViagens:
+    """
+    Divide as entregas em viagens que respeitam a capacidade do transporte
+    (problema de rotas com capacidade, CVRP), com reabastecimento de carga
+    nos nós supply_refill entre viagens.
+
+    As viagens são construídas com o algoritmo das poupanças (Clarke-Wright)
+    e melhoradas com relocalização de entregas entre viagens e 2-opt dentro
+    de cada viagem. Cada viagem começa no ponto de partida ou num nó de
+    reabastecimento e, exceto a última, acaba no nó de reabastecimento mais
+    próximo da sua última entrega. Entregas maiores do que a capacidade são
+    divididas em viagens completas e um resto.
+
+    Todos os custos vêm de uma MatrizMissao (uma procura por origem); a
+    autonomia não é considerada no plano, apenas a carga.
+    """
+
+    def __init__(self, grafo, partida, entregas, transporte):
+        self.m_capacidade = transporte.capacidade
+        self.m_demandas = {}
+        for nodo in entregas:
+            alimentos = grafo.m_nodos[nodo].get("alimentos", 0)
+            if alimentos > 0:
+                self.m_demandas[nodo] = alimentos
+        reabastecimentos = [nodo for nodo, atributos in grafo.m_nodos.items() if atributos.get("supply_refill", False)]
+
+        # Linhas só para a partida e as entregas; as dos nós de reabastecimento
+        # são calculadas a pedido, quando uma viagem começa num deles
+        origens = [partida] + list(self.m_demandas)
+        self.m_matriz = MatrizMissao(grafo, partida, origens[1:] + reabastecimentos, transporte, origens)
+        matriz = self.m_matriz
+        self.m_d = [[d if d < INFINITO else PENALIZACAO for d in linha] for linha in matriz.m_distancias]
+        self.m_reabastecimentos = [0] + [matriz.indice(nodo) for nodo in reabastecimentos if nodo != partida]
+
+        # Nó de reabastecimento mais próximo de cada entrega, e custo de lá chegar
+        self.m_retorno = {}
+        for i in (matriz.indice(nodo) for nodo in origens):
+            r = min(self.m_reabastecimentos, key=lambda r: self.m_d[i][r])
+            self.m_retorno[i] = (self.m_d[i][r], r)
+
+    def planear(self, max_movimentos=10000):
+        """
+        Returns:
+            dict: viagens (início, entregas (nodo, quantidade), fim, carga,
+            distância, tempo, caminho), distância e tempo totais, quantidade
+            entregue e entregas não servidas (inalcançáveis a partir da
+            partida ou dos nós de reabastecimento onde as viagens começam)
+        """
+        matriz = self.m_matriz
+        capacidade = self.m_capacidade
+
+        servidos = set(matriz.alcancaveis())
+        completas = []
+        restos = {}
+        nao_servidas = []
+        for nodo, quantidade in self.m_demandas.items():
+            i = matriz.indice(nodo)
+            if i not in servidos or self.m_retorno[i][0] >= PENALIZACAO:
+                nao_servidas.append((nodo, quantidade))
+                continue
+            while quantidade > capacidade:
+                completas.append([(i, capacidade)])
+                quantidade -= capacidade
+            restos[i] = quantidade
+
+        rotas = self._poupancas(restos)
+        self._melhorar(rotas, restos, max_movimentos)
+        viagens = self._encadear(completas + [[(i, restos[i]) for i in rota] for rota in rotas], nao_servidas)
+
+        return {
+            "viagens": viagens,
+            "distancia": sum(v["distancia"] for v in viagens),
+            "tempo": sum(v["tempo"] for v in viagens),
+            "entregue": sum(v["carga"] for v in viagens),
+            "nao_servidas": nao_servidas,
+        }
+
+    def _ligacao(self, a, b):
+        # Custo de a para b; None é o ponto de partida (em a) ou o regresso para reabastecer (em b)
+        if a is None:
+            return self.m_d[0][b]
+        if b is None:
+            return self.m_retorno[a][0]
+        return self.m_d[a][b]
+
+    def _custo(self, rota):
+        if not rota:
+            return 0
+        custo = self._ligacao(None, rota[0]) + self._ligacao(rota[-1], None)
+        for a, b in zip(rota, rota[1:]):
+            custo += self.m_d[a][b]
+        return custo
+
+    def _poupancas(self, demandas):
+        """
+        Clarke-Wright assimétrico: junta a viagem que acaba em i com a que
+        começa em j pela ordem decrescente de poupança, se a carga couber.
+        """
+        d = self.m_d
+        clientes = list(demandas)
+        rotas = {i: [i] for i in clientes}
+        cargas = {i: demandas[i] for i in clientes}
+        rota_de = {i: i for i in clientes}
+
+        poupancas = []
+        for i in clientes:
+            for j in clientes:
+                if i != j:
+                    poupanca = self._ligacao(i, None) + self._ligacao(None, j) - d[i][j]
+                    if poupanca > 0:
+                        poupancas.append((-poupanca, i, j))
+        poupancas.sort()
+
+        for _, i, j in poupancas:
+            ri, rj = rota_de[i], rota_de[j]
+            if ri == rj or rotas[ri][-1] != i or rotas[rj][0] != j:
+                continue
+            if cargas[ri] + cargas[rj] > self.m_capacidade:
+                continue
+            rotas[ri].extend(rotas[rj])
+            cargas[ri] += cargas[rj]
+            for k in rotas[rj]:
+                rota_de[k] = ri
+            del rotas[rj], cargas[rj]
+
+        return list(rotas.values())
+
+    def _melhorar(self, rotas, demandas, max_movimentos):
+        """
+        Relocalização de entregas entre viagens e 2-opt em cada viagem, até não haver melhoria.
+        """
+        cargas = [sum(demandas[i] for i in rota) for rota in rotas]
+        for _ in range(max_movimentos):
+            if not (self._relocalizar(rotas, cargas, demandas) or self._dois_opt(rotas)):
+                break
+        rotas[:] = [rota for rota in rotas if rota]
+
+    def _relocalizar(self, rotas, cargas, demandas):
+        ligacao = self._ligacao
+        for a, origem in enumerate(rotas):
+            for k, x in enumerate(origem):
+                anterior = origem[k - 1] if k > 0 else None
+                seguinte = origem[k + 1] if k + 1 < len(origem) else None
+                if len(origem) == 1:
+                    ganho = ligacao(None, x) + ligacao(x, None)
+                else:
+                    ganho = ligacao(anterior, x) + ligacao(x, seguinte) - ligacao(anterior, seguinte)
+
+                for b, destino in enumerate(rotas):
+                    if b == a or not destino or cargas[b] + demandas[x] > self.m_capacidade:
+                        continue
+                    for p in range(len(destino) + 1):
+                        antes = destino[p - 1] if p > 0 else None
+                        depois = destino[p] if p < len(destino) else None
+                        custo = ligacao(antes, x) + ligacao(x, depois) - ligacao(antes, depois)
+                        if custo - ganho < -1e-9:
+                            del origem[k]
+                            destino.insert(p, x)
+                            cargas[a] -= demandas[x]
+                            cargas[b] += demandas[x]
+                            return True
+        return False
+
+    def _dois_opt(self, rotas):
+        for rota in rotas:
+            custo = self._custo(rota)
+            for i in range(len(rota) - 1):
+                for j in range(i + 1, len(rota)):
+                    nova = rota[:i] + rota[i:j + 1][::-1] + rota[j + 1:]
+                    if self._custo(nova) < custo - 1e-9:
+                        rota[:] = nova
+                        return True
+        return False
+
+    def _encadear(self, viagens, nao_servidas):
+        """
+        Ordena as viagens (a próxima é a de início mais próximo) e liga-as
+        pelos nós de reabastecimento. As viagens foram planeadas a partir do
+        ponto de partida, mas cada uma começa onde a anterior acabou: as que
+        já não se alcançam de lá passam para nao_servidas.
+        """
+        matriz = self.m_matriz
+        por_fazer = list(viagens)
+        resultado = []
+        posicao = 0
+        while por_fazer:
+            alcancaveis = [v for v in por_fazer if matriz.distancia(posicao, v[0][0]) < INFINITO]
+            if not alcancaveis:
+                # Uma entrega dividida em várias viagens conta uma só vez
+                restantes = {}
+                for viagem in por_fazer:
+                    for i, quantidade in viagem:
+                        restantes[matriz.nodos[i]] = restantes.get(matriz.nodos[i], 0) + quantidade
+                nao_servidas.extend(restantes.items())
+                break
+            viagem = min(alcancaveis, key=lambda v: (matriz.distancia(posicao, v[0][0]), v[0][0]))
+            por_fazer.remove(viagem)
+            ordem = [i for i, _ in viagem]
+            fim = self.m_retorno[ordem[-1]][1] if por_fazer else ordem[-1]
+            pontos = [posicao] + ordem + ([fim] if por_fazer else [])
+
+            distancia = tempo = 0
+            caminho = [matriz.nodos[posicao]]
+            for a, b in zip(pontos, pontos[1:]):
+                distancia += matriz.distancia(a, b)
+                tempo += matriz.tempo(a, b)
+                troco = matriz.caminho(a, b)
+                if troco:
+                    caminho.extend(troco[1:])
+
+            resultado.append({
+                "inicio": matriz.nodos[posicao],
+                "entregas": [(matriz.nodos[i], quantidade) for i, quantidade in viagem],
+                "fim": matriz.nodos[fim],
+                "carga": sum(quantidade for _, quantidade in viagem),
+                "distancia": distancia,
+                "tempo": tempo,
+                "caminho": caminho,
+            })
+            posicao = fim
+        return resultado
+
+
+def imprimir_plano(transporte, plano):
+    print(f"[Viagens - {transporte.nome} (capacidade {transporte.capacidade} kg)]")
+    for n, viagem in enumerate(plano["viagens"], 1):
+        entregas = ", ".join(f"{nodo} ({quantidade} kg)" for nodo, quantidade in viagem["entregas"])
+        print(f"Viagem {n}: {viagem['inicio']} -> {entregas} -> {viagem['fim']} "
+              f"[{viagem['carga']} kg, {viagem['distancia']:.2f} km]")
+    print(f"Distância total: {plano['distancia']:.2f} km, tempo de viagem: {plano['tempo']:.2f} h, "
+          f"entregue: {plano['entregue']} kg")
+    if plano["nao_servidas"]:
+        print(f"Não servidas: {', '.join(nodo for nodo, _ in plano['nao_servidas'])}")